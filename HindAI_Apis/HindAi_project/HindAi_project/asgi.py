@@ -6,12 +6,9 @@ from pathlib import Path
 project_root = Path(__file__).resolve().parent.parent.parent
 sys.path.append(str(project_root))
 
-# Set Django settings module
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'HindAi_project.settings')
-
-# Import Django and initialize it first
-import django
-django.setup()
+# Initialize Django once, before any router touches the ORM
+from django_init import setup_django
+setup_django()
 
 from django.core.asgi import get_asgi_application
 from fastapi import FastAPI
@@ -3,14 +3,21 @@ from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from pydantic import BaseModel
 from typing import Optional
 from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth.hashers import check_password, make_password
 from django.core.exceptions import ValidationError
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
 from .models import HindAIUser, UserProfile
 from .serializers import UserSerializer
+from .profile_pictures import picture_name, save_upload, schedule_thumbnails
 from asgiref.sync import sync_to_async
 from django.db import transaction
+from concurrent.futures import ThreadPoolExecutor
+from cachetools import TTLCache
+import asyncio
+import threading
+import uuid
 import os
 
 router = APIRouter()
@@ -50,6 +57,18 @@ ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv('JWT_EXPIRE_MINUTES', "30"))
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
 
+# Password hashing is deliberately slow; it runs on its own pool so it never holds
+# a DB transaction or a slot in the executor sync_to_async uses for the ORM
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', str(min(4, os.cpu_count() or 1))))
+password_pool = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+
+# Users resolved from a token are reused for a short while instead of querying on every request;
+# entries are plain dicts of PRINCIPAL_FIELDS, never ORM instances shared between requests
+PRINCIPAL_FIELDS = ("id", "email", "username", "first_name", "last_name", "is_active", "is_staff", "is_superuser")
+PRINCIPAL_CACHE_TTL = int(os.getenv('PRINCIPAL_CACHE_TTL', "60"))  # seconds
+principal_cache = TTLCache(maxsize=int(os.getenv('PRINCIPAL_CACHE_SIZE', "10000")), ttl=PRINCIPAL_CACHE_TTL)
+principal_cache_lock = threading.Lock()
+
 # Helper functions
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
@@ -57,16 +76,40 @@ def verify_password(plain_password, hashed_password):
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+async def hash_user_password(password):
+    """Django password hash computed on the password pool"""
+    return await asyncio.get_running_loop().run_in_executor(password_pool, make_password, password)
+
+def password_upgrade_setter(user_id, encoded):
+    """check_password setter that stores the re-hashed password when the hasher settings changed"""
+    def setter(raw_password):
+        # only replace the hash that was checked, so a concurrent password change wins
+        HindAIUser.objects.filter(pk=user_id, password=encoded).update(password=make_password(raw_password))
+    return setter
+
+async def check_user_password(password, encoded, setter=None):
+    """Check a password against a stored Django hash on the password pool"""
+    return await asyncio.get_running_loop().run_in_executor(
+        password_pool, lambda: check_password(password, encoded, setter=setter)
+    )
+
 def create_access_token(data: dict):
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
+def invalidate_principal(email):
+    """Drop cached users for this email (after a password or profile change)"""
+    with principal_cache_lock:
+        for key in [key for key, user in principal_cache.items() if user["email"] == email]:
+            principal_cache.pop(key, None)
+
 # Auth endpoints
 @router.post("/register", response_model=UserResponse)
 async def register(user_data: UserCreate):
     UserModel = get_user_model()
+    password_hash = await hash_user_password(user_data.password)
     
     # Convert sync operations to async
     @sync_to_async
@@ -85,10 +128,9 @@ async def register(user_data: UserCreate):
                     email=user_data.email,
                     username=user_data.username,
                     first_name=user_data.first_name,
-                    last_name=user_data.last_name
+                    last_name=user_data.last_name,
+                    password=password_hash
                 )
-                user.set_password(user_data.password)
-                user.save()
                 return user
             except Exception as e:
                 raise HTTPException(
@@ -119,25 +161,24 @@ async def register(user_data: UserCreate):
 async def login(user_data: OAuth2PasswordRequestForm = Depends()):
     UserModel = get_user_model()
     @sync_to_async
-    def verify_user():
+    def find_user():
         try:
             # Try to get user by email first
             try:
-                user = UserModel.objects.get(email=user_data.username)
+                return UserModel.objects.get(email=user_data.username)
             except UserModel.DoesNotExist:
                 # If email not found, try username
                 try:
-                    user = UserModel.objects.get(username=user_data.username)
+                    return UserModel.objects.get(username=user_data.username)
                 except UserModel.DoesNotExist:
                     return None
-                
-            if user.check_password(user_data.password):
-                return user
-            return None
         except Exception:
             return None
 
-    user = await verify_user()
+    user = await find_user()
+    if user and not await check_user_password(user_data.password, user.password,
+                                              setter=password_upgrade_setter(user.id, user.password)):
+        user = None
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -158,19 +199,30 @@ async def login(user_data: OAuth2PasswordRequestForm = Depends()):
         "token": token
     }
 
-async def get_current_user(token: str = Depends(oauth2_scheme)):
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> dict:
+    """The token's user as a dict of PRINCIPAL_FIELDS"""
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
         if email is None:
             raise HTTPException(status_code=401, detail="Invalid authentication token")
-    except jwt.PyJWTError:
+    except JWTError:
         raise HTTPException(status_code=401, detail="Invalid authentication token")
     
-    user = HindAIUser.objects.filter(email=email).first()
+    # jwt.decode has already checked the signature and expiry, so a cached user is safe to reuse;
+    # tokens issued before jti was added are cached under their subject
+    cache_key = payload.get("jti") or f"sub:{email}"
+    with principal_cache_lock:
+        user = principal_cache.get(cache_key)
+    if user is not None:
+        return dict(user)
+    
+    user = await sync_to_async(HindAIUser.objects.filter(email=email).values(*PRINCIPAL_FIELDS).first)()
     if user is None:
         raise HTTPException(status_code=401, detail="User not found")
-    return user
+    with principal_cache_lock:
+        principal_cache[cache_key] = user
+    return dict(user)
 
 # Profile Pydantic models
 class ProfileData(BaseModel):
@@ -285,35 +337,39 @@ async def update_user_profile(username: str, profile_data: ProfileData):
 @router.post("/profile/upload-picture/{username}")
 async def upload_profile_picture(username: str, file: UploadFile = File(...)):
     @sync_to_async
-    def save_profile_picture():
+    def user_exists():
+        return HindAIUser.objects.filter(username=username).exists()
+    
+    @sync_to_async
+    def save_profile_picture(name):
         with transaction.atomic():
             try:
                 user = HindAIUser.objects.get(username=username)
                 profile, created = UserProfile.objects.get_or_create(user=user)
                 
-                # Save file
-                file_location = f"media/profile_pictures/{username}_{file.filename}"
-                os.makedirs(os.path.dirname(file_location), exist_ok=True)
-                
-                with open(file_location, "wb+") as f:
-                    content = file.file.read()
-                    f.write(content)
-                
                 # Update profile picture path
-                profile.profile_picture = f"profile_pictures/{username}_{file.filename}"
-                profile.save()
-                
-                return {
-                    "success": True,
-                    "username": username,
-                    "filename": file.filename
-                }
+                profile.profile_picture = f"profile_pictures/{name}"
+                profile.save(update_fields=["profile_picture"])
             except HindAIUser.DoesNotExist:
                 raise HTTPException(status_code=404, detail="User not found")
             except Exception as e:
                 raise HTTPException(status_code=500, detail=str(e))
     
-    return await save_profile_picture()
+    if not await user_exists():
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    # Stream the file to disk first; the transaction only records the final path
+    name = picture_name(username, file.filename)
+    file_location = await save_upload(file, name)
+    await save_profile_picture(name)
+    thumbnails = schedule_thumbnails(file_location, name)
+    
+    return {
+        "success": True,
+        "username": username,
+        "filename": file.filename,
+        "thumbnails": thumbnails
+    }
 
 
 
@@ -333,35 +389,50 @@ class PasswordUpdateData(BaseModel):
 @router.put("/profile/update-password/{username}")
 async def update_user_password(username: str, password_data: PasswordUpdateData):
     @sync_to_async
-    def change_password():
+    def get_user():
+        try:
+            # Find the user by username
+            return HindAIUser.objects.get(username=username)
+        except HindAIUser.DoesNotExist:
+            raise HTTPException(status_code=404, detail="User not found")
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+    
+    @sync_to_async
+    def change_password(old_hash, new_hash):
         with transaction.atomic():
             try:
-                # Find the user by username
-                user = HindAIUser.objects.get(username=username)
-                
-                # Verify old password first
-                if not user.check_password(password_data.old_password):
+                # Only replace the hash that was verified, so a concurrent change is not overwritten
+                updated = HindAIUser.objects.filter(username=username, password=old_hash).update(password=new_hash)
+                if not updated:
                     raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail="Current password is incorrect"
+                        status_code=status.HTTP_409_CONFLICT,
+                        detail="Password was changed concurrently, please retry"
                     )
                 
-                # Update the password
-                user.set_password(password_data.new_password)
-                user.save()
-                
                 return {
                     "success": True,
                     "message": f"Password updated successfully for user {username}"
                 }
-            except HindAIUser.DoesNotExist:
-                raise HTTPException(status_code=404, detail="User not found")
             except HTTPException as e:
                 raise e
             except Exception as e:
                 raise HTTPException(status_code=500, detail=str(e))
     
-    return await change_password()
+    user = await get_user()
+    
+    # Verify old password first
+    if not await check_user_password(password_data.old_password, user.password):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Current password is incorrect"
+        )
+    
+    # Update the password
+    new_hash = await hash_user_password(password_data.new_password)
+    result = await change_password(user.password, new_hash)
+    invalidate_principal(user.email)
+    return result
 
 
 
@@ -401,6 +472,7 @@ async def update_user_info(current_username: str, user_data: UserUpdateData):
                 
                 # Generate a new token with updated information
                 token = create_access_token({"sub": user.email})
+                invalidate_principal(user.email)
                 
                 return {
                     "id": user.id,
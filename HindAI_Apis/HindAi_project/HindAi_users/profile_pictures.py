@@ -0,0 +1,87 @@
+"""
+Profile picture storage.
+
+Uploads are streamed to disk in chunks with aiofiles and rejected as soon as
+they pass MAX_PROFILE_PICTURE_BYTES, so a large upload never sits in memory.
+Resized WebP thumbnails are produced afterwards on a small background pool;
+the upload response does not wait for them.
+"""
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import aiofiles
+from fastapi import HTTPException, UploadFile
+
+PROFILE_PICTURE_DIR = "media/profile_pictures"
+MAX_PROFILE_PICTURE_BYTES = int(os.getenv("MAX_PROFILE_PICTURE_BYTES", str(5 * 1024 * 1024)))
+UPLOAD_CHUNK_SIZE = 256 * 1024
+THUMBNAIL_SIZES = [int(size) for size in os.getenv("THUMBNAIL_SIZES", "64,128,256").split(",") if size.strip()]
+THUMBNAIL_QUALITY = int(os.getenv("THUMBNAIL_QUALITY", "80"))
+ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp", ".bmp"}
+
+thumbnail_pool = ThreadPoolExecutor(max_workers=int(os.getenv("THUMBNAIL_WORKERS", "2")),
+                                    thread_name_prefix="thumbnails")
+
+
+def picture_name(username: str, filename: str) -> str:
+    """Stored file name, `{username}_{original name}` with any directory part removed."""
+    name = os.path.basename(filename or "")
+    if os.path.splitext(name)[1].lower() not in ALLOWED_EXTENSIONS:
+        raise HTTPException(status_code=400, detail="Unsupported image type")
+    return f"{username}_{name}"
+
+
+def thumbnail_path(name: str, size: int) -> str:
+    return os.path.join(PROFILE_PICTURE_DIR, "thumbnails", f"{os.path.splitext(name)[0]}_{size}.webp")
+
+
+async def save_upload(file: UploadFile, name: str) -> str:
+    """Stream an upload to PROFILE_PICTURE_DIR/name; returns the path on disk."""
+    os.makedirs(PROFILE_PICTURE_DIR, exist_ok=True)
+    file_location = os.path.join(PROFILE_PICTURE_DIR, name)
+    tmp_location = f"{file_location}.{uuid.uuid4().hex}.part"
+    written = 0
+    try:
+        async with aiofiles.open(tmp_location, "wb") as f:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                written += len(chunk)
+                if written > MAX_PROFILE_PICTURE_BYTES:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"Profile picture is larger than {MAX_PROFILE_PICTURE_BYTES // (1024 * 1024)} MB"
+                    )
+                await f.write(chunk)
+        if written == 0:
+            raise HTTPException(status_code=400, detail="Empty file")
+        os.replace(tmp_location, file_location)
+    finally:
+        if os.path.exists(tmp_location):
+            os.remove(tmp_location)
+    return file_location
+
+
+def generate_thumbnails(file_location: str, name: str) -> None:
+    from PIL import Image, ImageOps
+
+    try:
+        with Image.open(file_location) as image:
+            image = ImageOps.exif_transpose(image)
+            if image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGBA")
+            os.makedirs(os.path.join(PROFILE_PICTURE_DIR, "thumbnails"), exist_ok=True)
+            for size in THUMBNAIL_SIZES:
+                thumb = ImageOps.fit(image, (size, size), Image.LANCZOS)
+                path = thumbnail_path(name, size)
+                tmp_path = f"{path}.tmp"
+                thumb.save(tmp_path, "WEBP", quality=THUMBNAIL_QUALITY, method=4)
+                os.replace(tmp_path, path)
+        print(f"Generated {len(THUMBNAIL_SIZES)} thumbnails for {name}")
+    except Exception as e:
+        print(f"Error generating thumbnails for {name}: {e}")
+
+
+def schedule_thumbnails(file_location: str, name: str) -> dict:
+    """Queue thumbnail generation; returns the media URLs they will be served at."""
+    thumbnail_pool.submit(generate_thumbnails, file_location, name)
+    return {str(size): "/" + thumbnail_path(name, size) for size in THUMBNAIL_SIZES}
@@ -1,6 +1,5 @@
 import os
 import sys
-import django
 
 # Add parent directories to Python path
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -21,8 +20,8 @@ logger.info(f"Python path: {sys.path[:5]}")
 logger.info(f"Current directory: {os.getcwd()}")
 logger.info(f"Project directories: {current_dir}, {hindai_apis_dir}")
 
-os.environ.setdefault("DJANGO_SETTINGS_MODULE", "HindAi_project.settings")
-django.setup()
+from django_init import setup_django
+setup_django()
 
 try:
     # Import the FastAPI app directly from the same directory
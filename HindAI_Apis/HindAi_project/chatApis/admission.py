@@ -0,0 +1,154 @@
+import asyncio
+import math
+import os
+import time
+from collections import OrderedDict, deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, Set, Tuple
+
+MAX_CONCURRENT_AGENT_RUNS = int(os.getenv("MAX_CONCURRENT_AGENT_RUNS", "16"))
+MAX_AGENT_RUNS_PER_USER = int(os.getenv("MAX_AGENT_RUNS_PER_USER", "2"))
+MAX_QUEUED_AGENT_RUNS = int(os.getenv("MAX_QUEUED_AGENT_RUNS", "200"))
+MAX_QUEUED_RUNS_PER_USER = int(os.getenv("MAX_QUEUED_RUNS_PER_USER", "10"))
+# assumed run time until real runs have been measured
+DEFAULT_RUN_SECONDS = float(os.getenv("ADMISSION_DEFAULT_RUN_SECONDS", "30"))
+
+Job = Tuple[str, Callable[[], Awaitable[None]]]
+
+
+class QueueFull(Exception):
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Admission control for agent runs.
+
+    At most `max_running` runs execute at once and at most `per_user` of them
+    belong to one user. Everything else waits in a bounded queue that is served
+    round-robin across users, so one user's burst cannot starve the others.
+    When the queue is full new runs are refused immediately (HTTP 429) instead
+    of piling up and timing out together.
+    """
+
+    def __init__(self, max_running: int = MAX_CONCURRENT_AGENT_RUNS, per_user: int = MAX_AGENT_RUNS_PER_USER,
+                 max_queued: int = MAX_QUEUED_AGENT_RUNS, max_queued_per_user: int = MAX_QUEUED_RUNS_PER_USER):
+        self.max_running = max_running
+        self.per_user = per_user
+        self.max_queued = max_queued
+        self.max_queued_per_user = max_queued_per_user
+        self.queues: "OrderedDict[str, Deque[Job]]" = OrderedDict()  # user -> waiting jobs, in round-robin order
+        self.running: Dict[str, int] = {}
+        self.tasks: Set[asyncio.Task] = set()
+        self.avg_run_seconds = DEFAULT_RUN_SECONDS
+        self.rejected = 0
+
+    @property
+    def queued(self) -> int:
+        return sum(len(jobs) for jobs in self.queues.values())
+
+    @property
+    def running_total(self) -> int:
+        return sum(self.running.values())
+
+    def retry_after(self, waiting: Optional[int] = None) -> int:
+        """Seconds until roughly `waiting` queued runs have drained."""
+        waiting = self.queued if waiting is None else waiting
+        return max(1, math.ceil(self.avg_run_seconds * (waiting + 1) / max(1, self.max_running)))
+
+    def submit(self, username: str, task_id: str, run: Callable[[], Awaitable[None]]) -> Optional[int]:
+        """
+        Queue a run; returns its queue position, or None if it started right away.
+        Raises QueueFull when the run cannot be accepted.
+        """
+        user_queue = self.queues.get(username)
+        if self.queued >= self.max_queued:
+            self.rejected += 1
+            raise QueueFull("Server is busy, too many requests are waiting", self.retry_after())
+        if user_queue is not None and len(user_queue) >= self.max_queued_per_user:
+            self.rejected += 1
+            raise QueueFull("Too many of your requests are waiting", self.retry_after(len(user_queue)))
+
+        if user_queue is None:
+            user_queue = self.queues[username] = deque()
+        user_queue.append((task_id, run))
+        self._dispatch()
+        return self.position(task_id)
+
+    def cancel(self, task_id: str) -> bool:
+        """Drop a run that has not started yet."""
+        for username, jobs in self.queues.items():
+            for job in jobs:
+                if job[0] == task_id:
+                    jobs.remove(job)
+                    if not jobs:
+                        del self.queues[username]
+                    return True
+        return False
+
+    def position(self, task_id: str) -> Optional[int]:
+        """1-based place in the round-robin start order, None if not queued (approximate while users are at their limit)."""
+        for index, (queued_id, _) in enumerate(self._service_order()):
+            if queued_id == task_id:
+                return index + 1
+        return None
+
+    def _service_order(self):
+        """Queued jobs in the round-robin order the dispatcher takes them."""
+        pending = [(username, list(jobs)) for username, jobs in self.queues.items()]
+        depth = 0
+        while pending:
+            for username, jobs in pending:
+                if depth < len(jobs):
+                    yield jobs[depth]
+            depth += 1
+            pending = [(username, jobs) for username, jobs in pending if depth < len(jobs)]
+
+    def _dispatch(self) -> None:
+        while self.running_total < self.max_running and self.queues:
+            for username in list(self.queues):
+                if self.running.get(username, 0) < self.per_user:
+                    break
+            else:
+                return  # every waiting user is at their own limit
+            jobs = self.queues.pop(username)
+            task_id, run = jobs.popleft()
+            if jobs:
+                self.queues[username] = jobs  # back of the rotation
+            self._start(username, task_id, run)
+
+    def _start(self, username: str, task_id: str, run: Callable[[], Awaitable[None]]) -> None:
+        self.running[username] = self.running.get(username, 0) + 1
+        task = asyncio.get_running_loop().create_task(self._run(username, task_id, run))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def _run(self, username: str, task_id: str, run: Callable[[], Awaitable[None]]) -> None:
+        started = time.monotonic()
+        try:
+            await run()
+        except Exception as e:
+            print(f"Agent run {task_id} failed: {e}")
+        finally:
+            self.avg_run_seconds = 0.8 * self.avg_run_seconds + 0.2 * (time.monotonic() - started)
+            self.running[username] -= 1
+            if self.running[username] <= 0:
+                del self.running[username]
+            self._dispatch()
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running_total,
+            "queued": self.queued,
+            "users_waiting": len(self.queues),
+            "max_running": self.max_running,
+            "max_queued": self.max_queued,
+            "avg_run_seconds": round(self.avg_run_seconds, 1),
+            "rejected": self.rejected,
+        }
+
+
+# Global admission controller for agent runs in this process
+admission_controller = AdmissionController()
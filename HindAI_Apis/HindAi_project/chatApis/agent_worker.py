@@ -0,0 +1,116 @@
+"""
+Agent worker process: claims run-agent jobs from the local job queue and runs
+process_agent_request, publishing progress through task_manager exactly like
+the in-process path. Started by `python manage.py run_agent_workers`.
+
+Heartbeats are sent from a dedicated thread, so a tool that blocks the event
+loop for longer than AGENT_JOB_VISIBILITY_TIMEOUT does not let another worker
+reclaim (and re-run and re-charge) a job that is still running.
+"""
+import asyncio
+import json
+import os
+import signal
+import socket
+import threading
+import uuid
+from typing import Dict
+
+from .cancellation import cancellation_registry
+from .job_queue import agent_job_queue
+
+AGENT_WORKER_POLL_INTERVAL = float(os.getenv("AGENT_WORKER_POLL_INTERVAL", "0.5"))
+AGENT_WORKER_HEARTBEAT_INTERVAL = float(os.getenv("AGENT_WORKER_HEARTBEAT_INTERVAL", "15"))
+AGENT_WORKER_SHUTDOWN_GRACE = float(os.getenv("AGENT_WORKER_SHUTDOWN_GRACE", "120"))
+
+
+async def run_worker(worker_id: str, concurrency: int) -> None:
+    # the agent stack is imported in the worker, not in the process that spawns it
+    from .responses import RunAgentRequest, process_agent_request
+    from .task_manager import task_manager
+
+    # cancels of this worker's runs arrive through the job row, see job_queue
+    cancellation_registry.cancel_flags = agent_job_queue.cancel_requested
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):  # Windows
+            signal.signal(sig, lambda *_: loop.call_soon_threadsafe(stop.set))
+
+    running: Dict[str, asyncio.Task] = {}
+
+    heartbeats_stopped = threading.Event()
+
+    def heartbeats():
+        while not heartbeats_stopped.wait(AGENT_WORKER_HEARTBEAT_INTERVAL):
+            task_ids = list(running.copy())  # dict.copy is atomic, the loop thread may be adding jobs
+            if task_ids:
+                try:
+                    agent_job_queue.heartbeat(task_ids, worker_id)
+                except Exception as e:
+                    print(f"Worker {worker_id}: heartbeat failed: {e}")
+
+    async def execute(job):
+        task_id = job["task_id"]
+        try:
+            task = task_manager.get_task(task_id)
+            if task is None:
+                # the task record expired while the job waited; start a fresh one
+                task = {"reasoning_stream": [], "final_response": None, "cancelled": False}
+                task_manager.save_task(task_id, task)
+            if task.get("cancelled") or job["cancel_requested"]:
+                task_manager.update_task(task_id, {"status": "cancelled"})
+                agent_job_queue.complete(task_id, worker_id)
+                return
+            task_manager.update_task(task_id, {"status": "processing", "worker_id": worker_id,
+                                               "attempt": job["attempts"]})
+            request = RunAgentRequest(**json.loads(job["payload"]))
+            await cancellation_registry.run(task_id, process_agent_request(request=request, task_id=task_id))
+            agent_job_queue.complete(task_id, worker_id)
+        except Exception as e:
+            print(f"Worker {worker_id}: job {task_id} failed: {e}")
+            if agent_job_queue.fail(task_id, worker_id, str(e)):
+                task_manager.update_task(task_id, {"status": "queued"})
+            else:
+                task_manager.update_task(task_id, {"status": "error", "error": f"Unexpected error occurred: {str(e)[:100]}..."})
+        finally:
+            running.pop(task_id, None)
+
+    heartbeat_thread = threading.Thread(target=heartbeats, name=f"heartbeats-{worker_id}", daemon=True)
+    heartbeat_thread.start()
+    print(f"Agent worker {worker_id} started (concurrency {concurrency})")
+    try:
+        while not stop.is_set():
+            for task_id in agent_job_queue.exhausted():
+                task_manager.update_task(task_id, {
+                    "status": "error",
+                    "error": "The worker running this request stopped, please try again"
+                })
+            while len(running) < concurrency and not stop.is_set():
+                job = agent_job_queue.claim(worker_id)
+                if job is None:
+                    break
+                running[job["task_id"]] = asyncio.create_task(execute(job))
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=AGENT_WORKER_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+        if running:
+            print(f"Agent worker {worker_id} stopping, waiting for {len(running)} running jobs")
+            # unfinished jobs stop sending heartbeats and are picked up by another worker
+            await asyncio.wait(list(running.values()), timeout=AGENT_WORKER_SHUTDOWN_GRACE)
+    finally:
+        heartbeats_stopped.set()
+    print(f"Agent worker {worker_id} stopped")
+
+
+def worker_main(index: int, concurrency: int) -> None:
+    """Entry point of one worker process."""
+    from django_init import setup_django
+    setup_django()
+    worker_id = f"{socket.gethostname()}-{os.getpid()}-{index}-{uuid.uuid4().hex[:6]}"
+    asyncio.run(run_worker(worker_id, concurrency))
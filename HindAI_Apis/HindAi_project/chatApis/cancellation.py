@@ -0,0 +1,91 @@
+"""
+Cancellation registry for running agent tasks.
+
+Every agent run executes as an asyncio Task registered under its task_id.
+Cancelling it raises CancelledError at whatever the run is awaiting (the LLM
+request inside agent.arun, an async tool call, a retry sleep), so the upstream
+HTTP request is dropped and no later stage starts or bills.
+
+Cancel requests handled by this process cancel the Task directly. Runs in
+other processes are cancelled by a watcher that polls every
+CANCEL_POLL_INTERVAL seconds: by default the task store's "cancelled" flag
+(other API workers), in agent workers the job queue row, since the worker's
+own task store writes can overwrite a flag set by the API process.
+"""
+import asyncio
+import os
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Set
+
+from .task_manager import task_manager
+
+CANCEL_POLL_INTERVAL = float(os.getenv("CANCEL_POLL_INTERVAL", "1"))
+
+
+class CancellationRegistry:
+    def __init__(self, poll_interval: float = CANCEL_POLL_INTERVAL):
+        self.poll_interval = poll_interval
+        self.tasks: Dict[str, asyncio.Task] = {}
+        self.requested: Set[str] = set()
+        self.watcher: Optional[asyncio.Task] = None
+        # Returns which of the given task_ids another process asked to cancel
+        self.cancel_flags: Callable[[Iterable[str]], Set[str]] = self._task_store_flags
+
+    async def run(self, task_id: str, coro: Awaitable) -> None:
+        """Run an agent coroutine as a cancellable Task; a requested cancel ends it as "cancelled"."""
+        task = asyncio.ensure_future(coro)
+        self.tasks[task_id] = task
+        self._ensure_watcher()
+        try:
+            await task
+        except asyncio.CancelledError:
+            if task_id not in self.requested:
+                raise  # the caller itself is being cancelled (shutdown)
+            print(f"Task {task_id} cancelled while running")
+            task_manager.update_task(task_id, {"status": "cancelled", "cancelled": True})
+        finally:
+            self.tasks.pop(task_id, None)
+            self.requested.discard(task_id)
+
+    def cancel(self, task_id: str) -> bool:
+        """Cancel a run owned by this process; False if it is not running here."""
+        task = self.tasks.get(task_id)
+        if task is None or task.done():
+            return False
+        self.requested.add(task_id)
+        task.cancel()
+        return True
+
+    def _ensure_watcher(self) -> None:
+        if self.watcher is None or self.watcher.done():
+            self.watcher = asyncio.get_running_loop().create_task(self._watch())
+
+    async def _watch(self) -> None:
+        """Pick up cancel flags set by other processes for runs owned by this one."""
+        while self.tasks:
+            await asyncio.sleep(self.poll_interval)
+            task_ids = [task_id for task_id in self.tasks if task_id not in self.requested]
+            if not task_ids:
+                continue
+            try:
+                flagged = await asyncio.to_thread(self.cancel_flags, task_ids)
+            except Exception as e:
+                print(f"Error polling cancel requests: {e}")
+                continue
+            for task_id in flagged:
+                self.cancel(task_id)
+
+    @staticmethod
+    def _task_store_flags(task_ids: Iterable[str]) -> Set[str]:
+        flagged = set()
+        for task_id in task_ids:
+            task = task_manager.get_task(task_id)
+            if task and task.get("cancelled"):
+                flagged.add(task_id)
+        return flagged
+
+    def running(self) -> int:
+        return len(self.tasks)
+
+
+# Global cancellation registry for agent runs in this process
+cancellation_registry = CancellationRegistry()
@@ -4,29 +4,29 @@ from fastapi import APIRouter, HTTPException, BackgroundTasks, WebSocket, WebSoc
 from pydantic import BaseModel
 from typing import Optional
 import os
-from fastapi.responses import FileResponse
+from fastapi import Request
+from components.artifact_store import artifact_store, artifact_response
 router = APIRouter()
 
 
 @router.get("/download-md")
-async def download_md(file_path: str):
+async def download_md(file_path: str, request: Request):
     """
     Download a markdown (.md) file by absolute path.
     Query param: file_path=C:/path/to/file.md
+    The file must be inside one of the artifact roots (ARTIFACT_ROOTS).
     """
     try:
-        # Normalize path (handles mixed slashes)
-        normalized_path = os.path.normpath(file_path.strip().strip('"').strip("'"))
-        if not normalized_path.lower().endswith(".md"):
+        root, rel_path = artifact_store.locate(file_path)
+        if not rel_path.lower().endswith(".md"):
             raise HTTPException(status_code=400, detail="Only .md files are allowed")
-        if not os.path.isfile(normalized_path):
-            raise HTTPException(status_code=404, detail="File not found")
-        return FileResponse(
-            path=normalized_path,
-            media_type="text/markdown",
-            filename=os.path.basename(normalized_path)
+        meta = await artifact_store.get(root, rel_path)
+        return artifact_response(
+            request,
+            meta,
+            disposition=f'attachment; filename="{os.path.basename(meta.path)}"'
         )
     except HTTPException:
         raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
@@ -0,0 +1,242 @@
+"""
+Durable local queue for agent runs.
+
+With AGENT_EXECUTION=worker the API process only enqueues run-agent jobs here;
+`python manage.py run_agent_workers` processes consume them. Jobs live in a
+SQLite database (WAL) next to the task store, so they survive restarts of
+either side. A claimed job is kept alive by worker heartbeats; a job whose
+heartbeat is older than AGENT_JOB_VISIBILITY_TIMEOUT (worker crashed or was
+killed) becomes claimable again until AGENT_JOB_MAX_ATTEMPTS is reached.
+Cancels of claimed jobs are signalled through the job row (cancel_requested),
+which the owning worker polls, rather than through the task file both sides
+rewrite.
+Progress and results still go through task_manager, which the streaming and
+result endpoints already read.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+AGENT_EXECUTION = os.getenv("AGENT_EXECUTION", "inline")  # "inline" runs agents in the API process, "worker" queues them
+AGENT_QUEUE_DB = os.getenv("AGENT_QUEUE_DB", "temp_tasks/agent_jobs.db")
+AGENT_JOB_VISIBILITY_TIMEOUT = int(os.getenv("AGENT_JOB_VISIBILITY_TIMEOUT", "90"))  # seconds without heartbeat
+AGENT_JOB_MAX_ATTEMPTS = int(os.getenv("AGENT_JOB_MAX_ATTEMPTS", "2"))
+AGENT_JOB_RETRY_DELAY = int(os.getenv("AGENT_JOB_RETRY_DELAY", "5"))  # seconds before a failed job is retried
+AGENT_JOB_RETENTION = int(os.getenv("AGENT_JOB_RETENTION", "86400"))  # finished jobs are purged after this long
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS agent_jobs (
+    task_id TEXT PRIMARY KEY,
+    username TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    enqueued_at REAL NOT NULL,
+    visible_at REAL NOT NULL,
+    worker_id TEXT,
+    heartbeat_at REAL,
+    finished_at REAL,
+    error TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS agent_jobs_status ON agent_jobs (status, visible_at);
+CREATE INDEX IF NOT EXISTS agent_jobs_user ON agent_jobs (username, status);
+"""
+
+
+class AgentJobQueue:
+    def __init__(self, path: str = AGENT_QUEUE_DB, visibility_timeout: int = AGENT_JOB_VISIBILITY_TIMEOUT,
+                 max_attempts: int = AGENT_JOB_MAX_ATTEMPTS):
+        self.path = path
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(agent_jobs)")}
+            if "cancel_requested" not in columns:  # queue created before cancels went through the row
+                try:
+                    conn.execute("ALTER TABLE agent_jobs ADD COLUMN cancel_requested INTEGER NOT NULL DEFAULT 0")
+                except sqlite3.OperationalError:
+                    pass  # another process added it first
+            self.local.conn = conn
+        return conn
+
+    def enqueue(self, task_id: str, username: str, payload: Dict[str, Any]) -> None:
+        now = time.time()
+        self._conn().execute(
+            "INSERT INTO agent_jobs (task_id, username, payload, enqueued_at, visible_at) VALUES (?, ?, ?, ?, ?)",
+            (task_id, username, json.dumps(payload), now, now),
+        )
+
+    def queued_count(self, username: Optional[str] = None) -> int:
+        if username is None:
+            row = self._conn().execute("SELECT COUNT(*) FROM agent_jobs WHERE status = 'queued'").fetchone()
+        else:
+            row = self._conn().execute(
+                "SELECT COUNT(*) FROM agent_jobs WHERE status = 'queued' AND username = ?", (username,)
+            ).fetchone()
+        return row[0]
+
+    def position(self, task_id: str) -> Optional[int]:
+        """
+        1-based place among waiting jobs in the order claim takes them, None if
+        the job is not waiting (approximate: each claim changes the running counts).
+        """
+        rows = self._conn().execute(
+            """
+            SELECT j.task_id FROM agent_jobs j
+            WHERE j.status = 'queued'
+            ORDER BY (SELECT COUNT(*) FROM agent_jobs r WHERE r.username = j.username AND r.status = 'running'),
+                     j.visible_at
+            """
+        ).fetchall()
+        for index, row in enumerate(rows):
+            if row["task_id"] == task_id:
+                return index + 1
+        return None
+
+    def claim(self, worker_id: str) -> Optional[sqlite3.Row]:
+        """
+        Take the next job: waiting jobs of the user with the fewest running jobs
+        first (oldest first within that), or a running job whose worker stopped
+        sending heartbeats. Returns None when there is nothing to do.
+        """
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                """
+                SELECT j.* FROM agent_jobs j
+                WHERE (j.status = 'queued' AND j.visible_at <= ?)
+                   OR (j.status = 'running' AND j.heartbeat_at < ? AND j.attempts < ?)
+                ORDER BY (SELECT COUNT(*) FROM agent_jobs r WHERE r.username = j.username AND r.status = 'running'),
+                         j.visible_at
+                LIMIT 1
+                """,
+                (now, now - self.visibility_timeout, self.max_attempts),
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            if row["status"] == "running":
+                print(f"Agent job {row['task_id']} lost its worker {row['worker_id']}, reclaiming")
+            conn.execute(
+                "UPDATE agent_jobs SET status = 'running', worker_id = ?, heartbeat_at = ?, attempts = attempts + 1 "
+                "WHERE task_id = ?",
+                (worker_id, now, row["task_id"]),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return conn.execute("SELECT * FROM agent_jobs WHERE task_id = ?", (row["task_id"],)).fetchone()
+
+    def heartbeat(self, task_ids, worker_id: str) -> None:
+        conn = self._conn()
+        now = time.time()
+        conn.executemany(
+            "UPDATE agent_jobs SET heartbeat_at = ? WHERE task_id = ? AND worker_id = ? AND status = 'running'",
+            [(now, task_id, worker_id) for task_id in task_ids],
+        )
+
+    def complete(self, task_id: str, worker_id: str) -> None:
+        self._conn().execute(
+            "UPDATE agent_jobs SET status = 'done', finished_at = ? WHERE task_id = ? AND worker_id = ?",
+            (time.time(), task_id, worker_id),
+        )
+
+    def fail(self, task_id: str, worker_id: str, error: str) -> bool:
+        """Record a failed attempt; returns True if the job will be retried."""
+        conn = self._conn()
+        row = conn.execute("SELECT attempts FROM agent_jobs WHERE task_id = ?", (task_id,)).fetchone()
+        retry = row is not None and row["attempts"] < self.max_attempts
+        if retry:
+            conn.execute(
+                "UPDATE agent_jobs SET status = 'queued', visible_at = ?, worker_id = NULL, error = ? "
+                "WHERE task_id = ? AND worker_id = ?",
+                (time.time() + AGENT_JOB_RETRY_DELAY, error, task_id, worker_id),
+            )
+        else:
+            conn.execute(
+                "UPDATE agent_jobs SET status = 'failed', finished_at = ?, error = ? WHERE task_id = ? AND worker_id = ?",
+                (time.time(), error, task_id, worker_id),
+            )
+        return retry
+
+    def exhausted(self) -> list:
+        """Orphaned jobs that already used every attempt; they are marked failed and returned."""
+        conn = self._conn()
+        cutoff = time.time() - self.visibility_timeout
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute(
+                "SELECT task_id FROM agent_jobs WHERE status = 'running' AND heartbeat_at < ? AND attempts >= ?",
+                (cutoff, self.max_attempts),
+            ).fetchall()
+            conn.executemany(
+                "UPDATE agent_jobs SET status = 'failed', finished_at = ?, error = 'worker lost' WHERE task_id = ?",
+                [(time.time(), row["task_id"]) for row in rows],
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return [row["task_id"] for row in rows]
+
+    def cancel(self, task_id: str) -> bool:
+        """Remove a job that no worker has picked up yet."""
+        cursor = self._conn().execute("DELETE FROM agent_jobs WHERE task_id = ? AND status = 'queued'", (task_id,))
+        return cursor.rowcount > 0
+
+    def request_cancel(self, task_id: str) -> bool:
+        """Ask the worker owning a job to cancel it; False if the job is no longer queued or running."""
+        cursor = self._conn().execute(
+            "UPDATE agent_jobs SET cancel_requested = 1 WHERE task_id = ? AND status IN ('queued', 'running')",
+            (task_id,),
+        )
+        return cursor.rowcount > 0
+
+    def cancel_requested(self, task_ids) -> set:
+        """The given jobs that have a pending cancel request."""
+        task_ids = list(task_ids)
+        if not task_ids:
+            return set()
+        rows = self._conn().execute(
+            f"SELECT task_id FROM agent_jobs WHERE cancel_requested = 1 AND task_id IN ({', '.join('?' * len(task_ids))})",
+            task_ids,
+        ).fetchall()
+        return {row["task_id"] for row in rows}
+
+    def purge(self, older_than: int = AGENT_JOB_RETENTION) -> int:
+        cursor = self._conn().execute(
+            "DELETE FROM agent_jobs WHERE status IN ('done', 'failed') AND finished_at < ?",
+            (time.time() - older_than,),
+        )
+        return cursor.rowcount
+
+    def stats(self) -> dict:
+        rows = self._conn().execute("SELECT status, COUNT(*) FROM agent_jobs GROUP BY status").fetchall()
+        counts = {row[0]: row[1] for row in rows}
+        workers = self._conn().execute(
+            "SELECT COUNT(DISTINCT worker_id) FROM agent_jobs WHERE status = 'running' AND heartbeat_at >= ?",
+            (time.time() - self.visibility_timeout,),
+        ).fetchone()[0]
+        return {"queued": counts.get("queued", 0), "running": counts.get("running", 0),
+                "done": counts.get("done", 0), "failed": counts.get("failed", 0), "busy_workers": workers}
+
+
+# Global job queue instance (each thread gets its own SQLite connection)
+agent_job_queue = AgentJobQueue()
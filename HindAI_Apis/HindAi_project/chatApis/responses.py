@@ -1,15 +1,21 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, Request, Response
 from pydantic import BaseModel
 from typing import Optional
 
 import asyncio
+import time
 import uuid
-from asyncio import create_task
 import sys
 import os
 
 # Import the new task manager
 from .task_manager import task_manager
+from .task_artifacts import task_reasoning, write_markdown_artifacts
+from .admission import admission_controller, QueueFull, MAX_QUEUED_AGENT_RUNS, MAX_QUEUED_RUNS_PER_USER
+from .job_queue import AGENT_EXECUTION, agent_job_queue
+from .cancellation import cancellation_registry
+from .stage_pipeline import Stage, run_stages
+from .retry_policy import RequestDeadline, backoff_sleep
 # Add this import with your other imports
 from dotenv import load_dotenv
 sys.path.append("D:/finsocial/Multi model adding for the trading")
@@ -19,6 +25,7 @@ from components.generate_unique_chat_id import generate_unique_id, sanitize_chat
 from components.language_check import language_check
 from components.google_search_tools import get_google_Search_tools
 from components.translator import LanguageTranslator
+from components.tracing import tracer
 from agents.reasioning_agent import get_detailed_reasoning
 # from agents.minimizing_reasioning_agent import show_reasoning_finals
 from .userchat_data import get_userchats, read_json_file,get_chat_content,get_chat_content_for_token
@@ -37,10 +44,15 @@ REASONING_TIMEOUT = 60  # Increased from 30 to 60 seconds
 TRANSLATION_TIMEOUT = 20  # Increased from 15 to 20 seconds
 AGENT_TIMEOUT = 150  # Increased from 120 to 150 seconds
 MCP_TIMEOUT = 15  # Increased from 10 to 15 seconds
+REQUEST_DEADLINE = int(os.getenv("REQUEST_DEADLINE", "600"))  # overall budget for one agent request, retries included
+LATENCY_REASONING_DEADLINE = int(os.getenv("LATENCY_REASONING_DEADLINE", "20"))  # reasoning budget in "latency" pipeline mode
 
 
 router = APIRouter()
 
+# markdown exports are written once, when a task is marked completed
+task_manager.finalizer = write_markdown_artifacts
+
 # Define a request model for the input parameters
 class RunAgentRequest(BaseModel):
     username: str = 'user'
@@ -57,6 +69,8 @@ class RunAgentRequest(BaseModel):
     google_search: str = 'n'
     deep_google_search: str = 'n'
     current_time: str = '2025-08-01T00:00:00Z'
+    # "standard" keeps the reasoning retry loop, "latency" starts the final answer as soon as possible
+    pipeline_mode: str = 'standard'
     
 
 # Add the TaskResponse model
@@ -78,10 +92,224 @@ def get_token_prices(backend_model_name):
         return None
 
 
+async def charge_credits(task_id: str, stage: str, deduct_request: DeductCreditsRequest):
+    """
+    Deduct credits for one billed stage and record it on the task under "billing".
+    The deduction is shielded: once started it finishes and is recorded even if
+    the task is cancelled meanwhile, so the ledger matches what was charged.
+    """
+    async def deduct_and_record():
+        with tracer.span("credit_deduction", stage=stage, amount=deduct_request.amount):
+            result = await deduct_credits(deduct_request)
+        task = task_manager.get_task(task_id) or {}
+        billing = task.get("billing", []) + [{"stage": stage, "amount": deduct_request.amount}]
+        task_manager.update_task(task_id, {"billing": billing})
+        return result
+
+    return await asyncio.shield(deduct_and_record())
+
+
+async def run_pre_agent_stages(request: RunAgentRequest, task_id: str, translator, with_billing: bool) -> dict:
+    """
+    Run the pre-agent steps (user check, prompt translation, chat history,
+    model selection or pricing + input credit deduction) as a dependency-aware
+    pipeline, so independent I/O runs concurrently. Per-stage timings are
+    stored on the task record under "stage_timings".
+    """
+
+    async def check_user(results):
+        return await get_user_connections(request.username)
+
+    async def translate_input(results):
+        if language_check(request.language_code) == False:
+            translated = await asyncio.wait_for(
+                translator.translate_text_async(
+                    text=request.message,
+                    source_lang=request.language_code,
+                    target_lang='eng_Latn'
+                ),
+                timeout=TRANSLATION_TIMEOUT
+            )
+            print("change the prompt to english")
+            return translated
+        print("prompt is already in english")
+        return request.message
+
+    async def load_chat_history(results):
+        # Generate chat ID if needed
+        if request.chat_id == 'new':
+            return {"chat_id": sanitize_chat_id(generate_unique_id()), "history_tokens": 0}
+        chat_content = await asyncio.to_thread(get_chat_content_for_token, request.username, request.chat_id)
+        history_tokens = count_tokens(str(chat_content)) if with_billing else 0
+        return {"chat_id": request.chat_id, "history_tokens": history_tokens}
+
+    async def select_models(results):
+        with tracer.span("model_selection", reasoning_model=request.reasoning_model_name, final_model=request.model_name):
+            return await choose_models(
+                username = request.username,
+                reasoning_model_platform=request.api_reasoning_platform,
+                final_model_platform=request.api_final_model_platform,
+                reasoning_model_name=request.reasoning_model_name,
+                final_model_name=request.model_name,
+                reasoning=request.reasoning
+            )
+
+    async def reasoning_prices(results):
+        return await get_token_prices(request.reasoning_model_name)
+
+    async def final_prices(results):
+        return await get_token_prices(request.model_name)
+
+    async def deduct_input_credits(results):
+        if results["user"] == False:
+            return None
+        # saving the tokens informations for the both reasoning input and output tokens 
+        per_token_res_input_price = results["reasoning_prices"]['input_price_per_token'] / 10
+        get_input_token_counts = count_tokens(request.message) + results["chat_history"]["history_tokens"]
+        try:
+            deduct_request = DeductCreditsRequest(
+                username=request.username,
+                amount=get_input_token_counts * per_token_res_input_price  # your calculated amount
+                )
+            credit_result = await charge_credits(task_id, "reasoning_input", deduct_request)
+            print(f"Deducted credits for reasoning input: {credit_result}")
+            return credit_result
+        except Exception as e:
+            if "insufficient credits" in str(e).lower():
+                return "insufficient_credits"
+            return None
+
+    stages = [
+        Stage("user", check_user),
+        Stage("translate_input", translate_input),
+        Stage("chat_history", load_chat_history),
+    ]
+    if with_billing:
+        stages += [
+            Stage("reasoning_prices", reasoning_prices),
+            Stage("final_prices", final_prices),
+            Stage("input_credits", deduct_input_credits, depends_on=("user", "chat_history", "reasoning_prices")),
+        ]
+    else:
+        stages.append(Stage("models", select_models))
+
+    timings = {}
+    pipeline_start = asyncio.get_running_loop().time()
+    try:
+        results = await run_stages(stages, timings)
+    finally:
+        timings["total"] = round(asyncio.get_running_loop().time() - pipeline_start, 4)
+        task_manager.update_task(task_id, {"stage_timings": timings})
+    print(f"Pre-agent stage timings for task {task_id}: {timings}")
+    return results
+
+
+async def generate_reasoning(request: RunAgentRequest, request_message: str, chat_id: str, task_id: str, model_config, deadline: RequestDeadline):
+    """
+    Produce the reasoning text handed to the final-answer agent.
+
+    In "latency" mode the reasoning call gets one attempt raced against
+    LATENCY_REASONING_DEADLINE and the final answer starts with whatever is
+    available. In "standard" mode failed attempts are retried with jittered
+    backoff while the request deadline allows it.
+
+    Returns None when the task has already been finalized (bad credentials).
+    """
+    if request.reasoning != True:
+        return 'No reasoning for this request'
+
+    timeout_fallback = f"Analyzing the user's question: '{request.message}'. This appears to be a request that requires careful consideration of the context and appropriate response generation."
+    error_fallback = f"Processing user request: '{request.message}'. Generating appropriate response based on available context."
+    if request.api == 'yes' and model_config is None:
+        print(f"No reasoning model available for task {task_id}, using fallback reasoning")
+        return error_fallback
+
+    async def reasoning_call():
+        # reasoning_model, question, chat_id , username,current_time,base_path
+        with tracer.span("reasoning_llm", model=request.reasoning_model_name):
+            return await get_detailed_reasoning(
+                reasoning_model = request.reasoning_model_name,
+                question =request_message, 
+                chat_id=str(chat_id),
+                username=request.username,
+                current_time=request.current_time,
+                base_path=base_path_for_chat,
+                api = request.api,
+                model_config = model_config
+            )
+
+    def finalize_on_bad_credentials(e: BaseException) -> bool:
+        """Complete the task with the bad-API message when e is an auth failure; True if it was."""
+        print(f"Error in get_detailed_reasoning: {str(e)}")
+        if 'no auth credentials found' not in str(e).lower():
+            return False
+        task_manager.update_task(task_id, {
+            "username": request.username,
+            "status": "completed",
+            "final_response": "Provided API is not correct check your api again",
+            "reasoning_stream": [
+                "The provider rejected the API credentials, so no reasoning could be generated. Please check your API key and try again."
+            ]
+        })
+        return True
+
+    if request.pipeline_mode == 'latency':
+        reasoning_task = asyncio.create_task(reasoning_call())
+        try:
+            done, _ = await asyncio.wait({reasoning_task}, timeout=deadline.timeout(LATENCY_REASONING_DEADLINE))
+        except asyncio.CancelledError:
+            reasoning_task.cancel()  # asyncio.wait does not cancel what it waits on
+            raise
+        if reasoning_task in done and not reasoning_task.cancelled():
+            error = reasoning_task.exception()
+            if error is None:
+                print(f"Reasoning generation successful for task {task_id}")
+                return reasoning_task.result()
+            if finalize_on_bad_credentials(error):
+                return None
+            print(f"Reasoning generation error for task {task_id}, starting final answer with fallback reasoning")
+            return error_fallback
+        reasoning_task.cancel()
+        print(f"Reasoning not ready within {LATENCY_REASONING_DEADLINE}s for task {task_id}, starting final answer with fallback reasoning")
+        return timeout_fallback
+
+    max_reasoning_retries = 2
+    for reasoning_attempt in range(max_reasoning_retries + 1):
+        try:
+            print(f"Starting reasoning attempt {reasoning_attempt + 1}/{max_reasoning_retries + 1} for task {task_id}")
+            get_reasonings = await asyncio.wait_for(
+                reasoning_call(),
+                timeout=deadline.timeout(REASONING_TIMEOUT)
+            )
+            print(f"Reasoning generation successful for task {task_id}")
+            return get_reasonings
+
+        except asyncio.TimeoutError:
+            print(f"Reasoning timeout on attempt {reasoning_attempt + 1} for task {task_id}")
+            if reasoning_attempt < max_reasoning_retries and await backoff_sleep(reasoning_attempt, deadline):
+                print(f"Retrying reasoning for task {task_id}...")
+                continue
+            # Final fallback - use a simple reasoning
+            print(f"Using fallback reasoning for task {task_id}")
+            return timeout_fallback
+
+        except Exception as e:
+            if finalize_on_bad_credentials(e):
+                return None
+            print(f"Reasoning generation error on attempt {reasoning_attempt + 1}: {str(e)}")
+            if reasoning_attempt < max_reasoning_retries and await backoff_sleep(reasoning_attempt, deadline):
+                continue
+            # Use fallback reasoning
+            return error_fallback
+    return error_fallback
+
+
 @router.post("/run-agent")
-async def run_agent_endpoint(request: RunAgentRequest, background_tasks: BackgroundTasks):
+async def run_agent_endpoint(request: RunAgentRequest):
     """
     Endpoint to start the agent process in the background and return a task ID.
+    Runs go through the admission controller: they start when a slot is free,
+    wait in a per-user fair queue otherwise, and get a 429 when the queue is full.
     
     Args:
         request: JSON payload containing all required parameters.
@@ -95,35 +323,72 @@ async def run_agent_endpoint(request: RunAgentRequest, background_tasks: Backgro
 
         # Initialize task status using task manager
         initial_task_data = {
-            "status": "processing",
+            "status": "queued",
             "reasoning_stream": [],
             "final_response": None,
-            "cancelled": False
+            "cancelled": False,
+            "queued_at": time.time()
         }
         task_manager.save_task(task_id, initial_task_data)
         
-        # Start processing in background
-        background_tasks.add_task(
-            process_agent_request, 
-            request=request, 
-            task_id=task_id
-        )
+        if AGENT_EXECUTION == "worker":
+            # agent worker processes pick the job up from the local queue
+            if agent_job_queue.queued_count() >= MAX_QUEUED_AGENT_RUNS or \
+                    agent_job_queue.queued_count(request.username) >= MAX_QUEUED_RUNS_PER_USER:
+                task_manager.delete_task(task_id)
+                raise HTTPException(status_code=429, detail="Server is busy, too many requests are waiting",
+                                    headers={"Retry-After": str(admission_controller.retry_after(agent_job_queue.queued_count()))})
+            agent_job_queue.enqueue(task_id, request.username, request.model_dump())
+            return TaskResponse(task_id=task_id, status="queued")
+        
+        async def run_admitted():
+            task_manager.update_task(task_id, {"status": "processing"})
+            await cancellation_registry.run(task_id, process_agent_request(request=request, task_id=task_id))
+        
+        try:
+            position = admission_controller.submit(request.username, task_id, run_admitted)
+        except QueueFull as e:
+            task_manager.delete_task(task_id)
+            raise HTTPException(status_code=429, detail=e.reason, headers={"Retry-After": str(e.retry_after)})
         
         # Return task ID immediately
-        return TaskResponse(task_id=task_id, status="processing")
+        return TaskResponse(task_id=task_id, status="queued" if position else "processing")
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error occurred: {str(e)}")
 
 async def process_agent_request(request: RunAgentRequest, task_id: str):
-    """Background task to process the agent request."""
+    """
+    Background task to process the agent request, traced as one trace per task.
+    The span summary is stored on the task under "trace".
+    """
+    trace = None
+    try:
+        with tracer.trace(task_id, pipeline_mode=request.pipeline_mode, reasoning=request.reasoning,
+                          model=request.model_name) as trace:
+            task = task_manager.get_task(task_id) or {}
+            if task.get("queued_at"):
+                tracer.record("queue_wait", task["queued_at"], time.time())
+            await run_agent_pipeline(request, task_id)
+    finally:
+        if trace is not None:
+            task_manager.update_task(task_id, {"trace": trace.summary()})
+
+async def run_agent_pipeline(request: RunAgentRequest, task_id: str):
+    """Run the agent request end to end, publishing progress through task_manager."""
+    deadline = RequestDeadline(REQUEST_DEADLINE)
     
     if request.api == 'yes':
         print("yes")
         try:
 
+            translator = LanguageTranslator()
+            pre_agent = await run_pre_agent_stages(request, task_id, translator, with_billing=False)
+
             # check if username is available or not
-            if await get_user_connections(request.username) == False:
+            if pre_agent["user"] == False:
                 task_manager.update_task(task_id, {
                     "username": request.username,
                     "status": "completed",
@@ -131,116 +396,18 @@ async def process_agent_request(request: RunAgentRequest, task_id: str):
                     "final_response": "current user is not available"
                 })
                 return
-             
-            translator = LanguageTranslator()
-            check_code = language_check(request.language_code)
-            if check_code == False:
-                request_message = await asyncio.wait_for(
-                        translator.translate_text_async(
-                            text=request.message, 
-                            source_lang=request.language_code,
-                            target_lang='eng_Latn'
-                        ),
-                        timeout=TRANSLATION_TIMEOUT
-                    )
-                print("change the prompt to english")
-            else:
-                print("prompt is already in english")
-                request_message = request.message
-                
-            
-            # Generate chat ID if needed
-            if request.chat_id == 'new':
-                chat_id = generate_unique_id()
-                chat_id = sanitize_chat_id(chat_id)
-                
-            else:
-                get_The_chat_Conetent = get_chat_content_for_token(request.username, request.chat_id)
-                chat_id = request.chat_id
+
+            request_message = pre_agent["translate_input"]
+            chat_id = pre_agent["chat_history"]["chat_id"]
+            selected_models = pre_agent["models"]
 
             # Store chat_id in task
             task_manager.update_task(task_id, {"chat_id": chat_id})
             # Get reasoning with timeout and retry logic
-            max_reasoning_retries = 2
-            get_reasonings = None
             get_enable_disable = request.reasoning
-
-
-            # getting the reasoning models
-
-            selected_models = await choose_models(
-                username = request.username,
-                reasoning_model_platform=request.api_reasoning_platform,
-                final_model_platform=request.api_final_model_platform,
-                reasoning_model_name=request.reasoning_model_name,
-                final_model_name=request.model_name,
-                reasoning=request.reasoning
-            )
-
-
-
-
-            for reasoning_attempt in range(max_reasoning_retries + 1):
-                try:
-                    print(f"Starting reasoning attempt {reasoning_attempt + 1}/{max_reasoning_retries + 1} for task {task_id}")
-                    # reasoning_model, question, chat_id , username,current_time,base_path
-                    if get_enable_disable ==  True:
-                        get_reasonings = await asyncio.wait_for(
-                            get_detailed_reasoning(
-                                reasoning_model = request.reasoning_model_name,
-                                question =request_message, 
-                                chat_id=str(chat_id),
-                                username=request.username,
-                                current_time=request.current_time,
-                                base_path=base_path_for_chat,
-                                api = request.api,
-                                model_config = selected_models["reasoning_model"]
-                            ),
-                            timeout=REASONING_TIMEOUT
-                        )
-   
-                        print(f"Reasoning generation successful for task {task_id}")
-                    
-                        break  # Success, exit retry loop
-                    else:
-                        get_reasonings = 'No reasoning for this request'
-                        break  # No reasoning needed, exit loop
-                    
-                except asyncio.TimeoutError:
-                    print(f"Reasoning timeout on attempt {reasoning_attempt + 1} for task {task_id}")
-                    if reasoning_attempt < max_reasoning_retries:
-                        print(f"Retrying reasoning in 3 seconds...")
-                        await asyncio.sleep(3)
-                        continue
-                    else:
-                        # Final fallback - use a simple reasoning
-                        print(f"Using fallback reasoning for task {task_id}")
-                        
-                        get_reasonings = f"Analyzing the user's question: '{request.message}'. This appears to be a request that requires careful consideration of the context and appropriate response generation."
-                        break
-                        
-                except Exception as e:
-                    print(f"Error in get_detailed_reasoning: {str(e)}")
-                    error_msg = str(e).lower()
-                    if 'No auth credentials found' in error_msg:
-                        print("I am herre in respomse")
-                        task_manager.update_task(task_id, {
-                            "username": request.username,
-                            "status": "completed",
-                            "final_response": "Provided API is not correct check your api again",
-                            "reasoning_stream": [
-                                "Insufficient credits to complete the final answer generation. Please add credits and try again."
-                            ]
-                        })
-                        return
-                    print(f"Reasoning generation error on attempt {reasoning_attempt + 1}: {str(e)}")
-                    if reasoning_attempt < max_reasoning_retries:
-                        await asyncio.sleep(2)
-                        continue
-                    else:
-                        # Use fallback reasoning
-                        get_reasonings = f"Processing user request: '{request.message}'. Generating appropriate response based on available context."
-                        break
+            get_reasonings = await generate_reasoning(request, request_message, chat_id, task_id, selected_models.get("reasoning_model"), deadline)
+            if get_reasonings is None:
+                return
             
             if get_reasonings == "Provided API is not correct check your api again_secretkey_to_remove_anyother_type_of_the_confusion123454645451215451545":
                 task_manager.update_task(task_id, {
@@ -269,7 +436,11 @@ async def process_agent_request(request: RunAgentRequest, task_id: str):
                 
             check_code = language_check(request.language_code)
             show_res = get_reasonings
-            if check_code == False:
+            if check_code == False and request.pipeline_mode == 'latency' and get_enable_disable != True:
+                # placeholder reasoning, nothing worth translating before the final answer starts
+                get_trans_reasonings = show_res
+                task_manager.update_task(task_id, {"translated_reasoning": show_res})
+            elif check_code == False:
                 try:
                     get_trans_reasonings = await asyncio.wait_for(
                         translator.translate_text_async(
@@ -316,7 +487,6 @@ async def process_agent_request(request: RunAgentRequest, task_id: str):
                 
             # Generate final response with enhanced timeout and retry handling
             max_retries = 3  # Increased retries
-            retry_delay = 3  # Increased delay
             
             for attempt in range(max_retries + 1):
                 try:
@@ -377,7 +547,7 @@ async def process_agent_request(request: RunAgentRequest, task_id: str):
                     
                     result = await asyncio.wait_for(
                         run_agent_with_mcp_handling(),
-                        timeout=AGENT_TIMEOUT
+                        timeout=deadline.timeout(AGENT_TIMEOUT)
                     )
                     
                     print(f"Agent call successful for task {task_id}")
@@ -386,9 +556,8 @@ async def process_agent_request(request: RunAgentRequest, task_id: str):
                 except asyncio.TimeoutError:
                     error_message = f"Request timed out after {AGENT_TIMEOUT} seconds on attempt {attempt + 1}"
                     print(f"AsyncIO timeout on attempt {attempt + 1} for task {task_id}")
-                    if attempt < max_retries:
-                        print(f"Retrying in {retry_delay} seconds...")
-                        await asyncio.sleep(retry_delay)
+                    if attempt < max_retries and await backoff_sleep(attempt, deadline):
+                        print(f"Retrying agent call for task {task_id}...")
                         continue
                     else:
                         task_manager.update_task(task_id, {
@@ -413,9 +582,8 @@ async def process_agent_request(request: RunAgentRequest, task_id: str):
                         "failed to get mcp tools",
                         "connection error"
                     ]):
-                        if attempt < max_retries:
-                            print(f"Timeout/MCP error, retrying in {retry_delay} seconds...")
-                            await asyncio.sleep(retry_delay)
+                        if attempt < max_retries and await backoff_sleep(attempt, deadline):
+                            print(f"Timeout/MCP error, retrying agent call for task {task_id}...")
                             continue
                         else:
                             task_manager.update_task(task_id, {
@@ -470,8 +638,13 @@ async def process_agent_request(request: RunAgentRequest, task_id: str):
         try:
             print("i am not here")
             print("API details ")
+            # Initialize the translator
+            # we have translated the user prompt to english if the language code is not english
+            translator = LanguageTranslator()
+            pre_agent = await run_pre_agent_stages(request, task_id, translator, with_billing=True)
+
             # check if username is available or not
-            if await get_user_connections(request.username) == False:
+            if pre_agent["user"] == False:
                 task_manager.update_task(task_id, {
                     "status": "completed",
                     "reasoning_stream": ["current user is not available"],
@@ -480,139 +653,36 @@ async def process_agent_request(request: RunAgentRequest, task_id: str):
                 return
                 
             get_enable_disable = request.reasoning
-            get_res_mode = request.reasoning_model_name
-            get_final_answer_model = request.model_name
-            get_res_mode_credit = await get_token_prices(get_res_mode)
-            get_final_answer_model_credit = await get_token_prices(get_final_answer_model)
+            get_res_mode_credit = pre_agent["reasoning_prices"]
+            get_final_answer_model_credit = pre_agent["final_prices"]
             # per_token_pricing calculating 
-            per_token_res_input_price = get_res_mode_credit['input_price_per_token'] / 10
             per_token_final_answer_input_price = get_final_answer_model_credit['input_price_per_token'] / 10       
             per_token_res_output_price = get_res_mode_credit['output_price_per_token'] / 10
             per_token_final_answer_output_price = get_final_answer_model_credit['output_price_per_token'] / 10
-            # Initialize the translator
-            # we have translated the user prompt to english if the language code is not english
-            translator = LanguageTranslator()
-            check_code = language_check(request.language_code)
-            if check_code == False:
-                request_message = await asyncio.wait_for(
-                        translator.translate_text_async(
-                            text=request.message, 
-                            source_lang=request.language_code,
-                            target_lang='eng_Latn'
-                        ),
-                        timeout=TRANSLATION_TIMEOUT
-                    )
-                print("change the prompt to english")
-            else:
-                print("prompt is already in english")
-                request_message = request.message
-                
-            
-            # Generate chat ID if needed
-            if request.chat_id == 'new':
-                total_token_from_previous_chat =0
-                chat_id = generate_unique_id()
-                chat_id = sanitize_chat_id(chat_id)
-                
-            else:
-                get_The_chat_Conetent = get_chat_content_for_token(request.username, request.chat_id)
-                total_token_from_previous_chat = count_tokens(str(get_The_chat_Conetent))
-                chat_id = request.chat_id
+            request_message = pre_agent["translate_input"]
+            chat_id = pre_agent["chat_history"]["chat_id"]
+            total_token_from_previous_chat = pre_agent["chat_history"]["history_tokens"]
 
             # Store chat_id in task
             task_manager.update_task(task_id, {"chat_id": chat_id})
-            
 
-            # saving the tokens informations for the both reasoning input and output tokens 
-            get_input_token_counts = count_tokens(request.message) + total_token_from_previous_chat
-            get_res_mode_input_token_price = get_input_token_counts * per_token_res_input_price  
-            try: 
-                deduct_request = DeductCreditsRequest(
-                    username=request.username,
-                    amount=get_res_mode_input_token_price  # your calculated amount
-                    )
-                credit_result = await deduct_credits(deduct_request)
-                print(f"Deducted credits for reasoning input: {credit_result}")
-            except Exception as e:
-                err = str(e)
-                if "insufficient credits" in err.lower():
-                    task_manager.update_task(task_id, {
-                        "username": request.username,
-                        "status": "completed",
-                        "reasoning_stream": [
-                            "Insufficient credits to complete the reasoning generation. Please add credits and try again."
-                        ],
-                        "final_response": "Insufficient credits to complete the final answer generation. Please add credits and try again."
-                    })
-                    return
+            if pre_agent["input_credits"] == "insufficient_credits":
+                task_manager.update_task(task_id, {
+                    "username": request.username,
+                    "status": "completed",
+                    "reasoning_stream": [
+                        "Insufficient credits to complete the reasoning generation. Please add credits and try again."
+                    ],
+                    "final_response": "Insufficient credits to complete the final answer generation. Please add credits and try again."
+                })
+                return
             
             
             # Get reasoning with timeout and retry logic
-            max_reasoning_retries = 2
-            get_reasonings = None
-            
-            for reasoning_attempt in range(max_reasoning_retries + 1):
-                try:
-                    print(f"Starting reasoning attempt {reasoning_attempt + 1}/{max_reasoning_retries + 1} for task {task_id}")
-                    # reasoning_model, question, chat_id , username,current_time,base_path
-                    if get_enable_disable ==  True:
-                        get_reasonings = await asyncio.wait_for(
-                            get_detailed_reasoning(
-                                reasoning_model = request.reasoning_model_name,
-                                question =request_message, 
-                                chat_id=str(chat_id),
-                                username=request.username,
-                                current_time=request.current_time,
-                                base_path=base_path_for_chat,
-                                api=request.api,
-                                model_config=''
-                            ),
-                            timeout=REASONING_TIMEOUT
-                        )
-                        print(f"Reasoning generation successful for task {task_id}")
-                    
-                        break  # Success, exit retry loop
-                    else:
-                        get_reasonings = 'No reasoning for this request'
-                        break  # No reasoning needed, exit loop
-                    
-                except asyncio.TimeoutError:
-                    print(f"Reasoning timeout on attempt {reasoning_attempt + 1} for task {task_id}")
-                    if reasoning_attempt < max_reasoning_retries:
-                        print(f"Retrying reasoning in 3 seconds...")
-                        await asyncio.sleep(3)
-                        continue
-                    else:
-                        # Final fallback - use a simple reasoning
-                        print(f"Using fallback reasoning for task {task_id}")
-                        
-                        get_reasonings = f"Analyzing the user's question: '{request.message}'. This appears to be a request that requires careful consideration of the context and appropriate response generation."
-                        break
-                        
-                except Exception as e:
-                    print(f"Error in get_detailed_reasoning: {str(e)}")
-                    error_msg = str(e).lower()
-                    if 'No auth credentials found' in error_msg:
-                        task_manager.update_task(task_id, {
-                            "username": request.username,
-                            "status": "completed",
-                            "final_response": "Provided API is not correct check your api again",
-                            "reasoning_stream": [
-                                "Insufficient credits to complete the final answer generation. Please add credits and try again."
-                            ]
-                        })
-                        return
-                    print(f"Reasoning generation error on attempt {reasoning_attempt + 1}: {str(e)}")
-                    if reasoning_attempt < max_reasoning_retries:
-                        await asyncio.sleep(2)
-                        continue
-                    else:
-                        # Use fallback reasoning
-                        get_reasonings = f"Processing user request: '{request.message}'. Generating appropriate response based on available context."
-                        break
+            get_reasonings = await generate_reasoning(request, request_message, chat_id, task_id, '', deadline)
+            if get_reasonings is None:
+                return
             
-
-
             if get_reasonings == "Provided API is not correct check your api again_secretkey_to_remove_anyother_type_of_the_confusion123454645451215451545":
                 task_manager.update_task(task_id, {
                     "username": request.username,
@@ -632,7 +702,7 @@ async def process_agent_request(request: RunAgentRequest, task_id: str):
                 username=request.username,
                 amount=get_res_mode_output_token_price  # your calculated amount
                 )
-                credit_result = await deduct_credits(deduct_request)
+                credit_result = await charge_credits(task_id, "reasoning_output", deduct_request)
                 print(f"Deducted credits for reasoning output: {credit_result}")
             except Exception as e:
                 err = str(e)
@@ -659,7 +729,7 @@ async def process_agent_request(request: RunAgentRequest, task_id: str):
                         username=request.username,
                         amount=get_final_answer_model_input_token_price  # your calculated amount
                     )
-                credit_result = await deduct_credits(deduct_request)
+                credit_result = await charge_credits(task_id, "final_input", deduct_request)
                 print(f"Deducted credits for final answer Input_Tokens model input: {credit_result}")
             except Exception as e:
                 err = str(e)
@@ -691,7 +761,11 @@ async def process_agent_request(request: RunAgentRequest, task_id: str):
                 
             check_code = language_check(request.language_code)
             show_res = get_reasonings
-            if check_code == False:
+            if check_code == False and request.pipeline_mode == 'latency' and get_enable_disable != True:
+                # placeholder reasoning, nothing worth translating before the final answer starts
+                get_trans_reasonings = show_res
+                task_manager.update_task(task_id, {"translated_reasoning": show_res})
+            elif check_code == False:
                 try:
                     get_trans_reasonings = await asyncio.wait_for(
                         translator.translate_text_async(
@@ -738,7 +812,6 @@ async def process_agent_request(request: RunAgentRequest, task_id: str):
                 
             # Generate final response with enhanced timeout and retry handling
             max_retries = 3  # Increased retries
-            retry_delay = 3  # Increased delay
             
             for attempt in range(max_retries + 1):
                 try:
@@ -800,7 +873,7 @@ async def process_agent_request(request: RunAgentRequest, task_id: str):
                     
                     result = await asyncio.wait_for(
                         run_agent_with_mcp_handling(),
-                        timeout=AGENT_TIMEOUT
+                        timeout=deadline.timeout(AGENT_TIMEOUT)
                     )
                     
                     print(f"Agent call successful for task {task_id}")
@@ -809,9 +882,8 @@ async def process_agent_request(request: RunAgentRequest, task_id: str):
                 except asyncio.TimeoutError:
                     error_message = f"Request timed out after {AGENT_TIMEOUT} seconds on attempt {attempt + 1}"
                     print(f"AsyncIO timeout on attempt {attempt + 1} for task {task_id}")
-                    if attempt < max_retries:
-                        print(f"Retrying in {retry_delay} seconds...")
-                        await asyncio.sleep(retry_delay)
+                    if attempt < max_retries and await backoff_sleep(attempt, deadline):
+                        print(f"Retrying agent call for task {task_id}...")
                         continue
                     else:
                         task_manager.update_task(task_id, {
@@ -836,9 +908,8 @@ async def process_agent_request(request: RunAgentRequest, task_id: str):
                         "failed to get mcp tools",
                         "connection error"
                     ]):
-                        if attempt < max_retries:
-                            print(f"Timeout/MCP error, retrying in {retry_delay} seconds...")
-                            await asyncio.sleep(retry_delay)
+                        if attempt < max_retries and await backoff_sleep(attempt, deadline):
+                            print(f"Timeout/MCP error, retrying agent call for task {task_id}...")
                             continue
                         else:
                             task_manager.update_task(task_id, {
@@ -884,7 +955,7 @@ async def process_agent_request(request: RunAgentRequest, task_id: str):
                     username=request.username,
                     amount=get_final_answer_model_output_token_price  # your calculated amount
                 )
-                credit_result = await deduct_credits(deduct_request)
+                credit_result = await charge_credits(task_id, "final_output", deduct_request)
             
                 print(f"Deducted credits for final answer Output_Tokens model input: {credit_result}")
             except Exception as e:
@@ -926,6 +997,15 @@ async def get_task_status(task_id: str):
         "status": task["status"]
     }
     
+    # Waiting runs report where they are in the queue
+    if task["status"] == "queued":
+        if AGENT_EXECUTION == "worker":
+            position = agent_job_queue.position(task_id)
+        else:
+            position = admission_controller.position(task_id)
+        response["queue_position"] = position
+        response["estimated_wait_seconds"] = admission_controller.retry_after(position - 1) if position else 0
+    
     # Include error details if the task has failed
     if task["status"] == "error" and "error" in task:
         response["error"] = task["error"]
@@ -934,11 +1014,25 @@ async def get_task_status(task_id: str):
     if "chat_id" in task:
         response["chat_id"] = task["chat_id"]
     
+    # Credits charged so far, per billed stage (also after a cancel)
+    if task.get("billing"):
+        response["billing"] = task["billing"]
+        response["credits_charged"] = sum(item["amount"] for item in task["billing"])
+    
     return response
+
+
+@router.get("/task/{task_id}/trace")
+async def get_task_trace(task_id: str):
+    """Spans of a finished run (stage, start offset, duration, status), in start order."""
+    task = task_manager.get_task(task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return {"task_id": task_id, "status": task["status"], "spans": task.get("trace")}
     
     
 @router.get("/task/{task_id}/result")
-async def get_task_result(task_id: str):
+async def get_task_result(task_id: str, request: Request, response: Response):
     """Get the final result of a task."""
     task = task_manager.get_task(task_id)
     if not task:
@@ -967,31 +1061,21 @@ async def get_task_result(task_id: str):
             "Main content file": None
         }
     elif task["status"] == "completed":
-        get_username = task["username"]
-        # Both reasoning and final answer are ready
-        translated_reasoning = task.get("translated_reasoning", None)
-        # creating a markdown file first here for the reasoning
-        SAVE_DIR = f"D:/finsocial/Multi model adding for the trading/userChats/{get_username}/markdown/reasoning/{task.get("chat_id")}/"
-        os.makedirs(SAVE_DIR, exist_ok=True)
-        file_id = f"{task_id}.md"
-        file_path_reasoning = os.path.join(SAVE_DIR, file_id)
-        with open(file_path_reasoning, "w", encoding="utf-8") as f:
-            f.write(translated_reasoning if translated_reasoning else task["reasoning_stream"][-1])
-        # creating a markdown file first here for the main answer
-        SAVE_DIR = f"D:/finsocial/Multi model adding for the trading/userChats/{get_username}/markdown/final_answer/{task.get("chat_id")}/"
-        os.makedirs(SAVE_DIR, exist_ok=True)
-        file_id = f"{task_id}.md"
-        file_path_main_content = os.path.join(SAVE_DIR, file_id)
-        with open(file_path_main_content, "w", encoding="utf-8") as f:
-            f.write(task["final_response"])
+        # Both reasoning and final answer are ready; the markdown files were written when the task completed
+        artifacts = task.get("artifacts") or task_manager.finalize_task(task_id) or {}
+        etag = artifacts.get("etag")
+        if etag:
+            if etag in request.headers.get("if-none-match", ""):
+                return Response(status_code=304, headers={"ETag": etag})
+            response.headers["ETag"] = etag
         # Return the final result
         return {
             "status": "completed",
             "chat_id": task.get("chat_id"),
-            "Reasoning": translated_reasoning if translated_reasoning else task["reasoning_stream"][-1],
+            "Reasoning": task_reasoning(task),
             "AI Message": task["final_response"],
-            'Reasoning File': f"{file_path_reasoning}",
-            "Main content file": f"{file_path_main_content}"
+            'Reasoning File': artifacts.get("reasoning_file"),
+            "Main content file": artifacts.get("main_content_file")
         }
     elif task["status"] == "error":
         # Handle error case
@@ -1007,8 +1091,19 @@ async def cancel_task(task_id: str):
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
-    if task["status"] == "processing":
+    if task["status"] == "queued" and (agent_job_queue.cancel(task_id) if AGENT_EXECUTION == "worker"
+                                       else admission_controller.cancel(task_id)):
+        task_manager.update_task(task_id, {"cancelled": True, "status": "cancelled"})
+        return {"status": "cancelled"}
+    
+    if task["status"] in ("queued", "processing"):
         task_manager.update_task(task_id, {"cancelled": True})
+        # stops the LLM/tool call in flight; runs owned by another process see the flag within CANCEL_POLL_INTERVAL
+        if cancellation_registry.cancel(task_id):
+            return {"status": "cancelled"}
+        if AGENT_EXECUTION == "worker":
+            # the worker rewrites the task file while it runs, so the flag above can be lost
+            agent_job_queue.request_cancel(task_id)
         return {"status": "cancellation_requested"}
     
     return {"status": task["status"]}
@@ -1062,32 +1157,15 @@ async def stream_task(websocket: WebSocket, task_id: str):
                 }
                 
                 if current_status == "completed":
-                    # adding the md files in the web socket
-                    get_username = task["username"]
-                    # Both reasoning and final answer are ready
-                    translated_reasoning = task.get("translated_reasoning", None)
-                    # creating a markdown file first here for the reasoning
-                    SAVE_DIR = f"D:/finsocial/Multi model adding for the trading/userChats/{get_username}/markdown/reasoning/{task.get("chat_id")}/"
-                    os.makedirs(SAVE_DIR, exist_ok=True)
-                    file_id = f"{task_id}.md"
-                    file_path_reasoning = os.path.join(SAVE_DIR, file_id)
-                    with open(file_path_reasoning, "w", encoding="utf-8") as f:
-                        f.write(translated_reasoning if translated_reasoning else task["reasoning_stream"][-1])
-                    # creating a markdown file first here for the main answer
-                    SAVE_DIR = f"D:/finsocial/Multi model adding for the trading/userChats/{get_username}/markdown/final_answer/{task.get("chat_id")}/"
-                    os.makedirs(SAVE_DIR, exist_ok=True)
-                    file_id = f"{task_id}.md"
-                    file_path_main_content = os.path.join(SAVE_DIR, file_id)
-                    with open(file_path_main_content, "w", encoding="utf-8") as f:
-                        f.write(task["final_response"])
-                    # Return the final result
-
+                    # the md files were written when the task completed, only their paths are sent
+                    artifacts = task.get("artifacts") or task_manager.finalize_task(task_id) or {}
                     final_data.update({
-                        "reasoning": translated_reasoning if translated_reasoning else (task["reasoning_stream"][-1] if task["reasoning_stream"] else None),
+                        "reasoning": task_reasoning(task) or None,
                         "response": task.get("final_response"),
                         "chat_id": task.get("chat_id"),
-                        'Reasoning File': f"{file_path_reasoning}",
-                        "Main content file": f"{file_path_main_content}"
+                        'Reasoning File': artifacts.get("reasoning_file"),
+                        "Main content file": artifacts.get("main_content_file"),
+                        "etag": artifacts.get("etag")
                     })
                 elif current_status == "error":
                     final_data["error"] = task.get("error", "Unknown error")
@@ -0,0 +1,41 @@
+import asyncio
+import random
+from typing import Optional
+
+
+class RequestDeadline:
+    """Overall time budget for one request, shared by every retry loop inside it."""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at = asyncio.get_running_loop().time() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - asyncio.get_running_loop().time())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def timeout(self, cap: float) -> float:
+        """Per-attempt timeout: `cap`, but never past the request deadline."""
+        return min(cap, self.remaining())
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 8.0) -> float:
+    """Full-jitter exponential backoff for the given (0-based) retry attempt."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+async def backoff_sleep(attempt: int, deadline: Optional[RequestDeadline] = None,
+                        base: float = 0.5, cap: float = 8.0, min_attempt_time: float = 1.0) -> bool:
+    """
+    Sleep before the next retry.
+
+    Returns False without sleeping when the deadline would leave less than
+    `min_attempt_time` for the retry itself, so callers can stop retrying.
+    """
+    delay = backoff_delay(attempt, base, cap)
+    if deadline is not None and deadline.remaining() < delay + min_attempt_time:
+        return False
+    await asyncio.sleep(delay)
+    return True
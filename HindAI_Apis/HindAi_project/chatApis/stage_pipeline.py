@@ -0,0 +1,74 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+class Stage:
+    """
+    One step of a request pipeline.
+
+    `func` receives the dict of results produced so far (all of its
+    dependencies are guaranteed to be in it) and returns this stage's value.
+    """
+
+    def __init__(self, name: str, func: Callable[[Dict[str, Any]], Awaitable[Any]], depends_on: Iterable[str] = ()):
+        self.name = name
+        self.func = func
+        self.depends_on: Tuple[str, ...] = tuple(depends_on)
+
+
+def _check_graph(stages: List[Stage]) -> None:
+    """Reject unknown dependencies and cycles before anything is started."""
+    by_name = {stage.name: stage for stage in stages}
+    if len(by_name) != len(stages):
+        raise ValueError("Duplicate stage names in pipeline")
+    for stage in stages:
+        for dep in stage.depends_on:
+            if dep not in by_name:
+                raise ValueError(f"Stage '{stage.name}' depends on unknown stage '{dep}'")
+
+    done = set()
+    remaining = list(stages)
+    while remaining:
+        ready = [stage for stage in remaining if all(dep in done for dep in stage.depends_on)]
+        if not ready:
+            raise ValueError(f"Dependency cycle between stages: {', '.join(s.name for s in remaining)}")
+        done.update(stage.name for stage in ready)
+        remaining = [stage for stage in remaining if stage.name not in done]
+
+
+async def run_stages(stages: List[Stage], timings: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """
+    Run the stages, starting each one as soon as its dependencies finish.
+
+    Independent stages run concurrently. Per-stage wall time (seconds) is
+    written into `timings`. If any stage raises, the remaining ones are
+    cancelled and the exception is re-raised.
+    """
+    _check_graph(stages)
+    results: Dict[str, Any] = {}
+    timings = {} if timings is None else timings
+    tasks: Dict[str, asyncio.Task] = {}
+
+    async def run_one(stage: Stage) -> Any:
+        if stage.depends_on:
+            await asyncio.gather(*(tasks[dep] for dep in stage.depends_on))
+        start = time.perf_counter()
+        try:
+            value = await stage.func(results)
+        finally:
+            timings[stage.name] = round(time.perf_counter() - start, 4)
+        results[stage.name] = value
+        return value
+
+    for stage in stages:
+        tasks[stage.name] = asyncio.create_task(run_one(stage))
+
+    try:
+        await asyncio.gather(*tasks.values())
+    except BaseException:
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+        raise
+    return results
@@ -0,0 +1,54 @@
+"""
+Markdown artifacts of a finished task.
+
+The reasoning and final answer of a completed task are written to
+`{MARKDOWN_BASE_PATH}/{username}/markdown/{reasoning|final_answer}/{chat_id}/{task_id}.md`
+once, when the task is marked completed. The paths and an ETag of the
+content are stored on the task, so result polls and streams only read them.
+"""
+import hashlib
+import os
+from typing import Any, Dict
+
+MARKDOWN_BASE_PATH = os.getenv("BASE_PATH_FOR_CHAT", "D:/finsocial/Multi model adding for the trading/userChats")
+
+
+def task_reasoning(task: Dict[str, Any]) -> str:
+    """Reasoning shown to the user: the translated one if any, else the last streamed chunk."""
+    if task.get("translated_reasoning"):
+        return task["translated_reasoning"]
+    stream = task.get("reasoning_stream") or []
+    return stream[-1] if stream else ""
+
+
+def content_etag(*parts: str) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update((part or "").encode("utf-8"))
+        digest.update(b"\0")
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def _write(path: str, content: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def write_markdown_artifacts(task_id: str, task: Dict[str, Any]) -> Dict[str, str]:
+    """Write both markdown files for a completed task; returns what is stored on the task."""
+    reasoning = task_reasoning(task)
+    final_response = task.get("final_response") or ""
+    user_dir = f"{MARKDOWN_BASE_PATH}/{task.get('username')}/markdown"
+    reasoning_file = os.path.join(f"{user_dir}/reasoning/{task.get('chat_id')}/", f"{task_id}.md")
+    main_content_file = os.path.join(f"{user_dir}/final_answer/{task.get('chat_id')}/", f"{task_id}.md")
+
+    _write(reasoning_file, reasoning)
+    _write(main_content_file, final_response)
+    return {
+        "reasoning_file": reasoning_file,
+        "main_content_file": main_content_file,
+        "etag": content_etag(reasoning, final_response),
+    }
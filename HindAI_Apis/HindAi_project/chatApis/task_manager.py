@@ -2,14 +2,18 @@ import json
 import os
 import time
 import threading
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, Optional
 from pathlib import Path
 
+from components.tracing import tracer
+
 class TaskManager:
     def __init__(self, temp_dir: str = "temp_tasks", cleanup_interval: int = 300):  # 5 minutes = 300 seconds
         self.temp_dir = Path(temp_dir)
         self.cleanup_interval = cleanup_interval
         self.temp_dir.mkdir(exist_ok=True)
+        # Called once when a task becomes "completed"; its result is stored under task["artifacts"]
+        self.finalizer: Optional[Callable[[str, Dict[str, Any]], Dict[str, Any]]] = None
         
         # Start cleanup thread
         self.cleanup_thread = threading.Thread(target=self._cleanup_loop, daemon=True)
@@ -20,6 +24,7 @@ class TaskManager:
         """Get the file path for a task."""
         return self.temp_dir / f"task_{task_id}.json"
     
+    @tracer.traced("json_persistence", target="task_store")
     def save_task(self, task_id: str, task_data: Dict[str, Any]) -> None:
         """Save task data to file."""
         task_data["created_at"] = time.time()
@@ -56,11 +61,33 @@ class TaskManager:
             print(f"Cannot update task {task_id}: task not found")
             return False
         
+        was_completed = task_data.get("status") == "completed"
         task_data.update(updates)
         task_data["updated_at"] = time.time()
+        if task_data.get("status") == "completed" and not was_completed:
+            self._finalize(task_id, task_data)
         self.save_task(task_id, task_data)
         return True
     
+    def _finalize(self, task_id: str, task_data: Dict[str, Any]) -> None:
+        if self.finalizer is None:
+            return
+        try:
+            task_data["artifacts"] = self.finalizer(task_id, task_data)
+        except Exception as e:
+            print(f"Error finalizing task {task_id}: {e}")
+    
+    def finalize_task(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Artifacts of a completed task, produced now if the task has none yet."""
+        task_data = self.get_task(task_id)
+        if task_data is None or task_data.get("status") != "completed":
+            return None
+        if "artifacts" not in task_data:
+            self._finalize(task_id, task_data)
+            if "artifacts" in task_data:
+                self.save_task(task_id, task_data)
+        return task_data.get("artifacts")
+    
     def delete_task(self, task_id: str) -> bool:
         """Delete task file."""
         task_file = self._get_task_file(task_id)
@@ -16,6 +16,7 @@ spec.loader.exec_module(userchats)
 get_userchats = userchats.get_userchats
 read_json_file = userchats.read_json_file
 from fastapi import APIRouter
+from components.session_store import get_session_db, reasoning_session_id
 load_dotenv()
 base_path_for_chat = os.getenv("BASE_PATH_FOR_CHAT")
 
@@ -115,6 +116,13 @@ async def delete_specific_chat(username: str, chat_id: str):
     
     try:
         os.remove(file_path)
+        # agent history for the chat lives in the shared session store
+        try:
+            session_db = get_session_db(base_path_for_chat, username, chat_id)
+            session_db.delete_session(chat_id)
+            session_db.delete_session(reasoning_session_id(chat_id))
+        except Exception as e:
+            print(f"Error deleting session history for chat {chat_id}: {e}")
         return {"message": f"Chat {chat_id} for user {username} has been deleted successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error deleting chat: {str(e)}")
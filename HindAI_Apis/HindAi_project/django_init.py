@@ -0,0 +1,27 @@
+import os
+import sys
+import threading
+
+_lock = threading.Lock()
+
+
+def setup_django():
+    """
+    Initialize Django once per process.
+
+    Modules that touch the ORM at import time call this instead of
+    `django.setup()`, so whichever runs first (asgi, manage.py or a router)
+    does the work and the rest return immediately.
+    """
+    from django.apps import apps
+    if apps.ready:
+        return
+    with _lock:
+        if apps.ready:
+            return
+        project_dir = os.path.dirname(os.path.abspath(__file__))
+        if project_dir not in sys.path:
+            sys.path.append(project_dir)
+        os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'HindAi_project.settings')
+        import django
+        django.setup()
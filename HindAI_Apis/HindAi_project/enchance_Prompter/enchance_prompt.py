@@ -3,10 +3,11 @@ from agno.models.openai import OpenAIChat
 from dotenv import load_dotenv
 import os
 import sys
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional
 import asyncio  # Add this import
+from cachetools import TTLCache
 from agno.models.openrouter import OpenRouter
 from asgiref.sync import sync_to_async
 # Set the path to your .env file
@@ -19,6 +20,15 @@ from components.language_check import language_check
 
 router = APIRouter()
 
+# Enhanced prompts keyed by (prompt, language_code); repeated presses on the same draft hit this
+ENHANCE_CACHE_SIZE = int(os.getenv("ENHANCE_CACHE_SIZE", "1024"))
+ENHANCE_CACHE_TTL = int(os.getenv("ENHANCE_CACHE_TTL", "3600"))  # seconds
+enhance_cache = TTLCache(maxsize=ENHANCE_CACHE_SIZE, ttl=ENHANCE_CACHE_TTL)
+
+# Latest in-flight enhance task per client request id (an unguessable id the client keeps per
+# prompt box, e.g. a UUID), a newer request with the same id cancels the older one
+inflight_enhancements: Dict[str, asyncio.Task] = {}
+
 
 # Create an enhancement agent
 enhancement_agent = Agent(
@@ -34,6 +44,13 @@ enhancement_agent = Agent(
     markdown=False
 )
 
+def build_enhancement_request(prompt: str) -> str:
+    return f"""Please enhance this prompt:
+
+Original prompt: {prompt}
+
+Provide only the enhanced version:"""
+
 # Your custom prompt-enhancing function (removed @tool decorator)
 def enhance_prompt(prompt: str) -> str:
     """
@@ -45,53 +62,71 @@ def enhance_prompt(prompt: str) -> str:
     Returns:
         Enhanced version of the prompt
     """
-    enhancement_request = f"""Please enhance this prompt:
+    # Use the enhancement agent
+    response = enhancement_agent.run(build_enhancement_request(prompt))
+    return response.content.strip()
 
-Original prompt: {prompt}
 
-Provide only the enhanced version:"""
-    
-    # Use the enhancement agent
-    response = enhancement_agent.run(enhancement_request)
+async def enhance_prompt_async(prompt: str) -> str:
+    """Async version of enhance_prompt, cancelling the awaiting task aborts the LLM call."""
+    response = await enhancement_agent.arun(build_enhancement_request(prompt))
     return response.content.strip()
 
 
+async def enhance_and_translate(prompt: str, language_code: str) -> str:
+    """Translate the prompt to English if needed, enhance it, and translate the result back."""
+    TRANSLATION_TIMEOUT = 20
+    if language_check(language_code):
+        return await enhance_prompt_async(prompt)
+
+    translator = LanguageTranslator()
+    translating = await asyncio.wait_for(
+        translator.translate_text_async(text=prompt, source_lang=language_code, target_lang='eng_Latn'),
+        timeout=TRANSLATION_TIMEOUT
+    )
+    result = await enhance_prompt_async(translating)
+    return await asyncio.wait_for(
+        translator.translate_text_async(text=result, source_lang='eng_Latn', target_lang=language_code),
+        timeout=TRANSLATION_TIMEOUT
+    )
+
+
 
 @router.get("/enhance-prompt/", response_model=dict)
-async def enhance_prompt_endpoint(prompt: str, language_name: str, language_code: str) -> dict:
+async def enhance_prompt_endpoint(prompt: str, language_name: str, language_code: str,
+                                  request_id: Optional[str] = Query(None, min_length=16, max_length=128)) -> dict:
     if len(prompt) < 20:
         return {"enhanced_prompt_error": "Prompt is too short"}
 
-    TRANSLATION_TIMEOUT = 20
-    translator = LanguageTranslator()
-    check_code = language_check(language_code)
-    translating = None
-    if check_code == False:   
-        try:
-            translating = await asyncio.wait_for(
-                                translator.translate_text_async(
-                                    text=prompt, 
-                                    source_lang=language_code, 
-                                    target_lang='eng_Latn'
-                                ),
-                                timeout=TRANSLATION_TIMEOUT
-                            )
-            result = enhance_prompt(translating)
-            now_Trans = await asyncio.wait_for(
-                                translator.translate_text_async(
-                                    text=result, 
-                                    source_lang='eng_Latn', 
-                                    target_lang=language_code
-                                ),
-                                timeout=TRANSLATION_TIMEOUT
-                            )
-            
-            return {"enhanced_prompt": now_Trans}
-        except asyncio.TimeoutError:
-            return {"enhanced_prompt_error": "Translation timed out"}
-        except Exception as e:
-            return {"enhanced_prompt_error": "Check your language code and name"}
-    else:
-        result = enhance_prompt(prompt)
-        return {"enhanced_prompt": result}
+    cache_key = (prompt.strip(), language_code)
+    cached = enhance_cache.get(cache_key)
+    if cached is not None:
+        return {"enhanced_prompt": cached}
+
+    task = asyncio.create_task(enhance_and_translate(prompt.strip(), language_code))
+    if request_id:
+        # a newer enhance request from the same prompt box supersedes the running one
+        previous = inflight_enhancements.get(request_id)
+        if previous is not None and not previous.done():
+            previous.cancel()
+        inflight_enhancements[request_id] = task
+
+    try:
+        result = await task
+    except asyncio.CancelledError:
+        if task.cancelled() and not asyncio.current_task().cancelling():
+            return {"enhanced_prompt_error": "Superseded by a newer enhance request"}
+        task.cancel()
+        raise
+    except asyncio.TimeoutError:
+        return {"enhanced_prompt_error": "Translation timed out"}
+    except Exception as e:
+        if language_check(language_code):
+            raise HTTPException(status_code=500, detail=f"Error enhancing prompt: {str(e)}")
+        return {"enhanced_prompt_error": "Check your language code and name"}
+    finally:
+        if request_id and inflight_enhancements.get(request_id) is task:
+            del inflight_enhancements[request_id]
 
+    enhance_cache[cache_key] = result
+    return {"enhanced_prompt": result}
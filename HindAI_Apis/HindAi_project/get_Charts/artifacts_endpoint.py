@@ -0,0 +1,32 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import RedirectResponse
+import re
+from components.artifact_store import artifact_store, artifact_response
+
+router = APIRouter()
+
+DIGEST_PATTERN = re.compile(r"^[0-9a-f]{20}$")
+
+
+@router.get("/{root}/{digest}/{file_path:path}")
+async def get_artifact_by_hash(root: str, digest: str, file_path: str, request: Request):
+    """
+    Content-addressed artifact URL, cached by clients as immutable.
+    A stale hash redirects to the file's current URL.
+    """
+    if not DIGEST_PATTERN.match(digest):
+        # not a hash, the digest segment is the first directory of a plain path
+        return await get_artifact(root, f"{digest}/{file_path}", request)
+    meta = await artifact_store.get(root, file_path)
+    if meta.digest != digest:
+        return RedirectResponse(meta.url, status_code=307)
+    return artifact_response(request, meta, immutable=True)
+
+
+@router.get("/{root}/{file_path:path}")
+async def get_artifact(root: str, file_path: str, request: Request):
+    """Artifact by plain path; revalidated with its ETag."""
+    if not file_path:
+        raise HTTPException(status_code=404, detail="File not found")
+    meta = await artifact_store.get(root, file_path)
+    return artifact_response(request, meta)
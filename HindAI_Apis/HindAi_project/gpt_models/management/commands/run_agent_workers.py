@@ -0,0 +1,67 @@
+import multiprocessing
+import os
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+
+from chatApis.job_queue import AGENT_EXECUTION, agent_job_queue
+
+
+def _interrupt(*_):
+    raise KeyboardInterrupt
+
+
+class Command(BaseCommand):
+    help = ('Run agent worker processes that consume run-agent jobs from the local job queue. '
+            'Start the API with AGENT_EXECUTION=worker so it queues jobs instead of running them.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=int(os.getenv('AGENT_WORKERS', '2')),
+                            help='Number of worker processes (default: AGENT_WORKERS or 2).')
+        parser.add_argument('--concurrency', type=int, default=int(os.getenv('AGENT_WORKER_CONCURRENCY', '4')),
+                            help='Jobs run at once by each worker (default: AGENT_WORKER_CONCURRENCY or 4).')
+
+    def handle(self, *args, **options):
+        from chatApis.agent_worker import worker_main
+
+        if AGENT_EXECUTION != 'worker':
+            self.stdout.write(self.style.WARNING(
+                "AGENT_EXECUTION is not 'worker' in this environment; the API will keep running agents itself"
+            ))
+        purged = agent_job_queue.purge()
+        if purged:
+            self.stdout.write(f"Purged {purged} finished jobs")
+
+        signal.signal(signal.SIGTERM, _interrupt)  # stop the workers too when a supervisor stops us
+        context = multiprocessing.get_context('spawn')
+        processes = {}
+
+        def start(index):
+            process = context.Process(target=worker_main, args=(index, options['concurrency']),
+                                      name=f'agent-worker-{index}')
+            process.start()
+            processes[index] = process
+
+        for index in range(options['workers']):
+            start(index)
+        self.stdout.write(self.style.SUCCESS(
+            f"Started {options['workers']} agent workers x {options['concurrency']} jobs"
+        ))
+
+        try:
+            while True:
+                time.sleep(2)
+                for index, process in list(processes.items()):
+                    if not process.is_alive():
+                        # its jobs are reclaimed after the visibility timeout
+                        self.stdout.write(self.style.WARNING(
+                            f"Worker {index} exited with code {process.exitcode}, restarting"
+                        ))
+                        start(index)
+        except KeyboardInterrupt:
+            self.stdout.write("Stopping workers...")
+            for process in processes.values():
+                process.terminate()
+            for process in processes.values():
+                process.join()
@@ -1,32 +1,20 @@
+import importlib
 import logging
 import sys
 import os
 from fastapi import FastAPI, Request, Depends, HTTPException, Header, APIRouter
 from fastapi.templating import Jinja2Templates
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import APIKeyHeader
 from typing import Optional
-from HindAi_users.auth_api import router as auth_router
-from user_credits.api import router as credit_router
-from htmlgen.api import router as html_router
-from chatApis.responses import router as chat_router
-from chatApis.userchat_data import router
-from chatApis.download_Files import router as downloadingfile
-from platforms.api import router as platform_router
-from platforms.llm_api_Test import router as test_platform_router
-from platforms.add_api_model import router as add_api_model
-from subscription.api import router as subscription_router
-from subscription.add__user_sub import router as add_subscription_router
-from gpt_models.api import router as personal_model_router
-from gpt_models.api import router as personal_model_router
-from enchance_Prompter.enchance_prompt import router as enchance_router
-from payment_gateway.api import router as payment_gateway_router
 from suggestion_prompt_generator.api import router as suggestion_router
 
 # snaptrades api's 
 from account_atteched_details.api import router as atteched_accounts_router
 from accounts.api import router as snaptrade_user_account_router
 from get_Charts.chart_endpoint import router as GET_Charts_router
+from get_Charts.artifacts_endpoint import router as artifacts_router
 from connection_portal.api import router as connection_portal_router
 from Orders.Market_ordersEndpoint import router as Orders_router
 from Orders.Limit_ordersEndpoint import router as Limit_Orders_router
@@ -36,6 +24,11 @@ from Orders.STOPLIMIT_OrdersEndpoint import router as Stop_Limit_Orders_router
 
 from dotenv import load_dotenv
 from fastapi.staticfiles import StaticFiles
+from contextlib import asynccontextmanager
+from components.http_clients import http_clients
+from components.tool_cache import tool_cache
+from components.session_store import session_store
+from components.tracing import tracer
 
 # Load environment variables from .env file
 env_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env')
@@ -59,11 +52,20 @@ async def verify_api_key(api_key: Optional[str] = Depends(api_key_header)):
         raise HTTPException(status_code=401, detail="Invalid or missing API key")
     return api_key
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Shared outbound HTTP pools (Razorpay, Telegram, LlamaIndex) live for the whole app
+    await http_clients.start()
+    yield
+    await http_clients.aclose()
+    session_store.close_all()
+
 # Create the FastAPI app instance (without docs)
 app = FastAPI(
     title="HindAI API", 
     version="2.0.0",
     docs_url=None,  # Disable default docs
+    lifespan=lifespan,
     )
 
 # Create separate routers for HTTP and WebSocket endpoints
@@ -71,14 +73,30 @@ http_chat_router = APIRouter()
 websocket_chat_router = APIRouter()
 
 # Import individual endpoints from responses
-from chatApis.responses import run_agent_endpoint, get_task_status, get_task_result, cancel_task, stream_task
+from chatApis.responses import run_agent_endpoint, get_task_status, get_task_trace, get_task_result, cancel_task, stream_task
+from chatApis.admission import admission_controller
+from chatApis.job_queue import AGENT_EXECUTION, agent_job_queue
 
 # Add HTTP endpoints to the HTTP router
 http_chat_router.add_api_route("/run-agent", run_agent_endpoint, methods=["POST"])
 http_chat_router.add_api_route("/task/{task_id}/status", get_task_status, methods=["GET"])
+http_chat_router.add_api_route("/task/{task_id}/trace", get_task_trace, methods=["GET"])
 http_chat_router.add_api_route("/task/{task_id}/result", get_task_result, methods=["GET"])
 http_chat_router.add_api_route("/task/{task_id}/cancel", cancel_task, methods=["POST"])
 
+@http_chat_router.get("/tool-cache/stats")
+async def tool_cache_stats():
+    """Hit rate, size and evictions of the shared tool result cache."""
+    return tool_cache.stats()
+
+@http_chat_router.get("/admission/stats")
+async def admission_stats():
+    """Running and queued agent runs, average run time and rejected requests."""
+    stats = admission_controller.stats()
+    if AGENT_EXECUTION == "worker":
+        stats["worker_queue"] = agent_job_queue.stats()
+    return stats
+
 # Add WebSocket endpoint to the WebSocket router (without authentication)
 websocket_chat_router.add_api_websocket_route("/task/{task_id}/stream", stream_task)
 
@@ -97,43 +115,6 @@ app.include_router(
     responses={404: {"description": "Not found"}},
     # dependencies=[Depends(verify_api_key)]  # Apply API key verification to HTTP endpoints only
 )
-# app.include_router(
-#     payment_gateway_router,
-#     prefix="/payment_gateway",
-#     tags=["HindAI Payment Gateway"],
-#     responses={404: {"description": "Not found"}},
-#     # dependencies=[Depends(verify_api_key)]  # Apply API key verification to HTTP endpoints only
-# )
-# app.include_router(
-#     downloadingfile,
-#     prefix="/download",
-#     tags=["HindAI Chat"],
-#     responses={404: {"description": "Not found"}},
-#     # dependencies=[Depends(verify_api_key)]  # Apply API key verification to HTTP endpoints only
-# )
-# app.include_router(
-#     enchance_router,
-#     prefix="/enhance",
-#     tags=["Enhance Prompt"],
-#     responses={404: {"description": "Not found"}},
-#     # dependencies=[Depends(verify_api_key)]  # Apply API key verification to HTTP endpoints only
-# )
-# app.include_router(
-#     personal_model_router,
-#     prefix="/personal-model-router",
-#     tags=["Personal Model"],
-#     responses={404: {"description": "Not found"}},
-#     # dependencies=[Depends(verify_api_key)]  # Apply API key verification to HTTP endpoints only
-# )
-
-# app.include_router(
-#     credit_router,
-#     prefix="/Credits",
-#     tags=["HindAI Credits"],
-#     responses={404: {"description": "Not found"}},
-#     # dependencies=[Depends(verify_api_key)]  # Apply API key verification to HTTP endpoints only
-# )
-
 # # Include WebSocket chat router without API key protection
 # app.include_router(
 #     websocket_chat_router,
@@ -143,77 +124,39 @@ app.include_router(
 #     # No dependencies here - WebSocket doesn't use API key authentication
 # )
 
-# # Include the HTML generation router
-# app.include_router(
-#     router,
-#     prefix="/userchats",
-#     tags=["Chats History"],
-#     responses={404: {"description": "Not found"}},
-#     # dependencies=[Depends(verify_api_key)]  # Apply API key verification to all endpoints
-
-# )
-# # Include the HTML generation router
-# app.include_router(
-#     html_router,
-#     prefix="/html",
-#     tags=["HTML Generation"],
-#     responses={404: {"description": "Not found"}},
-#     dependencies=[Depends(verify_api_key)]  # Apply API key verification to all endpoints
-
-# )
-
-# # Include the auth router immediately after app creation
-# app.include_router(
-#     auth_router,
-#     prefix="/auth",
-#     tags=["User Profiles"],
-#     responses={404: {"description": "Not found"}},
-#     dependencies=[Depends(verify_api_key)]  # Apply API key verification to all endpoints
-
-# )
-# # Include the auth router immediately after app creation
-# app.include_router(
-#     platform_router,
-#     prefix="/platform_router",
-#     tags=["Platforms"],
-#     responses={404: {"description": "Not found"}},
-#     # dependencies=[Depends(verify_api_key)]  # Apply API key verification to all endpoints
-
-# )
-
-
-# app.include_router(
-#     test_platform_router,
-#     prefix="/test_platform_API",
-#     tags=["Testing Api's"],
-#     responses={404: {"description": "Not found"}},
-#     # dependencies=[Depends(verify_api_key)]  # Apply API key verification to all endpoints
-# )
-# app.include_router(
-#     add_api_model,
-#     prefix="/add_platform_model",
-#     tags=["Add Platform Model"],
-#     responses={404: {"description": "Not found"}},
-#     # dependencies=[Depends(verify_api_key)]  # Apply API key verification to all endpoints
-# )
-
-
-# app.include_router(
-#     subscription_router,
-#     prefix="/subscription",
-#     tags=["Subscriptions Details"],
-#     responses={404: {"description": "Not found"}},
-#     # dependencies=[Depends(verify_api_key)]  # Apply API key verification to all endpoints
-
-# )
-# app.include_router(
-#     add_subscription_router,
-#     prefix="/add-subscription",
-#     tags=["Subscriptions Add"],
-#     responses={404: {"description": "Not found"}},
-#     # dependencies=[Depends(verify_api_key)]  # Apply API key verification to all endpoints
-
-# )
+# Routers that are switched off by default. They are imported only when listed
+# in ENABLED_ROUTERS (comma separated, e.g. "auth,credits"), so a default start
+# does not pay for their imports.
+# name: (module, prefix, tag, requires X-API-Key)
+OPTIONAL_ROUTERS = {
+    "payment_gateway": ("payment_gateway.api", "/payment_gateway", "HindAI Payment Gateway", False),
+    "download": ("chatApis.download_Files", "/download", "HindAI Chat", False),
+    "enhance": ("enchance_Prompter.enchance_prompt", "/enhance", "Enhance Prompt", False),
+    "personal_model": ("gpt_models.api", "/personal-model-router", "Personal Model", False),
+    "credits": ("user_credits.api", "/Credits", "HindAI Credits", False),
+    "userchats": ("chatApis.userchat_data", "/userchats", "Chats History", False),
+    "html": ("htmlgen.api", "/html", "HTML Generation", True),
+    "auth": ("HindAi_users.auth_api", "/auth", "User Profiles", True),
+    "platforms": ("platforms.api", "/platform_router", "Platforms", False),
+    "test_platform_api": ("platforms.llm_api_Test", "/test_platform_API", "Testing Api's", False),
+    "add_platform_model": ("platforms.add_api_model", "/add_platform_model", "Add Platform Model", False),
+    "subscription": ("subscription.api", "/subscription", "Subscriptions Details", False),
+    "add_subscription": ("subscription.add__user_sub", "/add-subscription", "Subscriptions Add", False),
+}
+ENABLED_ROUTERS = [name.strip() for name in os.getenv("ENABLED_ROUTERS", "").split(",") if name.strip()]
+
+for router_name in ENABLED_ROUTERS:
+    if router_name not in OPTIONAL_ROUTERS:
+        logger.warning(f"Unknown router in ENABLED_ROUTERS: {router_name}")
+        continue
+    module_path, prefix, tag, needs_api_key = OPTIONAL_ROUTERS[router_name]
+    app.include_router(
+        importlib.import_module(module_path).router,
+        prefix=prefix,
+        tags=[tag],
+        responses={404: {"description": "Not found"}},
+        dependencies=[Depends(verify_api_key)] if needs_api_key else None,
+    )
 app.include_router(
     atteched_accounts_router,
     prefix="/attached-accounts",
@@ -286,6 +229,12 @@ app.include_router(
     # dependencies=[Depends(verify_api_key)]  # Apply API key verification to all endpoints
 
 )
+app.include_router(
+    artifacts_router,
+    prefix="/artifacts",
+    tags=["Artifacts"],
+    responses={404: {"description": "Not found"}},
+)
 
 
 
@@ -294,6 +243,12 @@ async def root():
     return {"message": "HindAI API is running"}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """p50/p95/p99 latency per chat pipeline stage, in Prometheus text format."""
+    return PlainTextResponse(tracer.prometheus(), media_type="text/plain; version=0.0.4")
+
+
 # Custom Swagger UI endpoint
 @app.get("/docs", include_in_schema=False)
 async def custom_swagger_ui(request: Request):
@@ -0,0 +1,144 @@
+"""
+Model provider registry.
+
+Single place that maps a platform name (as stored in AvailablePlatforms) to
+the agno model class behind it and to the settings every instance gets
+(max_tokens, timeout, retries). Provider modules are imported on first use
+and built models are cached, so requests for the same (platform, model, key)
+reuse one instance and with it the provider's HTTP connection pool.
+"""
+import hashlib
+import importlib
+import os
+import threading
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+from cachetools import LRUCache
+
+# agno model classes by name -> (module, attribute)
+PROVIDER_CLASSES = {
+    "OpenAILike": ("agno.models.openai.like", "OpenAILike"),
+    "Claude": ("agno.models.anthropic", "Claude"),
+    "DeepInfra": ("agno.models.deepinfra", "DeepInfra"),
+    "DeepSeek": ("agno.models.deepseek", "DeepSeek"),
+    "Fireworks": ("agno.models.fireworks", "Fireworks"),
+    "Gemini": ("agno.models.google", "Gemini"),
+    "Groq": ("agno.models.groq", "Groq"),
+    "LMStudio": ("agno.models.lmstudio", "LMStudio"),
+    "Llama": ("agno.models.meta", "Llama"),
+    "MistralChat": ("agno.models.mistral", "MistralChat"),
+    "Nvidia": ("agno.models.nvidia", "Nvidia"),
+    "Nebius": ("agno.models.nebius", "Nebius"),
+    "OpenAIChat": ("agno.models.openai", "OpenAIChat"),
+    "OpenRouter": ("agno.models.openrouter", "OpenRouter"),
+    "Perplexity": ("agno.models.perplexity", "Perplexity"),
+    "Sambanova": ("agno.models.sambanova", "Sambanova"),
+    "Together": ("agno.models.together", "Together"),
+    "v0": ("agno.models.vercel", "v0"),
+    "xAI": ("agno.models.xai", "xAI"),
+}
+
+MODEL_MAX_TOKENS = int(os.getenv("MODEL_MAX_TOKENS", "1024"))
+MODEL_TIMEOUT = float(os.getenv("MODEL_TIMEOUT", "60"))
+MODEL_MAX_RETRIES = int(os.getenv("MODEL_MAX_RETRIES", "2"))
+MODEL_CACHE_SIZE = int(os.getenv("MODEL_CACHE_SIZE", "256"))
+
+
+class ProviderSpec:
+    """How to build models for one platform."""
+
+    def __init__(self, provider: str, test_model: str, max_tokens: Optional[int] = MODEL_MAX_TOKENS,
+                 timeout: Optional[float] = None, max_retries: Optional[int] = None,
+                 upstream: Optional[str] = None, validate: Optional[Tuple[str, str]] = None,
+                 auth: str = "bearer", catalog: Optional[str] = None, **options):
+        self.provider = provider
+        self.test_model = test_model  # cheap model used to validate a user's API key
+        # key validation: http_clients upstream, (method, path) of the cheapest
+        # authenticated call, and how the key is sent ("bearer" or "goog")
+        self.upstream = upstream
+        self.validate = validate
+        self.auth = auth
+        # path of the provider's model list, used by `manage.py sync_platform_models`
+        self.catalog = catalog
+        self.max_tokens = max_tokens
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.options = options
+
+    def model_kwargs(self) -> Dict[str, Any]:
+        kwargs = dict(self.options)
+        if self.max_tokens is not None:
+            kwargs["max_tokens"] = self.max_tokens
+        if self.timeout is not None:
+            kwargs["timeout"] = self.timeout
+        if self.max_retries is not None:
+            kwargs["max_retries"] = self.max_retries
+        return kwargs
+
+
+LIST_MODELS = ("GET", "/v1/models")
+# 1-token completion, for providers whose model list is public
+ONE_TOKEN = ("POST", "/v1/chat/completions")
+
+# Keys are the platform names users connect with. OpenAI-compatible clients
+# take timeout/max_retries; Gemini and Mistral use their SDK defaults.
+PLATFORMS: Dict[str, ProviderSpec] = {
+    "Open Router": ProviderSpec("OpenRouter", "gpt-4o", timeout=MODEL_TIMEOUT, max_retries=MODEL_MAX_RETRIES,
+                                upstream="openrouter", validate=("GET", "/api/v1/key"), catalog="/api/v1/models"),
+    "OpenAIChat": ProviderSpec("OpenAIChat", "gpt-4o", timeout=MODEL_TIMEOUT, max_retries=MODEL_MAX_RETRIES,
+                               upstream="openai", validate=LIST_MODELS, catalog="/v1/models"),
+    "Sambanova": ProviderSpec("Sambanova", "DeepSeek-R1-0528", timeout=MODEL_TIMEOUT, max_retries=MODEL_MAX_RETRIES,
+                              upstream="sambanova", validate=ONE_TOKEN, catalog="/v1/models"),
+    "NVIDIA": ProviderSpec("Nvidia", "ai21labs/jamba-1.5-large-instruct", timeout=MODEL_TIMEOUT, max_retries=MODEL_MAX_RETRIES,
+                           upstream="nvidia", validate=ONE_TOKEN, catalog="/v1/models"),
+    "Nebius": ProviderSpec("Nebius", "Qwen/Qwen2.5-32B-Instruct", timeout=MODEL_TIMEOUT, max_retries=MODEL_MAX_RETRIES,
+                           upstream="nebius", validate=LIST_MODELS, catalog="/v1/models"),
+    "Google Gemini": ProviderSpec("Gemini", "gemini-2.0-flash",
+                                  upstream="gemini", validate=("GET", "/v1beta/models"), auth="goog",
+                                  catalog="/v1beta/models"),
+    "Mistral AI": ProviderSpec("MistralChat", "Qwen/Qwen2.5-32B-Instruct",
+                               upstream="mistral", validate=LIST_MODELS, catalog="/v1/models"),
+}
+
+# platform names are matched case-insensitively ("Google gemini" == "Google Gemini")
+_platforms_by_key = {name.lower(): spec for name, spec in PLATFORMS.items()}
+
+_models: LRUCache = LRUCache(maxsize=MODEL_CACHE_SIZE)
+_models_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def get_provider(name: str):
+    """Return the agno model class `name`, importing its module on first use."""
+    try:
+        module_path, attribute = PROVIDER_CLASSES[name]
+    except KeyError:
+        raise KeyError(f"Unknown model provider '{name}'") from None
+    return getattr(importlib.import_module(module_path), attribute)
+
+
+def get_platform(platform: str) -> Optional[ProviderSpec]:
+    return _platforms_by_key.get(str(platform).strip().lower())
+
+
+def build_model(platform: str, model_id: str, api_key: str, cached: bool = True):
+    """
+    Model instance for `model_id` on `platform`, or None if the platform is unknown.
+
+    Instances are cached per (platform, model, api key) unless `cached` is False,
+    which is what key validation uses so bad keys never enter the cache.
+    """
+    spec = get_platform(platform)
+    if spec is None:
+        return None
+    if not cached:
+        return get_provider(spec.provider)(id=model_id, api_key=api_key, **spec.model_kwargs())
+
+    key = (spec.provider, model_id, hashlib.sha256(str(api_key).encode("utf-8")).hexdigest())
+    with _models_lock:
+        model = _models.get(key)
+        if model is None:
+            model = get_provider(spec.provider)(id=model_id, api_key=api_key, **spec.model_kwargs())
+            _models[key] = model
+    return model
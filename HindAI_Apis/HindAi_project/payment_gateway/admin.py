@@ -1,4 +1,5 @@
 from django.contrib import admin
+from subscription.exports import csv_stream, json_array_stream, stream_queryset, streaming_export
 from .models import RazorpayPaymentGateway
 
 @admin.register(RazorpayPaymentGateway)
@@ -66,6 +67,7 @@ class RazorpayPaymentGatewayAdmin(admin.ModelAdmin):
     )
     
     list_per_page = 25
+    actions = ['export_as_csv', 'export_as_json']
     date_hierarchy = 'created_timestamp'
     ordering = ['-created_timestamp']
     
@@ -87,3 +89,54 @@ class RazorpayPaymentGatewayAdmin(admin.ModelAdmin):
     def get_queryset(self, request):
         """Optimize queries by selecting related user"""
         return super().get_queryset(request).select_related('user')
+    
+    def export_as_csv(self, request, queryset):
+        """Export selected orders as CSV (streamed, constant memory)"""
+        header = [
+            'Order ID', 'Entity', 'Username', 'User Email', 'Amount (paise)', 'Amount (₹)',
+            'Currency', 'Receipt', 'Status', 'Created At (Razorpay)', 'Created', 'Updated'
+        ]
+        rows = (
+            [
+                order.razorpay_order_id,
+                order.entity,
+                order.user.username if order.user else 'No User',
+                order.user.email if order.user else '',
+                order.amount,
+                order.amount_in_rupees,
+                order.currency,
+                order.receipt,
+                order.status,
+                order.created_at,
+                order.created_timestamp.strftime('%Y-%m-%d %H:%M:%S'),
+                order.updated_timestamp.strftime('%Y-%m-%d %H:%M:%S'),
+            ]
+            for order in stream_queryset(queryset, 'user')
+        )
+        return streaming_export(csv_stream(header, rows), 'text/csv', 'razorpay_orders', 'csv')
+    export_as_csv.short_description = "Export selected orders as CSV"
+    
+    def export_as_json(self, request, queryset):
+        """Export selected orders as JSON (streamed, constant memory)"""
+        items = (
+            {
+                'razorpay_order_id': order.razorpay_order_id,
+                'entity': order.entity,
+                'user': {
+                    'username': order.user.username,
+                    'email': order.user.email,
+                } if order.user else None,
+                'amount': order.amount,
+                'amount_in_rupees': str(order.amount_in_rupees),
+                'currency': order.currency,
+                'receipt': order.receipt,
+                'status': order.status,
+                'notes': order.notes,
+                'created_at': order.created_at,
+                'created_timestamp': order.created_timestamp.isoformat(),
+                'updated_timestamp': order.updated_timestamp.isoformat(),
+            }
+            for order in stream_queryset(queryset, 'user')
+        )
+        return streaming_export(json_array_stream(items), 'application/json', 'razorpay_orders', 'json')
+    export_as_json.short_description = "Export selected orders as JSON"
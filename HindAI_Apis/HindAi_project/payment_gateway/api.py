@@ -9,6 +9,7 @@ from decimal import Decimal
 import httpx
 import base64
 import json
+from components.http_clients import http_clients
 
 router = APIRouter()
 
@@ -64,27 +65,28 @@ async def create_razorpay_order(order_request: OrderRequest):
             "Content-Type": "application/json"
         }
         
-        # Make request to Razorpay API
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://api.razorpay.com/v1/orders",
-                json=order_data,
-                headers=headers
-            )
+        # Make request to Razorpay API through the shared keep-alive pool
+        response = await http_clients.request(
+            "razorpay",
+            "POST",
+            "/v1/orders",
+            json=order_data,
+            headers=headers
+        )
+        
+        if response.status_code == 200:
+            order_response = response.json()
             
-            if response.status_code == 200:
-                order_response = response.json()
-                
-                # Save to database
-                await save_order_to_db(order_response, order_request.username, order_request.notes)
-                
-                return OrderResponse(**order_response)
-            else:
-                error_data = response.json() if response.content else {"error": "Unknown error"}
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"Razorpay API error: {error_data}"
-                )
+            # Save to database
+            await save_order_to_db(order_response, order_request.username, order_request.notes)
+            
+            return OrderResponse(**order_response)
+        else:
+            error_data = response.json() if response.content else {"error": "Unknown error"}
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=f"Razorpay API error: {error_data}"
+            )
                 
     except httpx.RequestError as e:
         raise HTTPException(
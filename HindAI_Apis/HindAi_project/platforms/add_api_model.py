@@ -1,6 +1,5 @@
 import os
 import sys
-import django
 
 from fastapi import HTTPException, APIRouter, status
 from asgiref.sync import sync_to_async
@@ -9,8 +8,8 @@ from pydantic import BaseModel
 
 # Path + Django setup
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'HindAi_project.settings')
-django.setup()
+from django_init import setup_django
+setup_django()
 
 from platforms.models import PlatformModel, AvailablePlatforms  # noqa
 from small_codes.model_update_workflow import test_Tool_bro
@@ -0,0 +1,108 @@
+"""
+Async API-key validation.
+
+Each platform is checked with the cheapest authenticated call configured in
+model_selection.providers (a models list, a key-info call or a 1-token
+completion) over the shared HTTP pools. Many (platform, key) pairs can be
+validated at once; keys that validated successfully are remembered for
+KEY_VALIDATION_TTL seconds. Only 401/403 mark a key as not working; rate
+limits, provider errors and network failures say nothing about the key and
+are reported as UNKNOWN so the client can retry. Nothing but successes is
+cached, so a fixed key or a provider outage clears on the next try.
+"""
+import asyncio
+import hashlib
+import os
+from typing import Dict, List, Tuple
+
+import httpx
+from cachetools import TTLCache
+
+from components.http_clients import http_clients
+from model_selection.providers import get_platform
+
+KEY_VALIDATION_TTL = int(os.getenv("KEY_VALIDATION_TTL", "300"))  # seconds
+KEY_VALIDATION_CONCURRENCY = int(os.getenv("KEY_VALIDATION_CONCURRENCY", "10"))
+
+VALID = "yes"
+INVALID = "not working"
+UNKNOWN = "unknown, try again"
+
+valid_keys: TTLCache = TTLCache(maxsize=4096, ttl=KEY_VALIDATION_TTL)
+_inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+
+
+def _cache_key(platform: str, api_key: str) -> Tuple[str, str]:
+    return platform.strip().lower(), hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
+
+async def _probe(spec, api_key: str) -> dict:
+    method, path = spec.validate
+    if spec.auth == "goog":
+        headers = {"x-goog-api-key": api_key}
+    else:
+        headers = {"Authorization": f"Bearer {api_key}"}
+    kwargs = {"headers": headers}
+    if method == "POST":
+        kwargs["json"] = {
+            "model": spec.test_model,
+            "messages": [{"role": "user", "content": "hi"}],
+            "max_tokens": 1,
+        }
+
+    try:
+        response = await http_clients.request(spec.upstream, method, path, **kwargs)
+    except httpx.HTTPError as e:
+        return {"api_working": UNKNOWN, "error": f"Could not reach provider: {e.__class__.__name__}"}
+
+    if response.status_code in (401, 403):
+        return {"api_working": INVALID}
+    if response.is_success:
+        return {"api_working": VALID}
+    # 429/5xx, or another 4xx such as a retired test model: says nothing about the key
+    return {"api_working": UNKNOWN, "error": f"Provider returned HTTP {response.status_code}"}
+
+
+async def validate_key(platform: str, api_key: str) -> dict:
+    """Return {'api_working': 'yes' | 'not working' | 'unknown, try again', ...} for one platform key."""
+    spec = get_platform(platform)
+    if spec is None or spec.validate is None:
+        return {"api_working": INVALID, "platform": "This platform is not valid"}
+    if not api_key:
+        return {"api_working": INVALID}
+
+    key = _cache_key(platform, api_key)
+    if key in valid_keys:
+        return {"api_working": VALID, "cached": True}
+
+    # identical checks running at the same time share one probe
+    future = _inflight.get(key)
+    if future is not None:
+        return dict(await asyncio.shield(future))
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
+    try:
+        result = await _probe(spec, api_key)
+        if result["api_working"] == VALID:
+            valid_keys[key] = True
+        future.set_result(result)
+        return result
+    except BaseException as e:
+        future.set_exception(e)
+        future.exception()  # mark retrieved when nobody else was waiting
+        raise
+    finally:
+        _inflight.pop(key, None)
+
+
+async def validate_keys(pairs: List[Tuple[str, str]]) -> List[dict]:
+    """Validate many (platform, api_key) pairs concurrently, results in input order."""
+    semaphore = asyncio.Semaphore(KEY_VALIDATION_CONCURRENCY)
+
+    async def run(platform: str, api_key: str) -> dict:
+        async with semaphore:
+            result = await validate_key(platform, api_key)
+        return {"platform_name": platform, **result}
+
+    return await asyncio.gather(*(run(platform, api_key) for platform, api_key in pairs))
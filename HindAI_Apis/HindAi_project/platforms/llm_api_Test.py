@@ -1,15 +1,13 @@
 import os
 import sys
 import pathlib
-import django
 from fastapi import APIRouter, HTTPException, Depends
 from fastapi import FastAPI  # NEW
-from agno.agent import Agent
-from agno.models.openai import OpenAIChat
 
 
 
 from pydantic import BaseModel
+from typing import List
 import asyncio
 from asgiref.sync import sync_to_async
 # Add the project root to the Python path
@@ -19,13 +17,15 @@ PROJECT_ROOT = pathlib.Path(__file__).resolve().parents[1]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'HindAi_project.settings')
-django.setup()
+from django_init import setup_django
+setup_django()
 from platforms.models import UserConnect,PlatformModel,AvailablePlatforms
 from HindAi_users.models import HindAIUser
-from small_codes.api_test import test as api_Test
+from platforms.key_validation import validate_key, validate_keys
 router = APIRouter()
 
+MAX_BATCH_KEYS = int(os.getenv("MAX_BATCH_KEYS", "50"))  # pairs accepted by one /test/batch call
+
 # FastAPI application (so uvicorn platforms.llm_api_Test:app works)
 app = FastAPI()
 app.include_router(router, prefix="/platforms", tags=["platforms"])
@@ -34,16 +34,30 @@ class test(BaseModel):
     platform_name: str
     api: str
 
+class test_batch(BaseModel):
+    keys: List[test]
+
 @router.post("/test")
 async def create_test(test: test):
     """
-    Create a new test instance.
+    Check that an API key works for a platform.
+    """
+    result = await validate_key(test.platform_name, test.api)
+    if 'platform' in result:
+        return {'api_working': result['api_working'], 'platform': result['platform']}
+    if 'error' in result:
+        return {'Api Valid': result['api_working'], 'error': result['error']}
+    return {'Api Valid': result['api_working']}
+
+@router.post("/test/batch")
+async def create_test_batch(batch: test_batch):
+    """
+    Check many (platform, API key) pairs concurrently, at most MAX_BATCH_KEYS per call.
     """
-    valid = api_Test(test.platform_name, test.api)
-    if valid == 'not working' or valid=='yes':
-        return {'Api Valid': valid}
-    else:
-        return valid
+    if len(batch.keys) > MAX_BATCH_KEYS:
+        raise HTTPException(status_code=422, detail=f"At most {MAX_BATCH_KEYS} keys can be tested per request")
+    results = await validate_keys([(item.platform_name, item.api) for item in batch.keys])
+    return {"results": results}
 
 
 
@@ -0,0 +1,159 @@
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+# components/ lives at the repository root
+REPO_ROOT = Path(__file__).resolve().parents[5]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.append(str(REPO_ROOT))
+
+from components.http_clients import http_clients  # noqa: E402
+from model_selection.providers import PLATFORMS  # noqa: E402
+from platforms.models import AvailablePlatforms, PlatformModel  # noqa: E402
+
+GEMINI_PAGE_SIZE = 1000
+
+
+def catalog_key(spec):
+    """API key used to read a provider's model list, e.g. MODEL_CATALOG_KEY_OPENAI."""
+    return os.getenv(f"MODEL_CATALOG_KEY_{spec.upstream.upper()}")
+
+
+def parse_model_ids(payload):
+    """Model ids from an OpenAI-style {"data": [{"id"}]} or Gemini-style {"models": [{"name"}]} body."""
+    if isinstance(payload, list):
+        items = payload
+    else:
+        items = payload.get("data") or payload.get("models") or []
+    ids = []
+    for item in items:
+        model_id = (item.get("id") or item.get("name")) if isinstance(item, dict) else item
+        if model_id:
+            ids.append(str(model_id).removeprefix("models/"))
+    return ids
+
+
+async def fetch_catalog(platform_name, spec):
+    api_key = catalog_key(spec)
+    headers = {}
+    if api_key:
+        headers = {"x-goog-api-key": api_key} if spec.auth == "goog" else {"Authorization": f"Bearer {api_key}"}
+    elif spec.upstream != "openrouter":  # OpenRouter's model list is public
+        raise RuntimeError(f"MODEL_CATALOG_KEY_{spec.upstream.upper()} is not set")
+
+    model_ids = []
+    params = {"pageSize": GEMINI_PAGE_SIZE} if spec.auth == "goog" else None
+    while True:
+        response = await http_clients.request(spec.upstream, "GET", spec.catalog, headers=headers, params=params)
+        response.raise_for_status()
+        payload = response.json()
+        model_ids.extend(parse_model_ids(payload))
+        next_page = payload.get("nextPageToken") if isinstance(payload, dict) else None
+        if not next_page:
+            break
+        params = {**(params or {}), "pageToken": next_page}
+    return sorted(set(model_ids))
+
+
+async def fetch_all(targets):
+    """Fetch every provider catalog concurrently; a failed provider maps to its exception."""
+    try:
+        results = await asyncio.gather(
+            *(fetch_catalog(name, spec) for name, spec in targets), return_exceptions=True
+        )
+    finally:
+        await http_clients.aclose()
+    return dict(zip((name for name, _ in targets), results))
+
+
+def diff_catalog(platform, existing, fetched_ids):
+    """Rows to create, and existing rows whose is_active flag has to change."""
+    fetched = set(fetched_ids)
+    to_create = [
+        PlatformModel(platform=platform, model=model_id, support=True, is_active=True)
+        for model_id in fetched_ids if model_id not in existing
+    ]
+    to_update = []
+    for model_id, row in existing.items():
+        should_be_active = model_id in fetched
+        if row.is_active != should_be_active:
+            row.is_active = should_be_active
+            to_update.append(row)
+    return to_create, to_update
+
+
+class Command(BaseCommand):
+    help = ('Fetch provider model catalogs concurrently and sync them into PlatformModel '
+            '(new models are added, models no longer listed are deactivated). Safe to run from cron.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--platform', action='append', dest='platforms',
+                            help='Only sync this platform (repeatable). Defaults to every platform with a catalog.')
+        parser.add_argument('--from-file', action='append', default=[], metavar='PLATFORM=PATH',
+                            help='Use a saved model list JSON instead of calling the provider, '
+                                 'e.g. "OpenAIChat=models_list/openai_models.json".')
+        parser.add_argument('--dry-run', action='store_true', help='Report the changes without writing them.')
+
+    def handle(self, *args, **options):
+        files = {}
+        for item in options['from_file']:
+            name, sep, path = item.partition('=')
+            if not sep:
+                raise CommandError(f"--from-file expects PLATFORM=PATH, got '{item}'")
+            files[name] = path
+
+        names = options['platforms'] or [name for name, spec in PLATFORMS.items() if spec.catalog]
+        names = list(dict.fromkeys(names + list(files)))
+
+        catalogs = {}
+        for name in names:
+            if name in files:
+                with open(files[name]) as f:
+                    catalogs[name] = sorted(set(parse_model_ids(json.load(f))))
+        targets = [(name, PLATFORMS[name]) for name in names
+                   if name not in catalogs and name in PLATFORMS and PLATFORMS[name].catalog]
+        for name in names:
+            if name not in catalogs and (name not in PLATFORMS or not PLATFORMS[name].catalog):
+                self.stdout.write(self.style.WARNING(f"{name}: no catalog configured, skipped"))
+        if targets:
+            catalogs.update(asyncio.run(fetch_all(targets)))
+
+        platforms = {p.platform_name: p for p in AvailablePlatforms.objects.filter(platform_name__in=list(catalogs))}
+        created_total = updated_total = 0
+        with transaction.atomic():
+            for name, fetched in catalogs.items():
+                if isinstance(fetched, Exception):
+                    self.stdout.write(self.style.ERROR(f"{name}: fetch failed ({fetched}), left unchanged"))
+                    continue
+                if not fetched:
+                    # an empty list is far more likely an API problem than a provider with no models
+                    self.stdout.write(self.style.WARNING(f"{name}: provider returned no models, left unchanged"))
+                    continue
+                platform = platforms.get(name)
+                if platform is None:
+                    self.stdout.write(self.style.WARNING(f"{name}: not in AvailablePlatforms, skipped"))
+                    continue
+
+                existing = {row.model: row for row in PlatformModel.objects.filter(platform=platform)}
+                to_create, to_update = diff_catalog(platform, existing, fetched)
+                activated = sum(1 for row in to_update if row.is_active)
+                self.stdout.write(
+                    f"{name}: {len(fetched)} listed, {len(to_create)} new, "
+                    f"{activated} reactivated, {len(to_update) - activated} deactivated"
+                )
+                if options['dry_run']:
+                    continue
+                PlatformModel.objects.bulk_create(to_create, batch_size=500, ignore_conflicts=True)
+                PlatformModel.objects.bulk_update(to_update, ['is_active'], batch_size=500)
+                created_total += len(to_create)
+                updated_total += len(to_update)
+
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS("Dry run, nothing written"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Synced: {created_total} created, {updated_total} updated"))
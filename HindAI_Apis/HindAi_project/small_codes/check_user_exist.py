@@ -1,6 +1,5 @@
 import os
 import sys
-import django
 
 import asyncio
 from asgiref.sync import sync_to_async
@@ -8,8 +7,8 @@ from asgiref.sync import sync_to_async
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Setup Django environment
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'HindAi_project.settings')
-django.setup()
+from django_init import setup_django
+setup_django()
 
 from HindAi_users.models import HindAIUser
 
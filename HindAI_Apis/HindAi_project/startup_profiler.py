@@ -0,0 +1,102 @@
+"""
+Startup import profiler.
+
+Imports the app in a fresh interpreter with `python -X importtime` and reports
+where the cold-start time goes, per module and per top-level package.
+
+    python startup_profiler.py                      # profile HindAi_project.asgi
+    python startup_profiler.py --module main_api --top 40
+    python startup_profiler.py --json > startup.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def run_importtime(module: str):
+    """Import `module` in a child interpreter and return (rows, wall seconds, returncode, stderr tail)."""
+    env = dict(os.environ)
+    env.setdefault("DJANGO_SETTINGS_MODULE", "HindAi_project.settings")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [PROJECT_DIR, env.get("PYTHONPATH")]))
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_DIR, env=env, capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - start
+
+    rows = []
+    other = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            other.append(line)
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # header line
+        self_us, cumulative_us, name = int(parts[0]), int(parts[1]), parts[2]
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append({"module": name.strip(), "self_ms": self_us / 1000, "cumulative_ms": cumulative_us / 1000, "depth": depth})
+    return rows, wall, proc.returncode, "\n".join(other[-20:])
+
+
+def summarize(rows, top: int) -> dict:
+    by_package = defaultdict(float)
+    for row in rows:
+        by_package[row["module"].split(".")[0]] += row["self_ms"]
+    return {
+        "total_import_ms": round(sum(row["self_ms"] for row in rows), 1),
+        "modules_imported": len(rows),
+        "top_cumulative": sorted(rows, key=lambda r: r["cumulative_ms"], reverse=True)[:top],
+        "top_self": sorted(rows, key=lambda r: r["self_ms"], reverse=True)[:top],
+        "by_package": sorted(
+            ({"package": name, "self_ms": round(ms, 1)} for name, ms in by_package.items()),
+            key=lambda r: r["self_ms"], reverse=True,
+        )[:top],
+    }
+
+
+def print_report(module: str, report: dict) -> None:
+    print(f"Startup import profile for '{module}'")
+    print(f"  wall time: {report['wall_s']:.2f}s, import time: {report['total_import_ms'] / 1000:.2f}s, "
+          f"modules: {report['modules_imported']}")
+    print("\nSlowest imports (cumulative, includes children):")
+    for row in report["top_cumulative"]:
+        print(f"  {row['cumulative_ms']:>10.1f} ms  {row['module']}")
+    print("\nSlowest modules (self time):")
+    for row in report["top_self"]:
+        print(f"  {row['self_ms']:>10.1f} ms  {row['module']}")
+    print("\nTime by top-level package:")
+    for row in report["by_package"]:
+        print(f"  {row['self_ms']:>10.1f} ms  {row['package']}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Profile import time of the app at startup")
+    parser.add_argument("--module", default="HindAi_project.asgi", help="module to import (default: HindAi_project.asgi)")
+    parser.add_argument("--top", type=int, default=25, help="rows per section")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    rows, wall, returncode, stderr_tail = run_importtime(args.module)
+    report = summarize(rows, args.top)
+    report["wall_s"] = round(wall, 3)
+    report["import_ok"] = returncode == 0
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(args.module, report)
+    if returncode != 0:
+        print(f"\nImporting '{args.module}' failed:\n{stderr_tail}", file=sys.stderr)
+    return returncode
+
+
+if __name__ == "__main__":
+    sys.exit(main())
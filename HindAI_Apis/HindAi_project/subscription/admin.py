@@ -1,11 +1,9 @@
 from django.contrib import admin
 from django import forms
 from django.core.exceptions import ValidationError
-from django.http import HttpResponse
 from django.utils import timezone
-import csv
-import json
 from .models import SubscriptionPlan, UserSubscription
+from .exports import csv_stream, json_array_stream, stream_queryset, streaming_export
 
 # Custom form for SubscriptionPlan with validation
 class SubscriptionPlanForm(forms.ModelForm):
@@ -80,20 +78,12 @@ class SubscriptionPlanAdmin(admin.ModelAdmin):
     
     def export_as_csv(self, request, queryset):
         """Export selected subscription plans as CSV"""
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="subscription_plans_{timezone.now().strftime("%Y%m%d_%H%M%S")}.csv"'
-        
-        writer = csv.writer(response)
-        
-        # Write header
-        writer.writerow([
+        header = [
             'ID', 'Name', 'Duration', 'Days', 'Price', 'Credits', 'Features', 
             'Is Active', 'Is Popular', 'Created At', 'Updated At'
-        ])
-        
-        # Write data
-        for plan in queryset:
-            writer.writerow([
+        ]
+        rows = (
+            [
                 plan.id,
                 plan.name,
                 plan.get_duration_display(),
@@ -105,19 +95,16 @@ class SubscriptionPlanAdmin(admin.ModelAdmin):
                 'Yes' if plan.is_popular else 'No',
                 plan.created_at.strftime('%Y-%m-%d %H:%M:%S'),
                 plan.updated_at.strftime('%Y-%m-%d %H:%M:%S'),
-            ])
-        
-        return response
+            ]
+            for plan in stream_queryset(queryset)
+        )
+        return streaming_export(csv_stream(header, rows), 'text/csv', 'subscription_plans', 'csv')
     export_as_csv.short_description = "Export selected plans as CSV"
     
     def export_as_json(self, request, queryset):
         """Export selected subscription plans as JSON"""
-        response = HttpResponse(content_type='application/json')
-        response['Content-Disposition'] = f'attachment; filename="subscription_plans_{timezone.now().strftime("%Y%m%d_%H%M%S")}.json"'
-        
-        data = []
-        for plan in queryset:
-            data.append({
+        items = (
+            {
                 'id': plan.id,
                 'name': plan.name,
                 'duration': plan.duration,
@@ -130,10 +117,10 @@ class SubscriptionPlanAdmin(admin.ModelAdmin):
                 'is_popular': plan.is_popular,
                 'created_at': plan.created_at.isoformat(),
                 'updated_at': plan.updated_at.isoformat(),
-            })
-        
-        response.write(json.dumps(data, indent=2))
-        return response
+            }
+            for plan in stream_queryset(queryset)
+        )
+        return streaming_export(json_array_stream(items), 'application/json', 'subscription_plans', 'json')
     export_as_json.short_description = "Export selected plans as JSON"
 
 
@@ -217,6 +204,10 @@ class UserSubscriptionAdmin(admin.ModelAdmin):
             return "N/A"
     days_remaining_display.short_description = 'Days Remaining'
     
+    def get_queryset(self, request):
+        """user and plan are shown in every row, fetch them in the same query"""
+        return super().get_queryset(request).select_related('user', 'plan')
+    
     actions = ['activate_subscriptions', 'cancel_subscriptions', 'export_as_csv', 'export_as_json', 'export_detailed_report']
     
     def activate_subscriptions(self, request, queryset):
@@ -253,121 +244,110 @@ class UserSubscriptionAdmin(admin.ModelAdmin):
     cancel_subscriptions.short_description = "Cancel selected subscriptions"
     
     def export_as_csv(self, request, queryset):
-        """Export selected user subscriptions as CSV"""
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="user_subscriptions_{timezone.now().strftime("%Y%m%d_%H%M%S")}.csv"'
-        
-        writer = csv.writer(response)
-        
-        # Write header
-        writer.writerow([
+        """Export selected user subscriptions as CSV (streamed, constant memory)"""
+        header = [
             'ID', 'User Email', 'User Username', 'Plan Name', 'Plan Duration', 'Plan Days',
             'Status', 'Start Date', 'End Date', 'Credits Awarded', 'Auto Renewal',
             'Payment Reference', 'Days Remaining', 'Created At', 'Updated At'
-        ])
-        
-        # Write data
-        for subscription in queryset:
-            writer.writerow([
-                subscription.id,
-                subscription.user.email,
-                subscription.user.username,
-                subscription.plan.name,
-                subscription.plan.get_duration_display(),
-                subscription.plan.days,  # Added plan days
-                subscription.get_status_display(),
-                subscription.start_date.strftime('%Y-%m-%d %H:%M:%S'),
-                subscription.end_date.strftime('%Y-%m-%d %H:%M:%S') if subscription.end_date else 'Not Set',
-                subscription.credits_awarded,
-                'Yes' if subscription.is_auto_renewal else 'No',
-                subscription.payment_reference or 'N/A',
-                subscription.days_remaining(),
-                subscription.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-                subscription.updated_at.strftime('%Y-%m-%d %H:%M:%S'),
-            ])
-        
-        return response
+        ]
+
+        def rows():
+            now = timezone.now()
+            for subscription in stream_queryset(queryset, 'user', 'plan'):
+                yield [
+                    subscription.id,
+                    subscription.user.email,
+                    subscription.user.username,
+                    subscription.plan.name,
+                    subscription.plan.get_duration_display(),
+                    subscription.plan.days,  # Added plan days
+                    subscription.get_status_display(),
+                    subscription.start_date.strftime('%Y-%m-%d %H:%M:%S'),
+                    subscription.end_date.strftime('%Y-%m-%d %H:%M:%S') if subscription.end_date else 'Not Set',
+                    subscription.credits_awarded,
+                    'Yes' if subscription.is_auto_renewal else 'No',
+                    subscription.payment_reference or 'N/A',
+                    subscription.days_remaining(now),
+                    subscription.created_at.strftime('%Y-%m-%d %H:%M:%S'),
+                    subscription.updated_at.strftime('%Y-%m-%d %H:%M:%S'),
+                ]
+
+        return streaming_export(csv_stream(header, rows()), 'text/csv', 'user_subscriptions', 'csv')
     export_as_csv.short_description = "Export selected subscriptions as CSV"
     
     def export_as_json(self, request, queryset):
-        """Export selected user subscriptions as JSON"""
-        response = HttpResponse(content_type='application/json')
-        response['Content-Disposition'] = f'attachment; filename="user_subscriptions_{timezone.now().strftime("%Y%m%d_%H%M%S")}.json"'
-        
-        data = []
-        for subscription in queryset:
-            data.append({
-                'id': subscription.id,
-                'user': {
-                    'email': subscription.user.email,
-                    'username': subscription.user.username,
-                },
-                'plan': {
-                    'name': subscription.plan.name,
-                    'duration': subscription.plan.duration,
-                    'duration_display': subscription.plan.get_duration_display(),
-                    'days': subscription.plan.days,  # Added plan days
-                    'price': str(subscription.plan.price),
-                    'credits': subscription.plan.credits,
-                },
-                'status': subscription.status,
-                'status_display': subscription.get_status_display(),
-                'start_date': subscription.start_date.isoformat(),
-                'end_date': subscription.end_date.isoformat() if subscription.end_date else None,
-                'credits_awarded': subscription.credits_awarded,
-                'is_auto_renewal': subscription.is_auto_renewal,
-                'payment_reference': subscription.payment_reference,
-                'days_remaining': subscription.days_remaining(),
-                'created_at': subscription.created_at.isoformat(),
-                'updated_at': subscription.updated_at.isoformat(),
-            })
-        
-        response.write(json.dumps(data, indent=2))
-        return response
+        """Export selected user subscriptions as JSON (streamed, constant memory)"""
+        def items():
+            now = timezone.now()
+            for subscription in stream_queryset(queryset, 'user', 'plan'):
+                yield {
+                    'id': subscription.id,
+                    'user': {
+                        'email': subscription.user.email,
+                        'username': subscription.user.username,
+                    },
+                    'plan': {
+                        'name': subscription.plan.name,
+                        'duration': subscription.plan.duration,
+                        'duration_display': subscription.plan.get_duration_display(),
+                        'days': subscription.plan.days,  # Added plan days
+                        'price': str(subscription.plan.price),
+                        'credits': subscription.plan.credits,
+                    },
+                    'status': subscription.status,
+                    'status_display': subscription.get_status_display(),
+                    'start_date': subscription.start_date.isoformat(),
+                    'end_date': subscription.end_date.isoformat() if subscription.end_date else None,
+                    'credits_awarded': subscription.credits_awarded,
+                    'is_auto_renewal': subscription.is_auto_renewal,
+                    'payment_reference': subscription.payment_reference,
+                    'days_remaining': subscription.days_remaining(now),
+                    'created_at': subscription.created_at.isoformat(),
+                    'updated_at': subscription.updated_at.isoformat(),
+                }
+
+        return streaming_export(json_array_stream(items()), 'application/json', 'user_subscriptions', 'json')
     export_as_json.short_description = "Export selected subscriptions as JSON"
     
     def export_detailed_report(self, request, queryset):
-        """Export detailed subscription report with analytics"""
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="subscription_detailed_report_{timezone.now().strftime("%Y%m%d_%H%M%S")}.csv"'
-        
-        writer = csv.writer(response)
-        
-        # Write header with additional analytics columns
-        writer.writerow([
+        """Export detailed subscription report with analytics (streamed, constant memory)"""
+        # Header with additional analytics columns
+        header = [
             'ID', 'User Email', 'User Username', 'Plan Name', 'Plan Duration', 'Plan Days', 'Plan Price',
             'Status', 'Start Date', 'End Date', 'Days Active', 'Days Remaining', 
             'Credits Awarded', 'Auto Renewal', 'Payment Reference', 'Is Active Now',
             'Revenue Generated', 'Plan Features', 'Created At', 'Updated At'
-        ])
-        
-        # Write data with additional calculations
-        for subscription in queryset:
-            days_active = (timezone.now().date() - subscription.start_date.date()).days if subscription.start_date else 0
-            revenue = subscription.plan.price if subscription.status in ['active', 'expired'] else 0
-            
-            writer.writerow([
-                subscription.id,
-                subscription.user.email,
-                subscription.user.username,
-                subscription.plan.name,
-                subscription.plan.get_duration_display(),
-                subscription.plan.days,  # Added plan days
-                subscription.plan.price,
-                subscription.get_status_display(),
-                subscription.start_date.strftime('%Y-%m-%d %H:%M:%S'),
-                subscription.end_date.strftime('%Y-%m-%d %H:%M:%S') if subscription.end_date else 'Not Set',
-                days_active,
-                subscription.days_remaining(),
-                subscription.credits_awarded,
-                'Yes' if subscription.is_auto_renewal else 'No',
-                subscription.payment_reference or 'N/A',
-                'Yes' if subscription.is_active() else 'No',
-                revenue,
-                ' | '.join(subscription.plan.get_features_list()),
-                subscription.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-                subscription.updated_at.strftime('%Y-%m-%d %H:%M:%S'),
-            ])
-        
-        return response
+        ]
+
+        def rows():
+            now = timezone.now()
+            today = now.date()
+            for subscription in stream_queryset(queryset, 'user', 'plan'):
+                days_active = (today - subscription.start_date.date()).days if subscription.start_date else 0
+                revenue = subscription.plan.price if subscription.status in ['active', 'expired'] else 0
+
+                yield [
+                    subscription.id,
+                    subscription.user.email,
+                    subscription.user.username,
+                    subscription.plan.name,
+                    subscription.plan.get_duration_display(),
+                    subscription.plan.days,  # Added plan days
+                    subscription.plan.price,
+                    subscription.get_status_display(),
+                    subscription.start_date.strftime('%Y-%m-%d %H:%M:%S'),
+                    subscription.end_date.strftime('%Y-%m-%d %H:%M:%S') if subscription.end_date else 'Not Set',
+                    days_active,
+                    subscription.days_remaining(now),
+                    subscription.credits_awarded,
+                    'Yes' if subscription.is_auto_renewal else 'No',
+                    subscription.payment_reference or 'N/A',
+                    'Yes' if subscription.is_active(now) else 'No',
+                    revenue,
+                    ' | '.join(subscription.plan.get_features_list()),
+                    subscription.created_at.strftime('%Y-%m-%d %H:%M:%S'),
+                    subscription.updated_at.strftime('%Y-%m-%d %H:%M:%S'),
+                ]
+
+        return streaming_export(csv_stream(header, rows()), 'text/csv', 'subscription_detailed_report', 'csv')
     export_detailed_report.short_description = "Export detailed analytics report"
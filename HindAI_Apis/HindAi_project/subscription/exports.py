@@ -0,0 +1,47 @@
+import csv
+import json
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+# rows fetched from the database per round trip while streaming an export
+EXPORT_CHUNK_SIZE = 2000
+
+
+class Echo:
+    """File-like object whose write() hands the line back instead of buffering it."""
+
+    def write(self, value):
+        return value
+
+
+def csv_stream(header, rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def json_array_stream(items):
+    yield '['
+    first = True
+    for item in items:
+        yield ('\n' if first else ',\n') + json.dumps(item, indent=2)
+        first = False
+    yield '\n]'
+
+
+def streaming_export(stream, content_type, filename_prefix, extension):
+    """Wrap a generator in an attachment response; rows are produced as the client reads them."""
+    response = StreamingHttpResponse(stream, content_type=content_type)
+    response['Content-Disposition'] = (
+        f'attachment; filename="{filename_prefix}_{timezone.now().strftime("%Y%m%d_%H%M%S")}.{extension}"'
+    )
+    return response
+
+
+def stream_queryset(queryset, *related):
+    """Iterate a queryset in chunks with its foreign keys joined in the same query."""
+    if related:
+        queryset = queryset.select_related(*related)
+    return queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE)
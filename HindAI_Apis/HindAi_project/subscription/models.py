@@ -116,25 +116,29 @@ class UserSubscription(models.Model):
     def __str__(self):
         return f"{self.user.email} - {self.plan.name} ({self.status})"
     
-    def is_active(self):
-        """Check if subscription is currently active"""
+    def is_active(self, now=None):
+        """Check if subscription is active at `now` (default: the current time)"""
         from django.utils import timezone
+        if now is None:
+            now = timezone.now()
         return (
             self.status == 'active' and 
             self.end_date is not None and 
-            self.end_date > timezone.now()
+            self.end_date > now
         )
     
-    def days_remaining(self):
-        """Calculate days remaining in subscription"""
+    def days_remaining(self, now=None):
+        """Calculate days remaining in subscription at `now` (default: the current time)"""
         from django.utils import timezone
+        if now is None:
+            now = timezone.now()
         
         # Return 0 if end_date is not set
         if self.end_date is None:
             return 0
             
-        if self.end_date > timezone.now():
-            return (self.end_date - timezone.now()).days
+        if self.end_date > now:
+            return (self.end_date - now).days
         return 0
     
     def save(self, *args, **kwargs):
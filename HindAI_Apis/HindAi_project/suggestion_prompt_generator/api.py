@@ -7,7 +7,7 @@ import os
 # Add the agents directory to the path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', '..', 'agents'))
 
-from suggested_agent import create_suggested_agent
+from suggestion_service import suggestion_service
 
 # Create router
 router = APIRouter(prefix="/suggestions", tags=["suggestions"])
@@ -40,10 +40,10 @@ async def generate_suggestions_api(request: SuggestionRequest):
                 detail="Both last_response and user_input are required and cannot be empty"
             )
         
-        # Generate suggestions using the suggested agent
-        suggestions = create_suggested_agent(
-            response=request.last_response,
-            user_input=request.user_input
+        # Generate suggestions through the shared cached / batched service
+        suggestions = await suggestion_service.get_suggestions(
+            user_input=request.user_input,
+            last_response=request.last_response
         )
         
         return SuggestionResponse(
@@ -51,8 +51,16 @@ async def generate_suggestions_api(request: SuggestionRequest):
             status="success"
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Error generating suggestions: {str(e)}"
         )
+
+
+@router.get("/stats")
+async def suggestion_stats():
+    """Cache and batching counters for the suggestion service"""
+    return suggestion_service.stats()
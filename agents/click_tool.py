@@ -3,28 +3,35 @@ from agno.agent import Agent
 from agno.tools import Toolkit
 import re
 from .routes_Data import buttons_info
+from .intent_matcher import get_button_matcher, TOKEN_WEIGHT
+
+CLICK_VERBS = ('button', 'btn', 'click', 'press', 'tap', 'hit', 'select', 'choose')
+CLICK_PATTERN = re.compile(
+    r"(?:click|press|tap|hit|select|choose)\s+(?:on\s+)?(?:the\s+)?([a-zA-Z0-9\-\s&()]+?)(?:\s+button)?(?:\s+please)?$"
+)
 
 class ClickTools(Toolkit):
     def __init__(self, **kwargs):
         super().__init__(name="click_tools", tools=[self.click_button, self.smart_click], **kwargs)
         self.button_keywords = buttons_info()
+        self.button_lookup = {key.lower(): value for key, value in self.button_keywords.items()}
 
     def click_button(self, button: str) -> str:
         """
         Click on a specific button on the website.
         """
         button_lower = button.lower().strip()
-        
+
         # Direct match first
-        for key, value in self.button_keywords.items():
-            if key.lower() == button_lower:
-                return f"CLICK_BUTTON:{value}"
-        
-        # Partial match
-        for key, value in self.button_keywords.items():
-            if button_lower in key.lower() or key.lower() in button_lower:
-                return f"CLICK_BUTTON:{value}"
-        
+        value = self.button_lookup.get(button_lower)
+        if value is not None:
+            return f"CLICK_BUTTON:{value}"
+
+        # Best ranked partial match
+        best = get_button_matcher().best(button_lower, min_score=TOKEN_WEIGHT)
+        if best is not None:
+            return f"CLICK_BUTTON:{self.button_keywords[best]}"
+
         return f"CLICK_ERROR:Button '{button}' not found. Available buttons include: {', '.join(list(self.button_keywords.keys())[:10])}..."
 
     def smart_click(self, instruction: str) -> str:
@@ -35,32 +42,20 @@ class ClickTools(Toolkit):
         instruction_lower = instruction.lower().strip()
         steps = []
 
-        # Enhanced click patterns
-        click_patterns = [
-            r"click\s+(?:on\s+)?(?:the\s+)?([a-zA-Z0-9\-\s&()]+?)(?:\s+button)?(?:\s+please)?$",
-            r"press\s+(?:the\s+)?([a-zA-Z0-9\-\s&()]+?)(?:\s+button)?",
-            r"tap\s+(?:on\s+)?(?:the\s+)?([a-zA-Z0-9\-\s&()]+?)(?:\s+button)?",
-            r"hit\s+(?:the\s+)?([a-zA-Z0-9\-\s&()]+?)(?:\s+button)?",
-            r"select\s+(?:the\s+)?([a-zA-Z0-9\-\s&()]+?)(?:\s+button)?",
-            r"choose\s+(?:the\s+)?([a-zA-Z0-9\-\s&()]+?)(?:\s+button)?"
-        ]
-
-        # Check for explicit click commands
+        # Explicit click command
         click_found = False
-        for pattern in click_patterns:
-            click_match = re.search(pattern, instruction_lower)
-            if click_match:
-                button = click_match.group(1).strip()
-                click_result = self.click_button(button)
-                steps.append(click_result)
-                if "CLICK_BUTTON" in click_result:
-                    steps.append(f"STEP_COMPLETE:Successfully clicked on {button} button")
-                click_found = True
-                break
+        click_match = CLICK_PATTERN.search(instruction_lower)
+        if click_match:
+            button = click_match.group(1).strip()
+            click_result = self.click_button(button)
+            steps.append(click_result)
+            if "CLICK_BUTTON" in click_result:
+                steps.append(f"STEP_COMPLETE:Successfully clicked on {button} button")
+            click_found = True
 
         # Fallback for button-related keywords
         if not click_found:
-            if any(word in instruction_lower for word in ['button', 'btn', 'click', 'press', 'tap', 'hit', 'select', 'choose']):
+            if any(word in instruction_lower for word in CLICK_VERBS):
                 # Extract potential button name
                 button_words = re.sub(r'\b(button|btn|click|press|tap|hit|on|the|please|select|choose)\b', '', instruction_lower)
                 button = button_words.strip()
@@ -0,0 +1,177 @@
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .routes_Data import routes_Database, buttons_info
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# words that only carry the command ("go to the ... page") and never pick a target
+STOPWORDS = frozenset({
+    'a', 'an', 'the', 'to', 'on', 'me', 'my', 'please', 'page', 'button', 'btn',
+    'go', 'navigate', 'take', 'open', 'show', 'click', 'press', 'tap', 'hit',
+    'select', 'choose', 'and', 'for', 'of',
+})
+
+PHRASE_WEIGHT = 4   # per token of a keyword phrase found contiguously in the query
+NAME_BONUS = 3      # the phrase is the target's own name
+EXACT_BONUS = 8     # the query, without the command words around it, is exactly the phrase
+TOKEN_WEIGHT = 1    # a query token that only appears inside a longer phrase
+
+
+def tokenize(text: str) -> Tuple[str, ...]:
+    """Lowercase the text and split it into alphanumeric tokens."""
+    return tuple(TOKEN_RE.findall(text.lower()))
+
+
+def core_span(tokens: Tuple[str, ...]) -> Tuple[int, int]:
+    """(start, end) of the tokens without the leading and trailing stopwords."""
+    start, end = 0, len(tokens)
+    while start < end and tokens[start] in STOPWORDS:
+        start += 1
+    while end > start and tokens[end - 1] in STOPWORDS:
+        end -= 1
+    return start, end
+
+
+class IntentMatcher:
+    """
+    Phrase index over (target, keywords) pairs.
+
+    Every keyword is stored as a token tuple in a dict, so matching a query
+    only looks up the n-grams of the query (bounded by the longest keyword
+    starting at each token) instead of scanning every keyword. Results are
+    ranked, best first.
+
+    best() remembers the winner for each keyword: a query that is exactly
+    a keyword once the command words around it are stripped ("take me to
+    the home page" -> "home") is answered from that memo when no keyword
+    overlaps those command words, which leaves the ranking unchanged. Other
+    queries skip the partial-credit pass when it cannot change the winner.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[str, Iterable[str]]]):
+        self.targets: List[str] = []
+        self.phrases: Dict[Tuple[str, ...], List[Tuple[int, bool]]] = {}
+        self.token_index: Dict[str, List[int]] = {}
+        # longest phrase starting with a given token, bounds the n-gram scan
+        self.max_len_by_first: Dict[str, int] = {}
+        # (target_id, score) that best() found for a query that is exactly the phrase
+        self.phrase_winners: Dict[Tuple[str, ...], Tuple[int, int]] = {}
+
+        for target, keywords in entries:
+            target_id = len(self.targets)
+            self.targets.append(target)
+            name_tokens = tokenize(target)
+            seen = set()
+            for phrase in [name_tokens] + [tokenize(kw) for kw in keywords]:
+                if not phrase or phrase in seen:
+                    continue
+                seen.add(phrase)
+                self.phrases.setdefault(phrase, []).append((target_id, phrase == name_tokens))
+                first = phrase[0]
+                self.max_len_by_first[first] = max(self.max_len_by_first.get(first, 0), len(phrase))
+                for token in phrase:
+                    postings = self.token_index.setdefault(token, [])
+                    if not postings or postings[-1] != target_id:
+                        postings.append(target_id)
+
+    def _phrase_scores(self, tokens: Tuple[str, ...], core: Tuple[int, int]) -> Tuple[Dict[int, int], set]:
+        """Scores from keyword phrases found in the tokens, and the tokens those phrases cover."""
+        scores: Dict[int, int] = {}
+        matched = set()
+        covered = set()
+        for start, first in enumerate(tokens):
+            max_len = min(self.max_len_by_first.get(first, 0), len(tokens) - start)
+            for length in range(1, max_len + 1):
+                phrase = tokens[start:start + length]
+                hits = self.phrases.get(phrase)
+                if not hits or phrase in matched:
+                    continue
+                matched.add(phrase)
+                covered.update(phrase)
+                base = PHRASE_WEIGHT * length + (EXACT_BONUS if (start, start + length) == core else 0)
+                for target_id, is_name in hits:
+                    scores[target_id] = scores.get(target_id, 0) + base + (NAME_BONUS if is_name else 0)
+        return scores, covered
+
+    def _overlaps_wrapper(self, tokens: Tuple[str, ...], core: Tuple[int, int]) -> bool:
+        """Whether any keyword phrase in the tokens includes a command word outside the core."""
+        for start, first in enumerate(tokens):
+            max_len = min(self.max_len_by_first.get(first, 0), len(tokens) - start)
+            # phrases starting inside the core only matter when they run past its end
+            shortest = 1 if start < core[0] else max(1, core[1] - start + 1)
+            for length in range(shortest, max_len + 1):
+                if tokens[start:start + length] in self.phrases:
+                    return True
+        return False
+
+    def _add_partial_credit(self, scores: Dict[int, int], uncovered: Iterable[str]) -> None:
+        """Partial credit for words that only occur inside a longer keyword."""
+        for token in uncovered:
+            for target_id in self.token_index.get(token, ()):
+                scores[target_id] = scores.get(target_id, 0) + TOKEN_WEIGHT
+
+    def _score(self, text: str) -> Dict[int, int]:
+        tokens = tokenize(text)
+        if not tokens:
+            return {}
+        scores, covered = self._phrase_scores(tokens, core_span(tokens))
+        self._add_partial_credit(scores, set(tokens) - covered - STOPWORDS)
+        return scores
+
+    def match(self, text: str, limit: Optional[int] = 5) -> List[Tuple[str, int]]:
+        """Return up to `limit` (target, score) pairs for the text, best match first."""
+        # ties keep the order of the source table
+        ranked = sorted(self._score(text).items(), key=lambda item: (-item[1], item[0]))
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [(self.targets[target_id], score) for target_id, score in ranked]
+
+    def best(self, text: str, min_score: int = PHRASE_WEIGHT) -> Optional[str]:
+        """Return the highest ranked target, or None if nothing scores at least `min_score`."""
+        tokens = tokenize(text)
+        if not tokens:
+            return None
+        core = core_span(tokens)
+        phrase = tokens[core[0]:core[1]]
+        if phrase in self.phrases and (len(phrase) == len(tokens) or not self._overlaps_wrapper(tokens, core)):
+            # one keyword wrapped in command words no other keyword touches: ranks exactly like the bare keyword
+            winner = self.phrase_winners.get(phrase)
+            if winner is None:
+                winner = self.phrase_winners[phrase] = self._best(phrase, (0, len(phrase)))
+        else:
+            winner = self._best(tokens, core)
+        if winner is None:
+            return None
+        target_id, score = winner
+        return self.targets[target_id] if score >= min_score else None
+
+    def _best(self, tokens: Tuple[str, ...], core: Tuple[int, int]) -> Optional[Tuple[int, int]]:
+        """(target_id, score) of the highest ranked target, None if nothing matches."""
+        scores, covered = self._phrase_scores(tokens, core)
+        uncovered = set(tokens) - covered - STOPWORDS
+        top = sorted(scores.values(), reverse=True)[:2] + [0, 0]
+        if top[0] - top[1] > TOKEN_WEIGHT * len(uncovered):
+            # each uncovered word adds at most TOKEN_WEIGHT to a target, so a lead larger than that
+            # over the runner-up (or over targets with no phrase at all) is final; only credit the winner
+            target_id = next(target_id for target_id, value in scores.items() if value == top[0])
+            credit = sum(TOKEN_WEIGHT for token in uncovered if target_id in self.token_index.get(token, ()))
+            return target_id, top[0] + credit
+        self._add_partial_credit(scores, uncovered)
+        if not scores:
+            return None
+        score = max(scores.values())
+        return min(target_id for target_id, value in scores.items() if value == score), score
+
+
+@lru_cache(maxsize=None)
+def get_route_matcher() -> IntentMatcher:
+    """Matcher over the navigation routes, built once per process."""
+    return IntentMatcher(routes_Database())
+
+
+@lru_cache(maxsize=None)
+def get_button_matcher() -> IntentMatcher:
+    """Matcher over the clickable buttons, built once per process."""
+    return IntentMatcher((name, []) for name in buttons_info())
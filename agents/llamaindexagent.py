@@ -1,7 +1,8 @@
 from typing import Optional
-import requests
+import httpx
 from agno.tools import Toolkit
 from agno.utils.log import logger
+from components.http_clients import http_clients
 
 class DropboxTools(Toolkit):
     def __init__(self, api_url="https://llamaindex.codewizzz.com", **kwargs):
@@ -32,7 +33,9 @@ class DropboxTools(Toolkit):
                 url = url.split("?")[0] + "?" + "&".join([param for param in url.split("?")[1].split("&") if "what are" not in param.lower()])
 
             logger.info(f"Uploading file from Dropbox: {url}")
-            upload_response = requests.post(
+            upload_response = http_clients.request_sync(
+                "llamaindex",
+                "POST",
                 f"{self.api_url}/upload-from-dropbox",
                 json={"url": url},
                 timeout=60
@@ -45,7 +48,9 @@ class DropboxTools(Toolkit):
 
             # Query the document with the question
             logger.info(f"Querying document with question: {actual_question}")
-            query_response = requests.post(
+            query_response = http_clients.request_sync(
+                "llamaindex",
+                "POST",
                 f"{self.api_url}/query",
                 json={
                     "question": actual_question,
@@ -57,9 +62,9 @@ class DropboxTools(Toolkit):
             
             return query_response.json().get('response', 'No response received')
             
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             error_message = str(e)
-            if hasattr(e, 'response') and e.response is not None:
+            if isinstance(e, httpx.HTTPStatusError):
                 try:
                     error_detail = e.response.json().get('detail', str(e))
                     error_message = f"API Error: {error_detail}"
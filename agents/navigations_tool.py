@@ -5,14 +5,14 @@ import re
 import requests
 import json
 from .routes_Data import routes_Database
+from .intent_matcher import get_route_matcher
 ROUTES = routes_Database()
 
-# Build mappings
 valid_pages = [route[0] for route in ROUTES]
-keyword_to_page = {}
-for page, keywords in ROUTES:
-    for kw in keywords:
-        keyword_to_page[kw.lower()] = page
+
+NAV_PATTERN = re.compile(
+    r"(?:navigate|go|take\s+me|open|show(?:\s+me)?)\s+(?:to\s+)?(?:the\s+)?([a-zA-Z0-9\- ]+?)(?:\s+page)?$"
+)
 
 class NavigationTools(Toolkit):
     def __init__(self, **kwargs):
@@ -36,46 +36,25 @@ class NavigationTools(Toolkit):
         instruction_lower = instruction.lower().strip()
         steps = []
 
-        # Navigation patterns
-        nav_patterns = [
-            r"(?:navigate|go|take\s+me)\s+to\s+(?:the\s+)?([a-zA-Z0-9\- ]+?)(?:\s+page)?",
-            r"open\s+(?:the\s+)?([a-zA-Z0-9\- ]+?)(?:\s+page)?",
-            r"show\s+(?:me\s+)?(?:the\s+)?([a-zA-Z0-9\- ]+?)(?:\s+page)?"
-        ]
-
-        # Check for explicit navigation commands
-        nav_found = False
-        for pattern in nav_patterns:
-            nav_match = re.search(pattern, instruction_lower)
-            if nav_match:
-                page = nav_match.group(1).replace("page", "").strip()
-                mapped_page = self._map_to_page(page)
-                if mapped_page:
-                    steps.append(f"NAVIGATE_TO:{mapped_page}")
-                    steps.append(f"STEP_COMPLETE:Successfully navigated to {mapped_page} page")
-                else:
-                    steps.append(f"NAVIGATION_ERROR:Page '{page}' not found.")
-                nav_found = True
-                break
-
-        # Fallback logic for simple page names
-        if not nav_found:
-            mapped_page = self._map_to_page(instruction_lower)
-            if mapped_page:
-                steps.append(f"NAVIGATE_TO:{mapped_page}")
-                steps.append(f"STEP_COMPLETE:Successfully navigated to {mapped_page} page")
-            else:
-                # If nothing matches, suggest alternatives
-                steps.append(f"NAVIGATION_ERROR:Could not understand '{instruction}'. Try 'navigate to [page]' or specify a valid page name")
+        # Explicit navigation command: keep the phrase for the error message
+        nav_match = NAV_PATTERN.search(instruction_lower)
+        mapped_page = self._map_to_page(instruction_lower)
+        if mapped_page:
+            steps.append(f"NAVIGATE_TO:{mapped_page}")
+            steps.append(f"STEP_COMPLETE:Successfully navigated to {mapped_page} page")
+        elif nav_match:
+            page = nav_match.group(1).replace("page", "").strip()
+            steps.append(f"NAVIGATION_ERROR:Page '{page}' not found.")
+        else:
+            # If nothing matches, suggest alternatives
+            steps.append(f"NAVIGATION_ERROR:Could not understand '{instruction}'. Try 'navigate to [page]' or specify a valid page name")
 
         return " | ".join(steps)
 
     def _map_to_page(self, text: str) -> str:
-        """Helper method to map text to actual page names"""
-        text = text.strip().lower()
-        if text in valid_pages:
-            return text
-        for kw, page in keyword_to_page.items():
-            if kw in text:
-                return page
-        return None
\ No newline at end of file
+        """Helper method to map text to the best ranked page name"""
+        return get_route_matcher().best(text)
+
+    def rank_pages(self, text: str, limit: int = 5) -> List[tuple]:
+        """Ranked (page, score) candidates for the text, best first"""
+        return get_route_matcher().match(text, limit=limit)
@@ -2,7 +2,8 @@ from agno.agent.agent import Agent
 # from agno.memory.v2.db.sqlite import SqliteMemoryDb
 # from agno.memory.v2.memory import Memory
 
-from agno.db.sqlite import SqliteDb
+from components.session_store import get_session_db, reasoning_session_id
+from components.history_compactor import history_compactor
 
 
 from .navigations_tool import NavigationTools
@@ -14,29 +15,11 @@ from .charts import ChartTools
 from .visualization import VisualizationTools
 
 
-from agno.models.openai.like import OpenAILike
-from agno.models.anthropic import Claude
-# from agno.models.cohere import Cohere
-from agno.models.deepinfra import DeepInfra
-from agno.models.deepseek import DeepSeek
-from agno.models.fireworks import Fireworks
-from agno.models.google import Gemini
-from agno.models.groq import Groq
-from agno.models.lmstudio import LMStudio
-from agno.models.meta import Llama
-from agno.models.mistral import MistralChat
-from agno.models.nvidia import Nvidia
-from agno.models.nebius import Nebius
-from agno.models.openai import OpenAIChat
 from agno.models.openrouter import OpenRouter
-from agno.models.perplexity import Perplexity
-from agno.models.sambanova import Sambanova
-from agno.models.together import Together
-from agno.models.vercel import v0
-from agno.models.xai import xAI
 
 from agno.tools.openbb import OpenBBTools
 from agno.tools.tavily import TavilyTools
+from components.tool_cache import tool_cache
 
 import os
 from dotenv import load_dotenv
@@ -49,11 +32,9 @@ load_dotenv(dotenv_path=env_path)
 # Create reasoning-only agent
 async def create_reasoning_agent(model_name,chat_id, username,current_time,base_path,api,model_config):
     """Create a reasoning agent with specific instructions."""
-        # Setup memory database with read-only setting
-    # Create SQLite storage with proper initialization
-    memory_db = SqliteDb(
-        db_file=f"{base_path}/{username}/SqlDB/{chat_id}.db"
-    )
+    # Shared, pooled session store (components/session_store.py)
+    memory_db = get_session_db(base_path, username, chat_id)
+    history = await history_compactor.prepare(base_path, username, chat_id, model_name)
   
     # Define the agent with detailed reasoning instructions
     reasoning_agent = Agent(
@@ -66,11 +47,14 @@ async def create_reasoning_agent(model_name,chat_id, username,current_time,base_
                NavigationTools(),
                ClickTools()],
         db=memory_db,
-        session_id=chat_id,
+        # its own session keeps the chat_id window at one run per turn; the conversation
+        # itself (same recent turns and summary as the main agent) comes in as text
+        session_id=reasoning_session_id(chat_id),
         user_id=username,
         enable_user_memories=False,
-        add_history_to_context=True,
-        read_chat_history=True,
+        add_history_to_context=False,
+        additional_context=history.transcript_context,
+        tool_hooks=[tool_cache.hook],
         instructions=[
             "You are a detailed reasoning engine that breaks down complex problems into comprehensive analytical steps.",
             f"Current time = {current_time}",
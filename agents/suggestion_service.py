@@ -0,0 +1,212 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+from agno.agent import Agent
+from agno.models.openrouter import OpenRouter
+from cachetools import TTLCache
+
+from suggested_agent import suggestion_list
+
+SUGGESTION_CACHE_SIZE = int(os.getenv("SUGGESTION_CACHE_SIZE", "2048"))
+SUGGESTION_CACHE_TTL = int(os.getenv("SUGGESTION_CACHE_TTL", "1800"))  # seconds
+SUGGESTION_BATCH_WINDOW = float(os.getenv("SUGGESTION_BATCH_WINDOW", "0.05"))  # seconds
+SUGGESTION_MAX_BATCH = int(os.getenv("SUGGESTION_MAX_BATCH", "8"))
+RESPONSE_CONTEXT_CHARS = 500
+
+SUGGESTION_DESCRIPTION = (
+    "You are a suggestion generator that creates relevant follow-up prompts based on "
+    "trading and financial conversations. Generate 3-4 short, actionable suggestions."
+)
+SUGGESTION_INSTRUCTIONS = [
+    "Based on the user's question and the response, generate 3-4 relevant follow-up questions",
+    "Keep suggestions short and specific (max 10 words each)",
+    "Focus on trading, financial analysis, and stock market topics",
+    "Make suggestions actionable and related to the current context",
+    "If the conversation was about stock prices, suggest technical analysis, news, or comparison queries",
+    "If about trading, suggest risk management, strategy, or market timing questions",
+    "When several conversations are given, answer with one JSON object mapping each conversation number to its list of suggestions",
+]
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace so trivial edits share a cache entry."""
+    text = re.sub(r"[^\w\s]", " ", text.lower())
+    return " ".join(text.split())
+
+
+def suggestion_cache_key(user_input: str, last_response: str) -> str:
+    """Cache key: normalized user input plus a digest of the response context the model sees."""
+    response_digest = hashlib.sha256(
+        normalize_text(last_response[:RESPONSE_CONTEXT_CHARS]).encode("utf-8")
+    ).hexdigest()
+    return hashlib.sha256(f"{normalize_text(user_input)}|{response_digest}".encode("utf-8")).hexdigest()
+
+
+def build_single_prompt(user_input: str, last_response: str) -> str:
+    return f"""
+    User asked: "{user_input}"
+    Assistant responded: "{last_response[:RESPONSE_CONTEXT_CHARS]}..."
+
+    Generate 3-4 relevant follow-up questions the user might want to ask next.
+    Format each suggestion on a new line with a number.
+    """
+
+
+def build_batch_prompt(items: List[Tuple[str, str]]) -> str:
+    conversations = []
+    for number, (user_input, last_response) in enumerate(items, start=1):
+        conversations.append(
+            f'Conversation {number}:\n'
+            f'User asked: "{user_input}"\n'
+            f'Assistant responded: "{last_response[:RESPONSE_CONTEXT_CHARS]}..."'
+        )
+    return (
+        "\n\n".join(conversations)
+        + "\n\nFor every conversation generate 3-4 relevant follow-up questions the user might want to ask next. "
+        + 'Return only JSON like {"1": ["...", "..."], "2": ["..."]} with one key per conversation number.'
+    )
+
+
+def parse_batch_response(content: str, count: int) -> Dict[int, List[str]]:
+    """Pull the per-conversation lists out of the model output; missing entries are simply left out."""
+    match = re.search(r"\{.*\}", content or "", re.DOTALL)
+    if not match:
+        return {}
+    try:
+        data = json.loads(match.group(0))
+    except json.JSONDecodeError:
+        return {}
+    parsed = {}
+    for number in range(1, count + 1):
+        value = data.get(str(number))
+        if isinstance(value, list):
+            suggestions = [str(item).strip() for item in value if str(item).strip()]
+            if suggestions:
+                parsed[number] = suggestions
+    return parsed
+
+
+class SuggestionService:
+    """
+    Async suggestion generator shared by all requests.
+
+    Results are cached by (normalized user input, response digest). Requests
+    arriving within SUGGESTION_BATCH_WINDOW of each other are sent to the
+    model in a single call, and identical concurrent requests share one result.
+    """
+
+    def __init__(self):
+        self.cache: TTLCache = TTLCache(maxsize=SUGGESTION_CACHE_SIZE, ttl=SUGGESTION_CACHE_TTL)
+        self.inflight: Dict[str, asyncio.Future] = {}
+        self.pending: List[Tuple[str, str, str]] = []
+        self.flush_handle: Optional[asyncio.TimerHandle] = None
+        self.agent: Optional[Agent] = None
+        self.hits = 0
+        self.misses = 0
+        self.llm_calls = 0
+
+    def _get_agent(self) -> Agent:
+        if self.agent is None:
+            self.agent = Agent(
+                model=OpenRouter(id=os.getenv("suggestion_model"), api_key=os.getenv("OPENROUTER_suggestion_API_KEY")),
+                description=SUGGESTION_DESCRIPTION,
+                instructions=SUGGESTION_INSTRUCTIONS,
+            )
+        return self.agent
+
+    async def get_suggestions(self, user_input: str, last_response: str) -> List[str]:
+        key = suggestion_cache_key(user_input, last_response)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.hits += 1
+            return list(cached)
+        self.misses += 1
+
+        future = self.inflight.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self.inflight[key] = future
+            self.pending.append((key, user_input, last_response))
+            if len(self.pending) >= SUGGESTION_MAX_BATCH:
+                self._schedule_flush(0)
+            elif self.flush_handle is None:
+                self._schedule_flush(SUGGESTION_BATCH_WINDOW)
+        return list(await asyncio.shield(future))
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "cache_size": len(self.cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "llm_calls": self.llm_calls,
+        }
+
+    def _schedule_flush(self, delay: float) -> None:
+        loop = asyncio.get_running_loop()
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+        self.flush_handle = loop.call_later(delay, lambda: asyncio.ensure_future(self._flush()))
+
+    async def _flush(self) -> None:
+        self.flush_handle = None
+        batch, self.pending = self.pending[:SUGGESTION_MAX_BATCH], self.pending[SUGGESTION_MAX_BATCH:]
+        if self.pending:
+            self._schedule_flush(0)
+        if not batch:
+            return
+
+        try:
+            results = await self._generate(batch)
+        except Exception as e:
+            print(f"Error generating suggestions: {e}")
+            for key, _, _ in batch:
+                future = self.inflight.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_exception(e)
+            return
+
+        for key, _, _ in batch:
+            suggestions = results.get(key, [])
+            if suggestions:
+                self.cache[key] = tuple(suggestions)
+            future = self.inflight.pop(key, None)
+            if future is not None and not future.done():
+                future.set_result(suggestions)
+
+    async def _generate(self, batch: List[Tuple[str, str, str]]) -> Dict[str, List[str]]:
+        agent = self._get_agent()
+        if len(batch) == 1:
+            key, user_input, last_response = batch[0]
+            self.llm_calls += 1
+            response = await agent.arun(build_single_prompt(user_input, last_response))
+            return {key: suggestion_list(response.content or "")}
+
+        self.llm_calls += 1
+        response = await agent.arun(build_batch_prompt([(u, r) for _, u, r in batch]))
+        parsed = parse_batch_response(response.content, len(batch))
+
+        results = {}
+        retry = []
+        for number, item in enumerate(batch, start=1):
+            if number in parsed:
+                results[item[0]] = parsed[number]
+            else:
+                retry.append(item)
+
+        # conversations the batched answer dropped fall back to one call each
+        if retry:
+            singles = await asyncio.gather(*(self._generate([item]) for item in retry))
+            for single in singles:
+                results.update(single)
+        return results
+
+
+# Global suggestion service instance
+suggestion_service = SuggestionService()
@@ -1,8 +1,9 @@
 from agno.tools import Toolkit
 from agno.utils.log import logger
-import requests
+import httpx
 import os
 import json
+from components.http_clients import http_clients
 
 class TelegramToolkit(Toolkit):
     """
@@ -59,7 +60,7 @@ class TelegramToolkit(Toolkit):
         """Get user information for the given chat ID."""
         try:
             url = f"https://api.telegram.org/bot{self.bot_token}/getChat"
-            response = requests.get(url, params={'chat_id': chat_id}, timeout=10)
+            response = http_clients.request_sync("telegram", "GET", url, params={'chat_id': chat_id}, timeout=10)
             
             if response.status_code == 200:
                 data = response.json()
@@ -106,7 +107,7 @@ class TelegramToolkit(Toolkit):
                 clean_username = clean_username[1:]
             
             url = f"https://api.telegram.org/bot{self.bot_token}/getUpdates"
-            response = requests.get(url, timeout=10)
+            response = http_clients.request_sync("telegram", "GET", url, timeout=10)
             
             if response.status_code == 200:
                 data = response.json()
@@ -146,7 +147,7 @@ class TelegramToolkit(Toolkit):
                 'chat_id': chat_id,
                 'text': 'Bot connection test'
             }
-            response = requests.post(url, json=payload, timeout=10)
+            response = http_clients.request_sync("telegram", "POST", url, json=payload, timeout=10)
             
             if response.status_code == 200:
                 return True
@@ -163,7 +164,7 @@ class TelegramToolkit(Toolkit):
         """Automatically detect chat ID from recent messages."""
         try:
             url = f"https://api.telegram.org/bot{self.bot_token}/getUpdates"
-            response = requests.get(url, timeout=10)
+            response = http_clients.request_sync("telegram", "GET", url, timeout=10)
             
             if response.status_code == 200:
                 data = response.json()
@@ -218,7 +219,7 @@ To set up Telegram integration:
         # Try to get available chats
         try:
             url = f"https://api.telegram.org/bot{self.bot_token}/getUpdates"
-            response = requests.get(url, timeout=10)
+            response = http_clients.request_sync("telegram", "GET", url, timeout=10)
             
             if response.status_code == 200:
                 data = response.json()
@@ -287,7 +288,7 @@ Your bot should respond after you press /start."""
         
         try:
             url = f"https://api.telegram.org/bot{self.bot_token}/getUpdates"
-            response = requests.get(url, timeout=10)
+            response = http_clients.request_sync("telegram", "GET", url, timeout=10)
             
             if response.status_code == 200:
                 data = response.json()
@@ -381,7 +382,7 @@ Please ask the user to:
             logger.info(f"Sending message to Telegram user: {username} (Chat ID: {target_chat_id})")
             
             # Send the message
-            response = requests.post(url, json=payload, timeout=10)
+            response = http_clients.request_sync("telegram", "POST", url, json=payload, timeout=10)
             
             if response.status_code == 200:
                 logger.info("Message sent successfully to Telegram.")
@@ -401,7 +402,7 @@ The user '{username}' may no longer be available. Please ask them to:
                 logger.warning(f"Failed to send message to Telegram: {error_msg}")
                 return f"Failed to send message: {error_msg}"
                 
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.warning(f"Network error while sending to Telegram: {e}")
             return f"Network error: Could not connect to Telegram API"
         except Exception as e:
@@ -487,7 +488,7 @@ Please ask the user to:
                     'caption': caption
                 }
                 
-                response = requests.post(url, files=files, data=data, timeout=30)
+                response = http_clients.request_sync("telegram", "POST", url, files=files, data=data, timeout=30)
             
             if response.status_code == 200:
                 logger.info(f"File {file_path} sent successfully to Telegram.")
@@ -1,11 +1,9 @@
 import json
 import os
 from typing import Any, Dict, List, Optional, Union
-import numpy as np
 
 from agno.tools import Toolkit
 from agno.utils.log import log_info, logger
-import matplotlib.pyplot as plt
 
 class VisualizationTools(Toolkit):
     def __init__(
@@ -1555,6 +1553,7 @@ class VisualizationTools(Toolkit):
 
     def _format_trading_axis(self, ax, x_values, y_values, theme_colors):
         """Format axis specifically for trading data with better spacing and visibility."""
+        import matplotlib.pyplot as plt
         # Smart x-axis label formatting
         if len(x_values) > 20:
             # For very large datasets, show every 5th label
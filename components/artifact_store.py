@@ -0,0 +1,277 @@
+"""
+Artifact serving for generated charts and markdown exports.
+
+Files are only served from configured roots (ARTIFACT_ROOTS, "name=dir;name=dir").
+The first request for a file records its size, mtime, content hash and media
+type in an in-memory index, so later requests answer from memory without
+stat calls. On top of that index:
+
+  * /artifacts/{root}/{hash}/{path} URLs are content addressed and cached as
+    immutable; the plain /artifacts/{root}/{path} form revalidates via ETag;
+  * If-None-Match answers 304, single byte ranges answer 206;
+  * each root serves only its own file types (ROOT_EXTENSIONS), and the
+    markdown root only files under {user}/markdown/;
+  * HTML/JSON/SVG are also kept gzip (and brotli, when the module is
+    installed) compressed, once per content hash, and sent to clients that
+    accept them.
+"""
+import asyncio
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+from typing import Dict, Optional, Tuple
+
+import aiofiles
+from cachetools import TTLCache
+from fastapi import HTTPException, Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+try:
+    import brotli
+except ImportError:  # optional, gzip is always available
+    brotli = None
+
+DEFAULT_CHARTS_DIR = "D:/finsocial/Multi model adding for the trading/agents/charts"
+DEFAULT_MARKDOWN_DIR = os.getenv("BASE_PATH_FOR_CHAT", "D:/finsocial/Multi model adding for the trading/userChats")
+ARTIFACT_ROOTS = os.getenv("ARTIFACT_ROOTS", f"charts={DEFAULT_CHARTS_DIR};markdown={DEFAULT_MARKDOWN_DIR}")
+ARTIFACT_VARIANT_DIR = os.getenv("ARTIFACT_VARIANT_DIR", "media/artifact_variants")
+ARTIFACT_INDEX_SIZE = int(os.getenv("ARTIFACT_INDEX_SIZE", "4096"))
+ARTIFACT_INDEX_TTL = int(os.getenv("ARTIFACT_INDEX_TTL", "300"))  # seconds before an entry is re-checked on disk
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+COMPRESSIBLE_EXTENSIONS = {".html", ".htm", ".json", ".svg"}
+IMAGE_HTML_EXTENSIONS = {".png", ".jpg", ".jpeg", ".gif", ".bmp", ".webp", ".svg", ".html", ".htm"}
+# file types each root may serve; roots added through ARTIFACT_ROOTS get images and HTML only
+ROOT_EXTENSIONS = {
+    "charts": IMAGE_HTML_EXTENSIONS,
+    "markdown": {".md"},
+}
+# the userChats tree also holds chat JSON and session databases; only {user}/markdown/... is served
+ROOT_SUBDIRS = {"markdown": "markdown"}
+STREAM_CHUNK_SIZE = 64 * 1024
+
+MEDIA_TYPES = {
+    ".md": "text/markdown",
+    ".svg": "image/svg+xml",
+    ".webp": "image/webp",
+    ".json": "application/json",
+}
+
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def parse_roots(spec: str) -> Dict[str, str]:
+    roots = {}
+    for item in spec.split(";"):
+        name, sep, directory = item.partition("=")
+        if sep and name.strip() and directory.strip():
+            roots[name.strip()] = os.path.normpath(directory.strip())
+    return roots
+
+
+class ArtifactMeta:
+    def __init__(self, root: str, rel_path: str, path: str, stat_result: os.stat_result, digest: str):
+        self.root = root
+        self.rel_path = rel_path
+        self.path = path
+        self.stat_result = stat_result
+        self.size = stat_result.st_size
+        self.digest = digest
+        self.etag = f'"{digest}"'
+        extension = os.path.splitext(path)[1].lower()
+        self.media_type = MEDIA_TYPES.get(extension) or mimetypes.guess_type(path)[0] or "application/octet-stream"
+        self.compressible = extension in COMPRESSIBLE_EXTENSIONS
+        self.variants: Dict[str, Tuple[str, int]] = {}  # content-encoding -> (path, size)
+
+    @property
+    def url(self) -> str:
+        return f"/artifacts/{self.root}/{self.digest}/{self.rel_path}"
+
+
+class ArtifactStore:
+    def __init__(self, roots: Dict[str, str], variant_dir: str = ARTIFACT_VARIANT_DIR):
+        self.roots = roots
+        self.variant_dir = variant_dir
+        self.index: TTLCache = TTLCache(maxsize=ARTIFACT_INDEX_SIZE, ttl=ARTIFACT_INDEX_TTL)
+        self.lock = threading.Lock()
+
+    def resolve(self, root: str, rel_path: str) -> str:
+        """
+        Absolute path of rel_path inside a root; refuses anything that escapes it,
+        has a file type the root does not serve, or is outside the root's subdirectory.
+        """
+        base = self.roots.get(root)
+        if base is None:
+            raise HTTPException(status_code=404, detail="Unknown artifact root")
+        path = os.path.normpath(os.path.join(base, rel_path.replace("\\", "/").lstrip("/")))
+        if path == base or os.path.commonpath([base, path]) != base:
+            raise HTTPException(status_code=403, detail="Access denied")
+        if os.path.splitext(path)[1].lower() not in ROOT_EXTENSIONS.get(root, IMAGE_HTML_EXTENSIONS):
+            raise HTTPException(status_code=403, detail="Access denied")
+        subdir = ROOT_SUBDIRS.get(root)
+        parts = os.path.relpath(path, base).split(os.sep)
+        if subdir and (len(parts) < 3 or parts[1] != subdir):
+            raise HTTPException(status_code=403, detail="Access denied")
+        return path
+
+    def locate(self, file_path: str) -> Tuple[str, str]:
+        """(root, relative path) of an absolute path, for endpoints that take full paths."""
+        path = os.path.normpath(file_path.strip().strip('"').strip("'"))
+        for root, base in self.roots.items():
+            try:
+                if os.path.commonpath([base, path]) == base:
+                    return root, os.path.relpath(path, base).replace(os.sep, "/")
+            except ValueError:  # different drives on Windows
+                continue
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    def _build(self, root: str, rel_path: str) -> ArtifactMeta:
+        path = self.resolve(root, rel_path)
+        try:
+            stat_result = os.stat(path)
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="File not found")
+        if not os.path.isfile(path):
+            raise HTTPException(status_code=400, detail="Path is not a file")
+
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            while chunk := f.read(1024 * 1024):
+                digest.update(chunk)
+        meta = ArtifactMeta(root, rel_path, path, stat_result, digest.hexdigest()[:20])
+        if meta.compressible:
+            self._build_variants(meta)
+        return meta
+
+    def _build_variants(self, meta: ArtifactMeta) -> None:
+        """Compressed copies, named by content hash so each is made once and never goes stale."""
+        encoders = [("gzip", ".gz", lambda data: gzip.compress(data, compresslevel=9))]
+        if brotli is not None:
+            encoders.insert(0, ("br", ".br", lambda data: brotli.compress(data, quality=11)))
+        data = None
+        os.makedirs(self.variant_dir, exist_ok=True)
+        for encoding, suffix, compress in encoders:
+            variant_path = os.path.join(self.variant_dir, f"{meta.digest}{suffix}")
+            if not os.path.exists(variant_path):
+                if data is None:
+                    with open(meta.path, "rb") as f:
+                        data = f.read()
+                tmp_path = f"{variant_path}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(compress(data))
+                os.replace(tmp_path, variant_path)
+            size = os.path.getsize(variant_path)
+            if size < meta.size:
+                meta.variants[encoding] = (variant_path, size)
+
+    async def get(self, root: str, rel_path: str) -> ArtifactMeta:
+        key = (root, rel_path)
+        with self.lock:
+            meta = self.index.get(key)
+        if meta is None:
+            meta = await asyncio.to_thread(self._build, root, rel_path)
+            with self.lock:
+                self.index[key] = meta
+        return meta
+
+    async def url_for(self, file_path: str) -> str:
+        """Content-hash URL for an absolute path inside one of the roots."""
+        root, rel_path = self.locate(file_path)
+        return (await self.get(root, rel_path)).url
+
+    def forget(self, root: str, rel_path: str) -> None:
+        with self.lock:
+            self.index.pop((root, rel_path), None)
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    return header.strip() == "*" or etag in [tag.strip().removeprefix("W/") for tag in header.split(",")]
+
+
+def _choose_encoding(request: Request, meta: ArtifactMeta) -> Optional[str]:
+    accepted = request.headers.get("accept-encoding", "")
+    for encoding in ("br", "gzip"):
+        if encoding in meta.variants and encoding in accepted:
+            return encoding
+    return None
+
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """(start, end) inclusive for a single "bytes=" range; None to serve the whole file."""
+    match = RANGE_PATTERN.match(header.strip())
+    if not match or size == 0:
+        return None
+    start, end = match.groups()
+    if start == "" and end == "":
+        return None
+    if start == "":
+        length = int(end)
+        if length == 0:
+            raise HTTPException(status_code=416, detail="Range not satisfiable", headers={"Content-Range": f"bytes */{size}"})
+        return max(0, size - length), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or start > end:
+        raise HTTPException(status_code=416, detail="Range not satisfiable", headers={"Content-Range": f"bytes */{size}"})
+    return start, end
+
+
+async def _read_range(path: str, start: int, end: int):
+    async with aiofiles.open(path, "rb") as f:
+        await f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = await f.read(min(STREAM_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def artifact_response(request: Request, meta: ArtifactMeta, immutable: bool = False,
+                      disposition: Optional[str] = None) -> Response:
+    """Response for an indexed artifact honouring If-None-Match, Range and Accept-Encoding."""
+    headers = {
+        "ETag": meta.etag,
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL if immutable else REVALIDATE_CACHE_CONTROL,
+        "Content-Location": meta.url,
+        "Accept-Ranges": "bytes",
+    }
+    if meta.variants:
+        headers["Vary"] = "Accept-Encoding"
+    if disposition:
+        headers["Content-Disposition"] = disposition
+
+    if _etag_matches(request, meta.etag):
+        return Response(status_code=304, headers=headers)
+
+    range_header = request.headers.get("range")
+    if range_header and request.headers.get("if-range", meta.etag) == meta.etag:
+        byte_range = _parse_range(range_header, meta.size)
+        if byte_range is not None:
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end}/{meta.size}"
+            headers["Content-Length"] = str(end - start + 1)
+            return StreamingResponse(_read_range(meta.path, start, end), status_code=206,
+                                     media_type=meta.media_type, headers=headers)
+
+    encoding = _choose_encoding(request, meta)
+    if encoding:
+        variant_path, variant_size = meta.variants[encoding]
+        headers["Content-Encoding"] = encoding
+        headers["Content-Length"] = str(variant_size)
+        return StreamingResponse(_read_range(variant_path, 0, variant_size - 1),
+                                 media_type=meta.media_type, headers=headers)
+
+    # stat_result from the index spares FileResponse its own stat call
+    return FileResponse(meta.path, media_type=meta.media_type, headers=headers, stat_result=meta.stat_result)
+
+
+# Global artifact store instance
+artifact_store = ArtifactStore(parse_roots(ARTIFACT_ROOTS))
@@ -1,24 +1,144 @@
-from agno.tools.duckdb import DuckDbTools
-from agno.tools.python import PythonTools
-from agno.tools.youtube import YouTubeTools
-from agno.tools.wikipedia import WikipediaTools
-from agno.tools.crawl4ai import Crawl4aiTools
-from agno.tools.pubmed import PubmedTools
-from agno.tools.jina import JinaReaderTools
-from agno.tools.yfinance import YFinanceTools
-from agno.tools.newspaper4k import Newspaper4kTools
-from agno.tools.duckduckgo import DuckDuckGoTools
-from agno.tools.googlesearch import GoogleSearchTools
-# Initialize Searxng with your Searxng instance URL
-
-def get_google_Search_tools(google_search:str):
-    return  [DuckDuckGoTools(),GoogleSearchTools()
-             ,DuckDbTools(), PythonTools(cache_results=True),
-                       YouTubeTools(cache_results=True), Crawl4aiTools(max_length=None),
-                       PubmedTools(cache_results=True), WikipediaTools(cache_results=True),
-                       JinaReaderTools(cache_results=True), Newspaper4kTools(cache_results=True),
-                       YFinanceTools(stock_price=True, analyst_recommendations=True,
-                                   company_info=True, company_news=True, cache_results=True)]
-    
-    
-    
\ No newline at end of file
+import re
+import threading
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+# Toolkits are imported and built lazily, once per process. Each entry maps a
+# toolkit name to (categories it serves, factory). The factory does its own
+# import so heavy modules (duckdb, crawl4ai, yfinance, ...) are only loaded
+# when a request actually needs them.
+
+
+def _duckduckgo():
+    from agno.tools.duckduckgo import DuckDuckGoTools
+    return DuckDuckGoTools()
+
+
+def _googlesearch():
+    from agno.tools.googlesearch import GoogleSearchTools
+    return GoogleSearchTools()
+
+
+def _duckdb():
+    from agno.tools.duckdb import DuckDbTools
+    return DuckDbTools()
+
+
+def _python():
+    from agno.tools.python import PythonTools
+    return PythonTools(cache_results=True)
+
+
+def _youtube():
+    from agno.tools.youtube import YouTubeTools
+    return YouTubeTools(cache_results=True)
+
+
+def _crawl4ai():
+    from agno.tools.crawl4ai import Crawl4aiTools
+    return Crawl4aiTools(max_length=None)
+
+
+def _pubmed():
+    from agno.tools.pubmed import PubmedTools
+    return PubmedTools(cache_results=True)
+
+
+def _wikipedia():
+    from agno.tools.wikipedia import WikipediaTools
+    return WikipediaTools(cache_results=True)
+
+
+def _jina():
+    from agno.tools.jina import JinaReaderTools
+    return JinaReaderTools(cache_results=True)
+
+
+def _newspaper4k():
+    from agno.tools.newspaper4k import Newspaper4kTools
+    return Newspaper4kTools(cache_results=True)
+
+
+def _yfinance():
+    from agno.tools.yfinance import YFinanceTools
+    return YFinanceTools(stock_price=True, analyst_recommendations=True,
+                         company_info=True, company_news=True, cache_results=True)
+
+
+TOOLKIT_FACTORIES: Dict[str, Tuple[Set[str], Callable]] = {
+    "duckduckgo": ({"web"}, _duckduckgo),
+    "googlesearch": ({"web"}, _googlesearch),
+    "duckdb": ({"data"}, _duckdb),
+    "python": ({"code", "data"}, _python),
+    "youtube": ({"video"}, _youtube),
+    "crawl4ai": ({"web_page"}, _crawl4ai),
+    "pubmed": ({"medical"}, _pubmed),
+    "wikipedia": ({"encyclopedia"}, _wikipedia),
+    "jina": ({"web_page"}, _jina),
+    "newspaper4k": ({"news", "web_page"}, _newspaper4k),
+    "yfinance": ({"finance"}, _yfinance),
+}
+
+# web search is always attached when google_search is on
+DEFAULT_CATEGORIES = {"web"}
+
+CATEGORY_PATTERNS: Dict[str, re.Pattern] = {
+    "finance": re.compile(
+        r"\b(stocks?|shares?|price|prices|ticker|market|nasdaq|nyse|nifty|sensex|earnings|dividend|"
+        r"analyst|valuation|portfolio|crypto|bitcoin|etf|ipo|revenue|quote)\b|\$[A-Za-z]{1,5}\b",
+        re.IGNORECASE,
+    ),
+    "news": re.compile(r"\b(news|headlines?|latest|breaking|today|article|press release)\b", re.IGNORECASE),
+    "video": re.compile(r"\b(youtube|youtu\.be|video|videos|transcript)\b", re.IGNORECASE),
+    "medical": re.compile(
+        r"\b(pubmed|medical|medicine|disease|clinical|drug|trial|symptoms?|health|study|studies)\b",
+        re.IGNORECASE,
+    ),
+    "encyclopedia": re.compile(r"\b(wikipedia|who (is|was)|history of|biography|define|definition)\b", re.IGNORECASE),
+    "web_page": re.compile(r"https?://|www\.", re.IGNORECASE),
+    "data": re.compile(r"\b(csv|sql|dataset|duckdb|parquet|table|query the data)\b", re.IGNORECASE),
+    "code": re.compile(r"\b(python|calculate|compute|code|script|simulate|regression)\b", re.IGNORECASE),
+}
+
+_toolkits: Dict[str, object] = {}
+_toolkit_lock = threading.Lock()
+
+
+def get_toolkit(name: str):
+    """Return the process-wide instance of a search toolkit, building it on first use."""
+    toolkit = _toolkits.get(name)
+    if toolkit is None:
+        with _toolkit_lock:
+            toolkit = _toolkits.get(name)
+            if toolkit is None:
+                toolkit = TOOLKIT_FACTORIES[name][1]()
+                _toolkits[name] = toolkit
+    return toolkit
+
+
+def classify_query(query: str) -> Set[str]:
+    """Return the tool categories a query needs, always including plain web search."""
+    categories = set(DEFAULT_CATEGORIES)
+    for category, pattern in CATEGORY_PATTERNS.items():
+        if pattern.search(query):
+            categories.add(category)
+    return categories
+
+
+def select_toolkit_names(query: Optional[str]) -> List[str]:
+    if query is None:
+        return list(TOOLKIT_FACTORIES)
+    categories = classify_query(query)
+    return [name for name, (served, _) in TOOLKIT_FACTORIES.items() if served & categories]
+
+
+def get_google_Search_tools(google_search: str, query: Optional[str] = None):
+    """
+    Search toolkits for a request.
+
+    With `query` only the toolkits relevant to it are attached, which keeps both
+    construction time and the tool schema sent to the model small. Without it
+    every toolkit is returned, as before.
+    """
+    if google_search != 'y':
+        return []
+    return [get_toolkit(name) for name in select_toolkit_names(query)]
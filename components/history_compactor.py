@@ -0,0 +1,214 @@
+"""
+Token-budgeted chat history compaction.
+
+For each turn the agent gets:
+  * the most recent turns verbatim (as many as fit the model's budget, at most
+    HISTORY_RUNS), loaded by agno from the session store via num_history_runs;
+  * everything older as one rolling summary, passed as additional context.
+
+num_history_runs counts session runs, so it only matches the turn count
+because the main agent is the only one writing to the chat_id session. The
+reasoning agent stores its runs under reasoning_session_id and gets the same
+recent turns as text from the chat JSON (transcript_context) instead of
+loading a session. While the summary lags behind, the verbatim window is
+widened over the gap so no turn is left out of both.
+
+Turns are read from the chat JSON file and counted with the same tokenizer as
+token_Generation. Summaries are cached next to the chat file and extended
+incrementally in a background task, so a request never waits for one: it uses
+whatever summary is ready and the next turn picks up the newer one.
+"""
+import asyncio
+import json
+import os
+from typing import Dict, List, Optional
+
+from components.session_store import HISTORY_RUNS
+from token_Generation.token_gen import count_tokens
+
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "6000"))
+HISTORY_SUMMARY_SHARE = float(os.getenv("HISTORY_SUMMARY_SHARE", "0.25"))  # part of the budget kept for the summary
+HISTORY_SUMMARY_CHUNK_TOKENS = int(os.getenv("HISTORY_SUMMARY_CHUNK_TOKENS", "3000"))
+HISTORY_SUMMARY_MODEL = os.getenv("HISTORY_SUMMARY_MODEL") or os.getenv("suggestion_model")
+
+# history budgets for models with small context windows, matched by substring of the model id
+MODEL_HISTORY_BUDGETS: Dict[str, int] = {
+    "jamba": 4000,
+    "gemma": 3000,
+    "llama-3.1-8b": 3000,
+    "mistral-7b": 3000,
+}
+
+
+def history_budget(model_name: Optional[str]) -> int:
+    name = (model_name or "").lower()
+    for fragment, budget in MODEL_HISTORY_BUDGETS.items():
+        if fragment in name:
+            return budget
+    return HISTORY_TOKEN_BUDGET
+
+
+def turn_text(entry: dict) -> str:
+    user_message = entry.get("Translated user message") or entry.get("user message", "")
+    return f"User: {user_message}\nAssistant: {entry.get('AI Message', '')}"
+
+
+class HistoryContext:
+    def __init__(self, recent_runs: int, summary: Optional[str], recent_tokens: int, summary_tokens: int,
+                 recent_text: Optional[str] = None):
+        self.recent_runs = recent_runs
+        self.summary = summary
+        self.recent_tokens = recent_tokens
+        self.summary_tokens = summary_tokens
+        self.recent_text = recent_text
+
+    @property
+    def additional_context(self) -> Optional[str]:
+        if not self.summary:
+            return None
+        return f"Summary of the earlier part of this conversation:\n{self.summary}"
+
+    @property
+    def transcript_context(self) -> Optional[str]:
+        """Summary plus the recent turns as text, for agents that do not load the chat session."""
+        parts = [self.additional_context] if self.summary else []
+        if self.recent_text:
+            parts.append(f"Most recent turns of this conversation:\n{self.recent_text}")
+        return "\n\n".join(parts) or None
+
+
+class HistoryCompactor:
+    def __init__(self):
+        self.inflight: Dict[str, asyncio.Task] = {}
+        self.agent = None
+
+    def chat_file(self, base_path: str, username: str, chat_id: str) -> str:
+        return os.path.join(base_path, username, "Json", f"{chat_id}.json")
+
+    def summary_file(self, base_path: str, username: str, chat_id: str) -> str:
+        return os.path.join(base_path, username, "Json", f"{chat_id}.summary.json")
+
+    def load_turns(self, base_path: str, username: str, chat_id: str) -> List[dict]:
+        """Completed turns of the chat, oldest first (the in-flight turn has no AI Message yet)."""
+        try:
+            with open(self.chat_file(base_path, username, chat_id), "r") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return []
+        return [entry for entry in data if entry.get("AI Message")]
+
+    def load_summary(self, base_path: str, username: str, chat_id: str) -> dict:
+        try:
+            with open(self.summary_file(base_path, username, chat_id), "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {"covered": 0, "summary": ""}
+
+    def save_summary(self, base_path: str, username: str, chat_id: str, covered: int, summary: str) -> None:
+        path = self.summary_file(base_path, username, chat_id)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"covered": covered, "summary": summary}, f, indent=4)
+        os.replace(tmp_path, path)
+
+    def plan(self, base_path: str, username: str, chat_id: str, model_name: Optional[str]):
+        """Pick how many recent turns fit the budget; returns (context, turns, summary record)."""
+        turns = self.load_turns(base_path, username, chat_id)
+        budget = history_budget(model_name)
+        recent_budget = int(budget * (1 - HISTORY_SUMMARY_SHARE))
+
+        recent_runs = 0
+        recent_tokens = 0
+        for entry in reversed(turns[-HISTORY_RUNS:] if HISTORY_RUNS > 0 else []):
+            tokens = count_tokens(turn_text(entry))
+            if recent_runs and recent_tokens + tokens > recent_budget:
+                break
+            recent_runs += 1
+            recent_tokens += tokens
+
+        record = self.load_summary(base_path, username, chat_id)
+        covered = min(record.get("covered", 0), len(turns)) if record.get("summary") else 0
+        # turns between the summary and the window would be dropped; widen the window over them
+        while len(turns) - recent_runs > covered and recent_runs < min(HISTORY_RUNS, len(turns)):
+            recent_runs += 1
+            recent_tokens += count_tokens(turn_text(turns[-recent_runs]))
+        dropped = len(turns) - recent_runs - covered
+        if dropped > 0:
+            print(f"History for {username}/{chat_id}: {dropped} turns not in the window or the summary yet")
+
+        summary = None
+        summary_tokens = 0
+        if len(turns) > recent_runs and record.get("summary"):
+            summary = record["summary"]
+            summary_tokens = count_tokens(summary)
+            room = max(budget - recent_tokens, int(budget * HISTORY_SUMMARY_SHARE))
+            if summary_tokens > room:
+                # a stale summary can outgrow what is left; keep its most recent part
+                summary = summary[-room * 4:]  # ~4 characters per token
+                summary_tokens = count_tokens(summary)
+        recent_text = "\n\n".join(turn_text(entry) for entry in turns[len(turns) - recent_runs:]) if recent_runs else None
+        return HistoryContext(recent_runs, summary, recent_tokens, summary_tokens, recent_text), turns, record
+
+    async def prepare(self, base_path: str, username: str, chat_id: str, model_name: Optional[str] = None) -> HistoryContext:
+        """History plan for the next agent run; schedules summary catch-up in the background."""
+        context, turns, record = await asyncio.to_thread(self.plan, base_path, username, chat_id, model_name)
+        older = len(turns) - context.recent_runs
+        if older > record.get("covered", 0):
+            self._schedule_summary(base_path, username, chat_id, older)
+        return context
+
+    def _schedule_summary(self, base_path: str, username: str, chat_id: str, upto: int) -> None:
+        key = f"{username}/{chat_id}"
+        if key in self.inflight and not self.inflight[key].done():
+            return
+        task = asyncio.get_running_loop().create_task(self._summarize(base_path, username, chat_id, upto))
+        self.inflight[key] = task
+        task.add_done_callback(lambda _: self.inflight.pop(key, None))
+
+    def _get_agent(self):
+        if self.agent is None:
+            from agno.agent import Agent
+            from agno.models.openrouter import OpenRouter
+            self.agent = Agent(
+                model=OpenRouter(id=HISTORY_SUMMARY_MODEL, api_key=os.getenv("OPENROUTER_API_KEY"), max_tokens=600),
+                description="You maintain a compact running summary of a conversation between a user and a trading assistant.",
+                instructions=[
+                    "Merge the new turns into the existing summary",
+                    "Keep facts the assistant may need later: tickers, figures, user preferences, decisions and open questions",
+                    "Drop greetings, repetition and formatting",
+                    "Write plain prose, at most 250 words",
+                ],
+            )
+        return self.agent
+
+    async def _summarize(self, base_path: str, username: str, chat_id: str, upto: int) -> None:
+        """Fold turns [covered, upto) into the rolling summary, one token-bounded chunk per call."""
+        try:
+            turns = await asyncio.to_thread(self.load_turns, base_path, username, chat_id)
+            record = await asyncio.to_thread(self.load_summary, base_path, username, chat_id)
+            covered, summary = record.get("covered", 0), record.get("summary", "")
+            upto = min(upto, len(turns))
+            while covered < upto:
+                chunk, chunk_tokens = [], 0
+                while covered + len(chunk) < upto:
+                    text = turn_text(turns[covered + len(chunk)])
+                    tokens = count_tokens(text)
+                    if chunk and chunk_tokens + tokens > HISTORY_SUMMARY_CHUNK_TOKENS:
+                        break
+                    chunk.append(text)
+                    chunk_tokens += tokens
+                prompt = (
+                    f"Existing summary:\n{summary or '(none yet)'}\n\n"
+                    "New turns:\n" + "\n\n".join(chunk) + "\n\nReturn the updated summary only."
+                )
+                response = await self._get_agent().arun(prompt)
+                summary = (response.content or summary).strip()
+                covered += len(chunk)
+                await asyncio.to_thread(self.save_summary, base_path, username, chat_id, covered, summary)
+            print(f"History summary for {username}/{chat_id} now covers {covered} turns")
+        except Exception as e:
+            print(f"Error summarizing history for {username}/{chat_id}: {e}")
+
+
+# Global history compactor instance
+history_compactor = HistoryCompactor()
@@ -0,0 +1,169 @@
+"""
+Shared HTTP clients for outbound integrations.
+
+One keep-alive (HTTP/2 when the `h2` package is installed) connection pool per
+upstream host, with per-host timeouts, connection limits and retry policy.
+Async callers use `http_clients.request(...)`, synchronous agno toolkits use
+`http_clients.request_sync(...)`. The FastAPI lifespan calls `start()` and
+`aclose()`; clients are otherwise created lazily on first use.
+"""
+import asyncio
+import importlib.util
+import random
+import threading
+import time
+from typing import Dict, FrozenSet, Optional
+
+import httpx
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# statuses worth retrying for idempotent requests
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+class HostPolicy:
+    """Connection and retry settings for one upstream host."""
+
+    def __init__(self, base_url: str, timeout: float = 10.0, connect_timeout: float = 5.0,
+                 max_connections: int = 20, max_keepalive: int = 10, keepalive_expiry: float = 30.0,
+                 retries: int = 2, backoff_base: float = 0.25, backoff_cap: float = 4.0,
+                 retry_methods: FrozenSet[str] = IDEMPOTENT_METHODS, http2: bool = True):
+        self.base_url = base_url
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.retry_methods = retry_methods
+        self.http2 = http2 and HTTP2_AVAILABLE
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+
+    def should_retry(self, method: str, attempt: int, response: Optional[httpx.Response] = None,
+                     error: Optional[Exception] = None) -> bool:
+        if attempt >= self.retries:
+            return False
+        # the request never reached the server, safe to resend whatever the method
+        if isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)):
+            return True
+        if method.upper() not in self.retry_methods:
+            return False
+        if error is not None:
+            return isinstance(error, httpx.TransportError)
+        return response is not None and response.status_code in RETRY_STATUSES
+
+
+UPSTREAMS: Dict[str, HostPolicy] = {
+    # order creation is a POST, only retried when the connection itself failed
+    "razorpay": HostPolicy("https://api.razorpay.com", timeout=15.0, max_connections=20, retries=2),
+    # file uploads share this pool; pass a larger per-request timeout for them
+    "telegram": HostPolicy("https://api.telegram.org", timeout=10.0, max_connections=10, retries=2),
+    "llamaindex": HostPolicy("https://llamaindex.codewizzz.com", timeout=60.0, max_connections=10, retries=1),
+    # LLM providers, used for cheap API-key validation calls
+    "openrouter": HostPolicy("https://openrouter.ai", timeout=10.0, max_connections=10, retries=1),
+    "openai": HostPolicy("https://api.openai.com", timeout=10.0, max_connections=10, retries=1),
+    "sambanova": HostPolicy("https://api.sambanova.ai", timeout=15.0, max_connections=10, retries=1),
+    "nvidia": HostPolicy("https://integrate.api.nvidia.com", timeout=15.0, max_connections=10, retries=1),
+    "nebius": HostPolicy("https://api.studio.nebius.com", timeout=10.0, max_connections=10, retries=1),
+    "gemini": HostPolicy("https://generativelanguage.googleapis.com", timeout=10.0, max_connections=10, retries=1),
+    "mistral": HostPolicy("https://api.mistral.ai", timeout=10.0, max_connections=10, retries=1),
+}
+
+
+class HttpClientRegistry:
+    def __init__(self, policies: Dict[str, HostPolicy]):
+        self.policies = policies
+        self.async_clients: Dict[str, httpx.AsyncClient] = {}
+        self.sync_clients: Dict[str, httpx.Client] = {}
+        self.sync_lock = threading.Lock()
+
+    def _policy(self, name: str) -> HostPolicy:
+        try:
+            return self.policies[name]
+        except KeyError:
+            raise KeyError(f"No HTTP upstream configured for '{name}'") from None
+
+    def get_async(self, name: str) -> httpx.AsyncClient:
+        client = self.async_clients.get(name)
+        if client is None or client.is_closed:
+            policy = self._policy(name)
+            client = httpx.AsyncClient(
+                base_url=policy.base_url, timeout=policy.timeout, limits=policy.limits, http2=policy.http2
+            )
+            self.async_clients[name] = client
+        return client
+
+    def get_sync(self, name: str) -> httpx.Client:
+        client = self.sync_clients.get(name)
+        if client is None or client.is_closed:
+            with self.sync_lock:
+                client = self.sync_clients.get(name)
+                if client is None or client.is_closed:
+                    policy = self._policy(name)
+                    client = httpx.Client(
+                        base_url=policy.base_url, timeout=policy.timeout, limits=policy.limits, http2=policy.http2
+                    )
+                    self.sync_clients[name] = client
+        return client
+
+    async def request(self, name: str, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send a request through the pooled async client of `name`, retrying per its policy."""
+        policy = self._policy(name)
+        client = self.get_async(name)
+        attempt = 0
+        while True:
+            try:
+                response = await client.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                if not policy.should_retry(method, attempt, error=e):
+                    raise
+            else:
+                if not policy.should_retry(method, attempt, response=response):
+                    return response
+                await response.aclose()
+            await asyncio.sleep(policy.backoff(attempt))
+            attempt += 1
+
+    def request_sync(self, name: str, method: str, url: str, **kwargs) -> httpx.Response:
+        """Blocking variant of `request` for synchronous toolkits."""
+        policy = self._policy(name)
+        client = self.get_sync(name)
+        attempt = 0
+        while True:
+            try:
+                response = client.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                if not policy.should_retry(method, attempt, error=e):
+                    raise
+            else:
+                if not policy.should_retry(method, attempt, response=response):
+                    return response
+                response.close()
+            time.sleep(policy.backoff(attempt))
+            attempt += 1
+
+    async def start(self) -> None:
+        """Open the async pools up front (called from the FastAPI lifespan)."""
+        for name in self.policies:
+            self.get_async(name)
+        print(f"HTTP client pools ready: {', '.join(self.policies)} (http2={HTTP2_AVAILABLE})")
+
+    async def aclose(self) -> None:
+        for client in self.async_clients.values():
+            await client.aclose()
+        self.async_clients.clear()
+        with self.sync_lock:
+            for client in self.sync_clients.values():
+                client.close()
+            self.sync_clients.clear()
+
+
+# Global registry shared by every outbound integration
+http_clients = HttpClientRegistry(UPSTREAMS)
@@ -2,7 +2,9 @@ import os
 import json
 from datetime import datetime
 import uuid
+from components.tracing import tracer
 
+@tracer.traced("json_persistence", target="chat_history")
 def save_message_to_json(username: str, chat_id: str, message: str, base_path) -> str:
     user_dir = os.path.join(base_path, username, "Json")
     os.makedirs(user_dir, exist_ok=True)
@@ -33,6 +35,7 @@ def save_message_to_json(username: str, chat_id: str, message: str, base_path) -
     
     return response_id
 
+@tracer.traced("json_persistence", target="chat_history")
 def update_json_entry(username: str, chat_id: str, response_id: str, field: str, content: str, base_path) -> bool:
     """
     Update a specific field in an existing JSON entry identified by response_id.
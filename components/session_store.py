@@ -0,0 +1,104 @@
+"""
+Consolidated agent session store.
+
+Instead of one SQLite file per chat, agent sessions live in one database per
+user (`{base_path}/{username}/SqlDB/sessions.db`) or, with SESSION_STORE_SHARDS
+set, in a fixed number of shard files shared by all users. Each database is
+opened once per process behind a pooled SQLAlchemy engine in WAL mode, so the
+main agent and the reasoning agent of a turn (and concurrent turns) reuse the
+same connections instead of reopening a file every time.
+
+Chats created before the switch keep working: if the legacy per-chat file
+exists it is still used for that chat.
+"""
+import hashlib
+import os
+import threading
+
+from agno.db.sqlite import SqliteDb
+from cachetools import LRUCache
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import QueuePool
+
+SESSION_STORE_SHARDS = int(os.getenv("SESSION_STORE_SHARDS", "0"))  # 0 = one database per user
+SESSION_STORE_POOL_SIZE = int(os.getenv("SESSION_STORE_POOL_SIZE", "4"))
+SESSION_STORE_MAX_OPEN = int(os.getenv("SESSION_STORE_MAX_OPEN", "256"))  # open databases kept per process
+# how many previous runs an agent loads into context
+HISTORY_RUNS = int(os.getenv("HISTORY_RUNS", "10"))
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.close()
+
+
+class _OpenDbCache(LRUCache):
+    """LRU of open databases; evicted entries release their connection pool."""
+
+    def popitem(self):
+        key, db = super().popitem()
+        try:
+            db.db_engine.dispose()
+        except Exception as e:
+            print(f"Error closing session store {key}: {e}")
+        return key, db
+
+
+class SessionStore:
+    def __init__(self, shards: int = SESSION_STORE_SHARDS, pool_size: int = SESSION_STORE_POOL_SIZE,
+                 max_open: int = SESSION_STORE_MAX_OPEN):
+        self.shards = shards
+        self.pool_size = pool_size
+        self.dbs = _OpenDbCache(maxsize=max_open)
+        self.lock = threading.Lock()
+
+    def db_path(self, base_path: str, username: str) -> str:
+        if self.shards > 0:
+            shard = int(hashlib.md5(username.encode("utf-8")).hexdigest(), 16) % self.shards
+            return f"{base_path}/_sessions/shard_{shard:03d}.db"
+        return f"{base_path}/{username}/SqlDB/sessions.db"
+
+    def _open(self, path: str) -> SqliteDb:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        engine = create_engine(
+            f"sqlite:///{path}",
+            poolclass=QueuePool,
+            pool_size=self.pool_size,
+            max_overflow=self.pool_size,
+            pool_pre_ping=True,
+            connect_args={"check_same_thread": False, "timeout": 30},
+        )
+        event.listen(engine, "connect", _set_sqlite_pragmas)
+        return SqliteDb(db_engine=engine)
+
+    def get(self, base_path: str, username: str, chat_id: str) -> SqliteDb:
+        """Session database for a chat; sessions inside it are keyed by chat_id."""
+        legacy_path = f"{base_path}/{username}/SqlDB/{chat_id}.db"
+        path = legacy_path if os.path.exists(legacy_path) else self.db_path(base_path, username)
+        with self.lock:
+            db = self.dbs.get(path)
+            if db is None:
+                db = self._open(path)
+                self.dbs[path] = db
+        return db
+
+    def close_all(self) -> None:
+        with self.lock:
+            while self.dbs:
+                self.dbs.popitem()
+
+
+# Global session store shared by every agent in the process
+session_store = SessionStore()
+
+
+def get_session_db(base_path: str, username: str, chat_id: str) -> SqliteDb:
+    return session_store.get(base_path, username, chat_id)
+
+
+def reasoning_session_id(chat_id: str) -> str:
+    """Session the reasoning agent stores its runs in, so the chat_id session holds one run per turn."""
+    return f"{chat_id}:reasoning"
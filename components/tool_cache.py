@@ -0,0 +1,311 @@
+"""
+Process-wide cache for agent tool results.
+
+Attached to agents as an agno tool hook (`tool_hooks=[tool_cache.hook]`), so it
+works for every toolkit, including ones without their own `cache_results`
+(OpenBB, Tavily). Entries are keyed by (toolkit, tool name, arguments), live
+for a per-tool TTL, and are evicted least-recently-used once the memory budget
+is exceeded. Set TOOL_CACHE_DB to also persist results in a SQLite file so
+they survive restarts and are shared between worker processes; async agent
+runs read it in a worker thread and writes go through a background thread,
+so the event loop never waits on the disk.
+
+Only tools listed in TOOL_TTLS are cached; anything with side effects
+(orders, emails, telegram, charts, python) is passed straight through, and
+error results are never stored.
+"""
+import asyncio
+import hashlib
+import inspect
+import json
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+TOOL_CACHE_MAX_BYTES = int(os.getenv("TOOL_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+TOOL_CACHE_DB = os.getenv("TOOL_CACHE_DB")  # optional disk backing
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+
+# TTL in seconds per tool function name
+TOOL_TTLS: Dict[str, int] = {
+    # live quotes
+    "get_current_stock_price": 15,
+    "get_stock_price": 15,
+    "get_technical_indicators": 5 * MINUTE,
+    "get_historical_stock_prices": 15 * MINUTE,
+    # news
+    "get_company_news": 10 * MINUTE,
+    "duckduckgo_news": 10 * MINUTE,
+    # analyst data
+    "get_analyst_recommendations": 1 * HOUR,
+    "get_price_targets": 1 * HOUR,
+    # company reference data
+    "get_company_info": 6 * HOUR,
+    "get_company_profile": 6 * HOUR,
+    "get_stock_fundamentals": 6 * HOUR,
+    "get_income_statements": 12 * HOUR,
+    "get_key_financial_ratios": 12 * HOUR,
+    "search_company_symbol": 24 * HOUR,
+    # web search and pages
+    "web_search_using_tavily": 30 * MINUTE,
+    "duckduckgo_search": 30 * MINUTE,
+    "google_search": 30 * MINUTE,
+    "read_url": 1 * HOUR,
+    "search_query": 30 * MINUTE,
+    "read_article": 1 * HOUR,
+    "get_article_text": 1 * HOUR,
+    "web_crawler": 1 * HOUR,
+    # reference sources
+    "search_wikipedia": 24 * HOUR,
+    "search_pubmed": 24 * HOUR,
+    "get_youtube_video_data": 24 * HOUR,
+    "get_youtube_video_captions": 24 * HOUR,
+    "get_video_timestamps": 24 * HOUR,
+}
+
+# free-text search tools; only their arguments are case and whitespace normalized
+SEARCH_TOOLS = {
+    "web_search_using_tavily", "duckduckgo_search", "duckduckgo_news", "google_search",
+    "search_query", "search_wikipedia", "search_pubmed",
+}
+
+# tools report failures as result strings rather than raising; these are not cached
+ERROR_PREFIXES = ("error", "failed", "could not", "unable to", "exception", '{"error"')
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return " ".join(value.split()).lower()
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items() if v is not None}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def tool_cache_key(tool: str, arguments: Optional[Dict[str, Any]], toolkit: str = "") -> str:
+    arguments = {k: v for k, v in (arguments or {}).items() if v is not None}
+    if tool in SEARCH_TOOLS:
+        arguments = _normalize(arguments)
+    payload = json.dumps(arguments, sort_keys=True, default=str)
+    name = f"{toolkit}.{tool}" if toolkit else tool
+    return f"{name}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+
+def _toolkit_name(agent: Any, function_name: str) -> str:
+    """Class of the agent's toolkit providing function_name, so e.g. OpenBB and YFinance never share entries."""
+    for tool in getattr(agent, "tools", None) or []:
+        for functions in (getattr(tool, "functions", None), getattr(tool, "async_functions", None)):
+            if isinstance(functions, dict) and function_name in functions:
+                return type(tool).__name__
+    return ""
+
+
+def _is_error(value: Any) -> bool:
+    if value is None:
+        return True
+    if isinstance(value, str):
+        return not value.strip() or value.lstrip()[:20].lower().startswith(ERROR_PREFIXES)
+    return False
+
+
+def _size_of(value: Any) -> int:
+    if isinstance(value, str):
+        return len(value.encode("utf-8", errors="ignore"))
+    return sys.getsizeof(value)
+
+
+class ToolResultCache:
+    def __init__(self, ttls: Dict[str, int], max_bytes: int, db_path: Optional[str] = None):
+        self.ttls = ttls
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[str, Tuple[float, int, Any]]" = OrderedDict()  # key -> (expires_at, size, value)
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+        self.tool_stats: Dict[str, Dict[str, int]] = {}
+        self.evictions = 0
+        self.db_path = db_path
+        self.db: Optional[sqlite3.Connection] = None
+        self.db_lock = threading.Lock()  # the connection is shared by the reader threads and the writer
+        self.writes: "queue.Queue[Tuple[str, float, str]]" = queue.Queue()
+        self.writer: Optional[threading.Thread] = None
+        if db_path:
+            self._open_db()
+
+    def _open_db(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            self.db = sqlite3.connect(self.db_path, check_same_thread=False, timeout=5)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS tool_results (key TEXT PRIMARY KEY, expires_at REAL, value TEXT)"
+            )
+            self.db.commit()
+        except sqlite3.Error as e:
+            print(f"Tool cache disk backing disabled: {e}")
+            self.db = None
+
+    def _count(self, tool: str, field: str) -> None:
+        stats = self.tool_stats.setdefault(tool, {"hits": 0, "misses": 0})
+        stats[field] += 1
+
+    def _get_memory(self, key: str) -> Tuple[bool, Any]:
+        now = time.time()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                expires_at, size, value = entry
+                if expires_at > now:
+                    self.entries.move_to_end(key)
+                    return True, value
+                del self.entries[key]
+                self.total_bytes -= size
+            return False, None
+
+    def _get_disk(self, key: str) -> Tuple[bool, Any]:
+        """Blocking SQLite lookup; promotes a live row into memory."""
+        try:
+            with self.db_lock:
+                row = self.db.execute("SELECT expires_at, value FROM tool_results WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error:
+            row = None
+        if row is None or row[0] <= time.time():
+            return False, None
+        value = json.loads(row[1])
+        with self.lock:
+            self._store(key, row[0], value)
+        return True, value
+
+    def get(self, tool: str, key: str) -> Tuple[bool, Any]:
+        """Memory, then disk lookup; blocks on SQLite, so async callers use aget()."""
+        found, value = self._get_memory(key)
+        if not found and self.db is not None:
+            found, value = self._get_disk(key)
+        with self.lock:
+            self._count(tool, "hits" if found else "misses")
+        return found, value
+
+    async def aget(self, tool: str, key: str) -> Tuple[bool, Any]:
+        found, value = self._get_memory(key)
+        if not found and self.db is not None:
+            found, value = await asyncio.to_thread(self._get_disk, key)
+        with self.lock:
+            self._count(tool, "hits" if found else "misses")
+        return found, value
+
+    def set(self, tool: str, key: str, value: Any) -> None:
+        ttl = self.ttls.get(tool)
+        if not ttl or _is_error(value):
+            return
+        expires_at = time.time() + ttl
+        with self.lock:
+            self._store(key, expires_at, value)
+        if self.db is not None:
+            self._ensure_writer()
+            self.writes.put((key, expires_at, json.dumps(value, default=str)))
+
+    def _ensure_writer(self) -> None:
+        if self.writer is None or not self.writer.is_alive():
+            with self.lock:
+                if self.writer is None or not self.writer.is_alive():
+                    self.writer = threading.Thread(target=self._write_loop, daemon=True)
+                    self.writer.start()
+
+    def _write_loop(self) -> None:
+        """Background thread persisting new entries to the SQLite file."""
+        while True:
+            key, expires_at, payload = self.writes.get()
+            try:
+                with self.db_lock:
+                    self.db.execute(
+                        "INSERT OR REPLACE INTO tool_results (key, expires_at, value) VALUES (?, ?, ?)",
+                        (key, expires_at, payload),
+                    )
+                    self.db.commit()
+            except sqlite3.Error as e:
+                print(f"Tool cache disk write failed: {e}")
+
+    def _store(self, key: str, expires_at: float, value: Any) -> None:
+        size = _size_of(value)
+        if size > self.max_bytes:
+            return
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.total_bytes -= old[1]
+        self.entries[key] = (expires_at, size, value)
+        self.total_bytes += size
+        while self.total_bytes > self.max_bytes and self.entries:
+            _, (_, evicted_size, _) = self.entries.popitem(last=False)
+            self.total_bytes -= evicted_size
+            self.evictions += 1
+
+    def hook(self, function_name: str, function_call: Callable, arguments: Dict[str, Any], agent: Any = None):
+        """agno tool hook: serve cached results and cache fresh ones."""
+        if function_name not in self.ttls:
+            return function_call(**arguments)
+
+        key = tool_cache_key(function_name, arguments, _toolkit_name(agent, function_name))
+        if inspect.iscoroutinefunction(function_call):
+            # async agent run: keep the disk lookup off the event loop
+            async def cached():
+                found, value = await self.aget(function_name, key)
+                if found:
+                    return value
+                value = await function_call(**arguments)
+                self.set(function_name, key, value)
+                return value
+            return cached()
+
+        found, value = self.get(function_name, key)
+        if found:
+            return value
+
+        result = function_call(**arguments)
+        if inspect.isawaitable(result):
+            async def finish():
+                value = await result
+                self.set(function_name, key, value)
+                return value
+            return finish()
+        self.set(function_name, key, result)
+        return result
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0
+        if self.db is not None:
+            with self.db_lock:
+                self.db.execute("DELETE FROM tool_results")
+                self.db.commit()
+
+    def stats(self) -> dict:
+        with self.lock:
+            hits = sum(s["hits"] for s in self.tool_stats.values())
+            misses = sum(s["misses"] for s in self.tool_stats.values())
+            per_tool = {
+                tool: {**s, "hit_rate": s["hits"] / (s["hits"] + s["misses"]) if s["hits"] + s["misses"] else 0.0}
+                for tool, s in self.tool_stats.items()
+            }
+            return {
+                "entries": len(self.entries),
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+                "disk_backed": self.db is not None,
+                "tools": per_tool,
+            }
+
+
+# Global tool result cache shared by every agent in the process
+tool_cache = ToolResultCache(TOOL_TTLS, TOOL_CACHE_MAX_BYTES, TOOL_CACHE_DB)
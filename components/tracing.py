@@ -0,0 +1,309 @@
+"""
+Per-request latency tracing for the chat pipeline.
+
+An agent run opens a trace with `with tracer.trace(task_id):`. Inside it,
+`with tracer.span("stage"):` records nested spans; the current trace and
+parent span travel in contextvars, so spans opened in helpers, sub-tasks and
+agno tool hooks land in the right trace without passing anything around.
+Outside a trace, span() does nothing and costs almost nothing.
+
+When a trace ends its spans are
+  * appended to TRACE_EXPORT_PATH, one OTLP/JSON ExportTraceServiceRequest
+    per line (the OTLP file exporter format, readable by the OpenTelemetry
+    collector's otlpjsonfile receiver), by a background thread;
+  * returned as a compact summary the caller stores on the task;
+  * added to per-stage latency windows that /metrics reports as Prometheus
+    summaries (p50/p95/p99).
+
+The trace id is the task id (a UUID), so a task's spans can be found in any
+OTLP backend by its task id.
+"""
+import functools
+import inspect
+import json
+import math
+import os
+import queue
+import secrets
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, List, Optional
+
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "true").lower() != "false"
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", "temp_tasks/traces.otlp.jsonl")  # empty disables the file export
+TRACE_EXPORT_MAX_BYTES = int(os.getenv("TRACE_EXPORT_MAX_BYTES", str(50 * 1024 * 1024)))  # rotated to .1 beyond this
+TRACE_SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "hindai-api")
+TRACE_METRICS_WINDOW = int(os.getenv("TRACE_METRICS_WINDOW", "2048"))  # latest durations kept per stage
+QUANTILES = (0.5, 0.95, 0.99)
+
+# OTLP enum values
+SPAN_KIND_INTERNAL = 1
+STATUS_CODE_OK = 1
+STATUS_CODE_ERROR = 2
+
+_current_trace: ContextVar[Optional["Trace"]] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+def _otlp_value(value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[dict]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items() if value is not None]
+
+
+class Span:
+    def __init__(self, trace: "Trace", name: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.trace = trace
+        self.name = name
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.attributes = dict(attributes)
+        self.start_ns = time.time_ns()
+        self.started = time.perf_counter_ns()  # durations come from the monotonic clock
+        self.duration_ns: Optional[int] = None
+        self.error: Optional[str] = None
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    def end(self, error: Optional[BaseException] = None) -> None:
+        if self.duration_ns is not None:
+            return
+        self.duration_ns = time.perf_counter_ns() - self.started
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"[:200]
+        self.trace.spans.append(self)
+
+    @property
+    def duration(self) -> float:
+        return (self.duration_ns or 0) / 1e9
+
+    def to_otlp(self) -> dict:
+        span = {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": SPAN_KIND_INTERNAL,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.start_ns + (self.duration_ns or 0)),
+            "attributes": _otlp_attributes(self.attributes),
+            "status": {"code": STATUS_CODE_ERROR, "message": self.error} if self.error else {"code": STATUS_CODE_OK},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+class Trace:
+    def __init__(self, task_id: str):
+        self.task_id = task_id
+        try:
+            self.trace_id = uuid.UUID(task_id).hex
+        except ValueError:
+            self.trace_id = secrets.token_hex(16)
+        self.spans: List[Span] = []
+
+    def to_otlp(self) -> dict:
+        """One ExportTraceServiceRequest holding every span of the trace."""
+        return {"resourceSpans": [{
+            "resource": {"attributes": _otlp_attributes({"service.name": TRACE_SERVICE_NAME,
+                                                         "process.pid": os.getpid()})},
+            "scopeSpans": [{
+                "scope": {"name": "hindai.tracing"},
+                "spans": [span.to_otlp() for span in self.spans],
+            }],
+        }]}
+
+    def summary(self) -> List[dict]:
+        """Compact span list stored on the task record, in start order."""
+        origin = min((span.start_ns for span in self.spans), default=0)
+        return [
+            {
+                "name": span.name,
+                "span_id": span.span_id,
+                "parent_id": span.parent_id,
+                "start_ms": round((span.start_ns - origin) / 1e6, 1),
+                "duration_ms": round(span.duration_ns / 1e6, 1),
+                "status": "error" if span.error else "ok",
+                **({"error": span.error} if span.error else {}),
+                **({"attributes": span.attributes} if span.attributes else {}),
+            }
+            for span in sorted(self.spans, key=lambda span: span.start_ns)
+        ]
+
+
+def _quantile(values: List[float], q: float) -> float:
+    """Nearest-rank quantile of sorted values."""
+    return values[max(0, min(len(values) - 1, math.ceil(q * len(values)) - 1))]
+
+
+class Tracer:
+    def __init__(self, export_path: str = TRACE_EXPORT_PATH, window: int = TRACE_METRICS_WINDOW,
+                 enabled: bool = TRACING_ENABLED):
+        self.export_path = export_path
+        self.window = window
+        self.enabled = enabled
+        self.durations: Dict[str, Deque[float]] = {}
+        self.totals: Dict[str, List[float]] = {}  # stage -> [sum of seconds, count, errors]
+        self.lock = threading.Lock()
+        self.exports: "queue.Queue[dict]" = queue.Queue()
+        self.exporter: Optional[threading.Thread] = None
+
+    @contextmanager
+    def trace(self, task_id: str, name: str = "agent_run", **attributes):
+        """Open the trace of one task; its root span is `name`. Yields the Trace."""
+        if not self.enabled:
+            yield None
+            return
+        trace = Trace(task_id)
+        token = _current_trace.set(trace)
+        try:
+            with self.span(name, task_id=task_id, **attributes):
+                yield trace
+        finally:
+            _current_trace.reset(token)
+            self._finish(trace)
+
+    def start_span(self, name: str, **attributes) -> Optional[Span]:
+        """Span under the current one, ended by the caller; None outside a trace."""
+        trace = _current_trace.get()
+        if trace is None:
+            return None
+        parent = _current_span.get()
+        return Span(trace, name, parent.span_id if parent else None, attributes)
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """Time the enclosed block as a child of the current span. Yields the Span (None outside a trace)."""
+        span = self.start_span(name, **attributes)
+        if span is None:
+            yield None
+            return
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.end(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+
+    def record(self, name: str, start: float, end: float, **attributes) -> None:
+        """Add an already finished interval (epoch seconds), e.g. time spent queued."""
+        span = self.start_span(name, **attributes)
+        if span is None:
+            return
+        span.start_ns = int(start * 1e9)
+        span.duration_ns = max(0, int((end - start) * 1e9))
+        span.trace.spans.append(span)
+
+    def traced(self, name: str, **attributes):
+        """Decorator: run every call of a sync or async function inside a span."""
+        def decorator(func):
+            if inspect.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    with self.span(name, **attributes):
+                        return await func(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(name, **attributes):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def tool_hook(self, function_name: str, function_call, arguments: Dict[str, Any]):
+        """agno tool hook: one "tool_call" span per tool invocation."""
+        span = self.start_span("tool_call", tool=function_name)
+        if span is None:
+            return function_call(**arguments)
+        try:
+            result = function_call(**arguments)
+        except BaseException as e:
+            span.end(e)
+            raise
+        if inspect.isawaitable(result):
+            async def finish():
+                try:
+                    value = await result
+                except BaseException as e:
+                    span.end(e)
+                    raise
+                span.end()
+                return value
+            return finish()
+        span.end()
+        return result
+
+    def _finish(self, trace: Trace) -> None:
+        with self.lock:
+            for span in trace.spans:
+                window = self.durations.get(span.name)
+                if window is None:
+                    window = self.durations[span.name] = deque(maxlen=self.window)
+                window.append(span.duration)
+                totals = self.totals.setdefault(span.name, [0.0, 0, 0])
+                totals[0] += span.duration
+                totals[1] += 1
+                totals[2] += 1 if span.error else 0
+        if self.export_path and trace.spans:
+            self._ensure_exporter()
+            self.exports.put(trace.to_otlp())
+
+    def _ensure_exporter(self) -> None:
+        if self.exporter is None or not self.exporter.is_alive():
+            self.exporter = threading.Thread(target=self._export_loop, daemon=True)
+            self.exporter.start()
+
+    def _export_loop(self) -> None:
+        """Background thread appending finished traces to the OTLP/JSON file."""
+        while True:
+            payload = self.exports.get()
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.export_path)), exist_ok=True)
+                if os.path.exists(self.export_path) and os.path.getsize(self.export_path) > TRACE_EXPORT_MAX_BYTES:
+                    os.replace(self.export_path, f"{self.export_path}.1")
+                with open(self.export_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(payload, ensure_ascii=False, separators=(",", ":")) + "\n")
+            except Exception as e:
+                print(f"Error exporting trace: {e}")
+
+    def prometheus(self) -> str:
+        """Per-stage latency summaries in the Prometheus text exposition format."""
+        with self.lock:
+            stages = {name: (sorted(window), list(self.totals[name])) for name, window in self.durations.items()}
+        lines = [
+            "# HELP hindai_stage_duration_seconds Latency of chat pipeline stages (quantiles over the latest runs).",
+            "# TYPE hindai_stage_duration_seconds summary",
+        ]
+        for name, (values, (total, count, _)) in sorted(stages.items()):
+            for q in QUANTILES:
+                lines.append(f'hindai_stage_duration_seconds{{stage="{name}",quantile="{q}"}} {_quantile(values, q):.6f}')
+            lines.append(f'hindai_stage_duration_seconds_sum{{stage="{name}"}} {total:.6f}')
+            lines.append(f'hindai_stage_duration_seconds_count{{stage="{name}"}} {int(count)}')
+        lines += [
+            "# HELP hindai_stage_errors_total Chat pipeline stages that ended with an error.",
+            "# TYPE hindai_stage_errors_total counter",
+        ]
+        for name, (_, (_, _, errors)) in sorted(stages.items()):
+            lines.append(f'hindai_stage_errors_total{{stage="{name}"}} {int(errors)}')
+        return "\n".join(lines) + "\n"
+
+
+# Global tracer instance
+tracer = Tracer()
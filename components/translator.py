@@ -2,12 +2,19 @@ import logging
 from enum import Enum
 
 import re
-from googletrans import Translator
 import asyncio
+import hashlib
+import os
+import threading
+import weakref
+from typing import AsyncIterator, Dict, List, Tuple
+
+from cachetools import LRUCache
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
-from .translator_setup.translating import translate_text as translating_user_text
+from .translator_setup.translating import new_translator, translate_segment
+from .tracing import tracer
 
 class LanguageCode(str, Enum):
     ENGLISH = "eng_Latn"
@@ -122,149 +129,386 @@ class LanguageCode(str, Enum):
     YORUBA = "yo"
     ZULU = "zu"
 
+# request language codes -> codes sent to the translation backend
+GOOGLE_LANGUAGE_CODES = {
+    "eng_Latn": "EN",
+    "hin_Deva": "HI",
+    "ben_Beng": "BN",
+    "guj_Gujr": "GU",
+    "kan_Knda": "KA",
+    "mal_Mlym": "ML",
+    "mar_Deva": "MR",
+    "npi_Deva": "Ne",
+    "ory_Orya": "OR",
+    "pan_Guru": "PA",
+    "san_Deva": "SA",
+    "tam_Taml": "TA",
+    "tel_Telu": "TE",
+    "urd_Arab": "UR",
+    "asm_Beng": "AS",
+    "kas_Arab": "KS",
+    "mni_Mtei": "MN",
+    "snd_Arab": "SI",
+    "af": "AF",
+    "sq": "SQ",
+    "am": "AM",
+    "ar": "AR",
+    "hy": "HY",
+    "az": "AZ",
+    "eu": "EU",
+    "be": "BE",
+    "bs": "BS",
+    "bg": "BG",
+    "ca": "CA",
+    "ceb": "CEB",
+    "ny": "NY",
+    "zh-cn": "ZH_CN",
+    "zh-tw": "ZH_TW",
+    "co": "CO",
+    "hr": "HR",
+    "cs": "CS",
+    "da": "DA",
+    "nl": "NL",
+    "eo": "EO",
+    "et": "ET",
+    "tl": "TL",
+    "fi": "FI",
+    "fr": "FR",
+    "fy": "FY",
+    "gl": "GL",
+    "ka": "KA",
+    "de": "DE",
+    "el": "EL",
+    "ht": "HT",
+    "ha": "HA",
+    "haw": "HAW",
+    "he": "HE",
+    "hmn": "HMN",
+    "hu": "HU",
+    "is": "IS",
+    "ig": "IG",
+    "id": "ID",
+    "ga": "GA",
+    "it": "IT",
+    "ja": "JA",
+    "jw": "JW",
+    "kk": "KK",
+    "km": "KM",
+    "ko": "KO",
+    "ku": "KU",
+    "ky": "KY",
+    "lo": "LO",
+    "la": "LA",
+    "lv": "LV",
+    "lt": "LT",
+    "lb": "LB",
+    "mk": "MK",
+    "mg": "MG",
+    "ms": "MS",
+    "mt": "MT",
+    "mi": "MI",
+    "mn": "MN",
+    "my": "MY",
+    "ne": "NE",
+    "no": "NO",
+    "or": "OR",
+    "ps": "PS",
+    "fa": "FA",
+    "pl": "PL",
+    "pt": "PT",
+    "ro": "RO",
+    "ru": "RU",
+    "sm": "SM",
+    "gd": "GD",
+    "sr": "SR",
+    "st": "ST",
+    "sn": "SN",
+    "sd": "SD",
+    "si": "SI",
+    "sk": "SK",
+    "sl": "SL",
+    "so": "SO",
+    "es": "ES",
+    "su": "SU",
+    "sw": "SW",
+    "sv": "SV",
+    "tg": "TG",
+    "ta": "TA",
+    "te": "TE",
+    "th": "TH",
+    "tr": "TR",
+    "uk": "UK",
+    "ur": "UR",
+    "ug": "UG",
+    "uz": "UZ",
+    "vi": "VI",
+    "cy": "CY",
+    "xh": "XH",
+    "yi": "YI",
+    "yo": "YO",
+    "zu": "ZU"
+}
+
+
+TRANSLATION_CONCURRENCY = int(os.getenv("TRANSLATION_CONCURRENCY", "8"))  # segments in flight per process
+TRANSLATION_CHUNK_CHARS = int(os.getenv("TRANSLATION_CHUNK_CHARS", "1200"))
+TRANSLATION_CACHE_SIZE = int(os.getenv("TRANSLATION_CACHE_SIZE", "20000"))
+
+FENCE_LINE = re.compile(r"^\s*(```|~~~)")
+TABLE_LINE = re.compile(r"^\s*\|")
+# headings, quotes, list bullets and numbers stay as they are, only the text after them is translated
+LINE_PREFIX = re.compile(r"^(\s*(?:#{1,6}\s+|>\s*|[-*+]\s+(?:\[[ xX]\]\s+)?|\d+[.)]\s+)*)")
+# inline code, links, images and bare URLs are never translated
+INLINE_PROTECTED = re.compile(r"(`[^`\n]+`|!?\[[^\]\n]*\]\([^)\n]*\)|\bhttps?://\S+|\bwww\.\S+)")
+SENTENCE_BREAK = re.compile(r"(?<=[.!?\u0964\u0965\u3002])(\s+)")
+HAS_LETTER = re.compile(r"[^\W\d_]")
+
+
+def _chunk_sentences(text: str) -> List[Tuple[str, bool]]:
+    """Split long text at sentence ends into chunks of about TRANSLATION_CHUNK_CHARS."""
+    if len(text) <= TRANSLATION_CHUNK_CHARS:
+        return [(text, True)]
+    pieces = SENTENCE_BREAK.split(text)  # sentence, separator, sentence, ...
+    parts, chunk = [], ""
+    for i in range(0, len(pieces), 2):
+        sentence = pieces[i]
+        separator = pieces[i + 1] if i + 1 < len(pieces) else ""
+        if chunk and len(chunk) + len(sentence) > TRANSLATION_CHUNK_CHARS:
+            parts.append((chunk.rstrip(), True))
+            parts.append((chunk[len(chunk.rstrip()):], False))
+            chunk = ""
+        chunk += sentence + separator
+    if chunk:
+        parts.append((chunk, True))  # text was stripped by the caller, no trailing separator
+    return parts
+
+
+def _add_text(parts: List[Tuple[str, bool]], text: str) -> None:
+    core = text.strip()
+    if not core or not HAS_LETTER.search(core):
+        parts.append((text, False))
+        return
+    lead = text[:len(text) - len(text.lstrip())]
+    trail = text[len(text.rstrip()):]
+    if lead:
+        parts.append((lead, False))
+    parts.extend(_chunk_sentences(core))
+    if trail:
+        parts.append((trail, False))
+
+
+def segment_markdown(text: str) -> List[Tuple[str, bool]]:
+    """
+    Split markdown into (piece, translatable) parts that join back to the input.
+    Code blocks, tables, inline code, links and URLs come back untranslatable.
+    """
+    parts: List[Tuple[str, bool]] = []
+    in_fence = False
+    for line in text.splitlines(keepends=True):
+        if FENCE_LINE.match(line):
+            in_fence = not in_fence
+            parts.append((line, False))
+            continue
+        if in_fence or TABLE_LINE.match(line) or not line.strip():
+            parts.append((line, False))
+            continue
+        body = line.rstrip("\r\n")
+        prefix = LINE_PREFIX.match(body).group(1)
+        if prefix:
+            parts.append((prefix, False))
+        for i, piece in enumerate(INLINE_PROTECTED.split(body[len(prefix):])):
+            if i % 2:
+                parts.append((piece, False))
+            elif piece:
+                _add_text(parts, piece)
+        if len(line) > len(body):
+            parts.append((line[len(body):], False))
+    return parts
+
+
+def count_fences(text: str) -> int:
+    return sum(1 for line in text.splitlines() if FENCE_LINE.match(line))
+
+
+class TranslationEngine:
+    """
+    Markdown-aware translation: text is segmented, identical segments are
+    translated once, segments run concurrently under a process-wide limit and
+    results are cached by (text hash, source, target).
+    """
+
+    def __init__(self, concurrency: int = TRANSLATION_CONCURRENCY, cache_size: int = TRANSLATION_CACHE_SIZE):
+        self.concurrency = concurrency
+        self.cache = LRUCache(maxsize=cache_size)
+        self.cache_lock = threading.Lock()
+        self.semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+        self.hits = 0
+        self.misses = 0
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self.semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self.semaphores[loop] = asyncio.Semaphore(self.concurrency)
+        return semaphore
+
+    @staticmethod
+    def _key(segment: str, source: str, target: str) -> Tuple[str, str, str]:
+        return hashlib.sha256(segment.encode("utf-8")).hexdigest(), source.lower(), target.lower()
+
+    async def _translate_segments(self, segments: List[str], source: str, target: str) -> Dict[str, str]:
+        results: Dict[str, str] = {}
+        missing = []
+        with self.cache_lock:
+            for segment in segments:
+                cached = self.cache.get(self._key(segment, source, target))
+                if cached is None:
+                    missing.append(segment)
+                else:
+                    results[segment] = cached
+        self.hits += len(results)
+        self.misses += len(missing)
+        if not missing:
+            return results
+
+        translator = new_translator()
+        semaphore = self._semaphore()
+
+        async def run(segment: str) -> None:
+            async with semaphore:
+                try:
+                    translated = await translate_segment(translator, segment, source, target)
+                except Exception as e:
+                    # Fallback in case of translation error, not cached so the next call retries
+                    print(f"Translation error: {e}")
+                    results[segment] = segment
+                    return
+            results[segment] = translated
+            with self.cache_lock:
+                self.cache[self._key(segment, source, target)] = translated
+
+        await asyncio.gather(*(run(segment) for segment in missing))
+        return results
+
+    async def translate(self, text: str, source: str, target: str) -> str:
+        """Translate markdown between backend language codes (see GOOGLE_LANGUAGE_CODES)."""
+        if not text or not text.strip() or source.lower() == target.lower():
+            return text
+        parts = segment_markdown(text)
+        segments = list(dict.fromkeys(piece for piece, translatable in parts if translatable))
+        if not segments:
+            return text
+        translated = await self._translate_segments(segments, source, target)
+        return "".join(translated[piece] if translatable else piece for piece, translatable in parts)
+
+    async def translate_many(self, texts: List[str], source: str, target: str) -> List[str]:
+        """Translate several texts at once; they share the segment pool and cache."""
+        return list(await asyncio.gather(*(self.translate(text, source, target) for text in texts)))
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "cached_segments": len(self.cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+
+class StreamingTranslation:
+    """
+    Translate an answer while it is being generated. Deltas are buffered and
+    translated as soon as a complete line (or, for long lines, a complete
+    sentence) is available; an open code block is held back until it closes.
+    """
+
+    def __init__(self, engine: TranslationEngine, source: str, target: str):
+        self.engine = engine
+        self.source = source
+        self.target = target
+        self.buffer = ""
+
+    def _boundary(self) -> int:
+        end = len(self.buffer)
+        while True:
+            end = self.buffer.rfind("\n", 0, end)
+            if end == -1:
+                break
+            if count_fences(self.buffer[:end + 1]) % 2 == 0:
+                return end + 1
+        if len(self.buffer) >= TRANSLATION_CHUNK_CHARS and count_fences(self.buffer) % 2 == 0:
+            sentence_ends = list(SENTENCE_BREAK.finditer(self.buffer))
+            if sentence_ends:
+                return sentence_ends[-1].end()
+        return 0
+
+    async def feed(self, delta: str) -> str:
+        """Add a delta; returns the translation of whatever became complete (may be "")."""
+        self.buffer += delta
+        cut = self._boundary()
+        if cut == 0:
+            return ""
+        ready, self.buffer = self.buffer[:cut], self.buffer[cut:]
+        return await self.engine.translate(ready, self.source, self.target)
+
+    async def flush(self) -> str:
+        ready, self.buffer = self.buffer, ""
+        return await self.engine.translate(ready, self.source, self.target) if ready else ""
+
+
+# Global translation engine shared by every LanguageTranslator
+translation_engine = TranslationEngine()
+
+
+def backend_code(language_code: str) -> str:
+    return GOOGLE_LANGUAGE_CODES.get(language_code, language_code)
+
+
 class LanguageTranslator:
     """
-    A translator class that normally would translate between languages
-    but now simply returns the original text unchanged.
+    Translates between the request language codes (eng_Latn, hin_Deva, ...)
+    through the shared TranslationEngine.
     """
     
     def __init__(self):
-        logger.info("Initializing LanguageTranslator in pass-through mode")
+        self.engine = translation_engine
     
+    @tracer.traced("translation")
     async def translate_text_async(self, text: str, source_lang: str = None, target_lang: str = None) -> str:
         """
-        Bypass translation and return the original text unchanged.
+        Translate markdown text, leaving code blocks, tables, inline code and URLs untouched.
         
         Args:
-            text: The input text that would normally be translated
-            source_lang: The source language code (ignored)
-            target_lang: The target language code (ignored)
+            text: The text to translate
+            source_lang: The source language code, e.g. "hin_Deva"
+            target_lang: The target language code, e.g. "eng_Latn"
             
         Returns:
-            The original text unchanged
+            The translated text
         """
-        LANGUAGES_codes_for_translating = {
-            "eng_Latn": "EN",
-            "hin_Deva": "HI",
-            "ben_Beng": "BN",
-            "guj_Gujr": "GU",
-            "kan_Knda": "KA",
-            "mal_Mlym": "ML",
-            "mar_Deva": "MR",
-            "npi_Deva": "Ne",
-            "ory_Orya": "OR",
-            "pan_Guru": "PA",
-            "san_Deva": "SA",
-            "tam_Taml": "TA",
-            "tel_Telu": "TE",
-            "urd_Arab": "UR",
-            "asm_Beng": "AS",
-            "kas_Arab": "KS",
-            "mni_Mtei": "MN",
-            "snd_Arab": "SI",
-            "af": "AF",
-            "sq": "SQ",
-            "am": "AM",
-            "ar": "AR",
-            "hy": "HY",
-            "az": "AZ",
-            "eu": "EU",
-            "be": "BE",
-            "bs": "BS",
-            "bg": "BG",
-            "ca": "CA",
-            "ceb": "CEB",
-            "ny": "NY",
-            "zh-cn": "ZH_CN",
-            "zh-tw": "ZH_TW",
-            "co": "CO",
-            "hr": "HR",
-            "cs": "CS",
-            "da": "DA",
-            "nl": "NL",
-            "eo": "EO",
-            "et": "ET",
-            "tl": "TL",
-            "fi": "FI",
-            "fr": "FR",
-            "fy": "FY",
-            "gl": "GL",
-            "ka": "KA",
-            "de": "DE",
-            "el": "EL",
-            "ht": "HT",
-            "ha": "HA",
-            "haw": "HAW",
-            "he": "HE",
-            "hmn": "HMN",
-            "hu": "HU",
-            "is": "IS",
-            "ig": "IG",
-            "id": "ID",
-            "ga": "GA",
-            "it": "IT",
-            "ja": "JA",
-            "jw": "JW",
-            "kk": "KK",
-            "km": "KM",
-            "ko": "KO",
-            "ku": "KU",
-            "ky": "KY",
-            "lo": "LO",
-            "la": "LA",
-            "lv": "LV",
-            "lt": "LT",
-            "lb": "LB",
-            "mk": "MK",
-            "mg": "MG",
-            "ms": "MS",
-            "mt": "MT",
-            "mi": "MI",
-            "mn": "MN",
-            "my": "MY",
-            "ne": "NE",
-            "no": "NO",
-            "or": "OR",
-            "ps": "PS",
-            "fa": "FA",
-            "pl": "PL",
-            "pt": "PT",
-            "ro": "RO",
-            "ru": "RU",
-            "sm": "SM",
-            "gd": "GD",
-            "sr": "SR",
-            "st": "ST",
-            "sn": "SN",
-            "sd": "SD",
-            "si": "SI",
-            "sk": "SK",
-            "sl": "SL",
-            "so": "SO",
-            "es": "ES",
-            "su": "SU",
-            "sw": "SW",
-            "sv": "SV",
-            "tg": "TG",
-            "ta": "TA",
-            "te": "TE",
-            "th": "TH",
-            "tr": "TR",
-            "uk": "UK",
-            "ur": "UR",
-            "ug": "UG",
-            "uz": "UZ",
-            "vi": "VI",
-            "cy": "CY",
-            "xh": "XH",
-            "yi": "YI",
-            "yo": "YO",
-            "zu": "ZU"
-        }
-        
-
-        translating_text = await translating_user_text(text, LANGUAGES_codes_for_translating[source_lang], LANGUAGES_codes_for_translating[target_lang])
-        return translating_text
+        return await self.engine.translate(text, backend_code(source_lang), backend_code(target_lang))
+    
+    @tracer.traced("translation")
+    async def translate_many_async(self, texts: List[str], source_lang: str = None, target_lang: str = None) -> List[str]:
+        """Translate several texts in one batch, e.g. reasoning and answer together."""
+        return await self.engine.translate_many(texts, backend_code(source_lang), backend_code(target_lang))
+    
+    def stream(self, source_lang: str = None, target_lang: str = None) -> StreamingTranslation:
+        """Incremental translator for answer deltas: feed() each delta, flush() at the end."""
+        return StreamingTranslation(self.engine, backend_code(source_lang), backend_code(target_lang))
+    
+    async def translate_stream(self, deltas: AsyncIterator[str], source_lang: str = None,
+                               target_lang: str = None) -> AsyncIterator[str]:
+        """Translate an async stream of answer deltas, yielding translated pieces as they complete."""
+        streaming = self.stream(source_lang, target_lang)
+        async for delta in deltas:
+            translated = await streaming.feed(delta)
+            if translated:
+                yield translated
+        translated = await streaming.flush()
+        if translated:
+            yield translated
+    
     def translate_text(self, text: str, source_lang: str = None, target_lang: str = None) -> str:
         """
         Synchronous wrapper for the async translation function
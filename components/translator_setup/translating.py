@@ -1,6 +1,5 @@
 
 import re
-from googletrans import Translator
 
 LANGUAGES = {
     "ENGLISH": {"code": "eng_Latn", "symbol": "EN"},
@@ -123,85 +122,25 @@ LANGUAGES = {
     "ZULU": {"code": "zu", "symbol": "ZU"}
 }
 
-# Helper function to decide whether to translate a segment.
 
+def new_translator():
+    """googletrans client, imported on first translation rather than at startup."""
+    from googletrans import Translator
+    return Translator()
 
-def should_translate_llm(segment: str) -> bool:
-    # Skip if the segment is enclosed in any backticks (inline or triple)
-    if segment.startswith("`") and segment.endswith("`"):
-        return False
-    # Skip if the segment contains a URL.
-    if re.search(r'\bhttps?://\S+\b', segment) or re.search(r'\bwww\.\S+\b', segment):
-        return False
-    return True
 
-
-import re
-from googletrans import Translator
-
-# Other code remains unchanged...
-
-async def main(text, source_len, desti_len):
-    translator = Translator()
-    pattern = r'(```[\s\S]+?```)|(`[^`]+`)|(\bhttps?://\S+\b)|(\bwww\.\S+\b)'
-    
-    # Keep track of all matches to preserve formatting
-    matches = list(re.finditer(pattern, text))
-    segments = []
-    last_end = 0
-    
-    # Split the text while preserving the position of special segments
-    for match in matches:
-        start, end = match.span()
-        if start > last_end:
-            segments.append((text[last_end:start], False))  # Normal text
-        segments.append((text[start:end], True))  # Special text (don't translate)
-        last_end = end
-    
-    # Add any remaining text
-    if last_end < len(text):
-        segments.append((text[last_end:], False))
-    
-    translated_text = ""
-    
-    # Process each segment
-    for segment_text, is_special in segments:
-        if not segment_text:
-            continue
-            
-        if is_special or not should_translate_llm(segment_text.strip()):
-            # Keep special segments as they are
-            translated_text += segment_text
-        else:
-            # Split by newlines to maintain paragraph structure
-            paragraphs = segment_text.split('\n')
-            translated_paragraphs = []
-            
-            for paragraph in paragraphs:
-                if paragraph.strip():
-                    # Only translate non-empty paragraphs
-                    seg_clean = paragraph.strip()
-                    try:
-                        # Use the translate method synchronously - fixed line
-                        translated = await translator.translate(seg_clean, src=source_len, dest=desti_len)
-                        translated_paragraphs.append(translated.text if hasattr(translated, 'text') else str(seg_clean))
-                    except Exception as e:
-                        # Fallback in case of translation error
-                        print(f"Translation error: {e}")
-                        translated_paragraphs.append(seg_clean)
-                else:
-                    # Keep empty lines as they are
-                    translated_paragraphs.append('')
-            
-            # Join paragraphs with the original newline characters
-            translated_text += '\n'.join(translated_paragraphs)
-    
+async def translate_segment(translator, segment, source_len, desti_len):
+    """Translate one plain-text segment (no markdown structure) with a googletrans client."""
+    translated = await translator.translate(segment, src=source_len, dest=desti_len)
+    translated_text = translated.text if hasattr(translated, 'text') else str(segment)
     # Clean up extra spaces before punctuation
     translated_text = re.sub(r'\s+([.,;?!])', r'\1', translated_text)
     # Remove stray period immediately following closing backticks
     translated_text = re.sub(r'(`+)\.', r'\1', translated_text)
-    
     return translated_text
 
+
 async def translate_text(text, source_lang, desti_lang):
-    return await main(text, source_lang, desti_lang)
+    """Markdown-aware translation; see components.translator.TranslationEngine."""
+    from components.translator import translation_engine
+    return await translation_engine.translate(text, source_lang, desti_lang)
@@ -2,6 +2,7 @@ from imports_lib import MultiMCPTools, Agent, instructions_steps,  SqliteDb, gen
 from agents.reasioning_agent import get_detailed_reasoning
 from components.savingintoJson import save_message_to_json, update_json_entry
 from components.google_search_tools import get_google_Search_tools
+from components.session_store import get_session_db, HISTORY_RUNS
 from datetime import datetime
 from agents.llamaindexagent import DropboxTools
 from agents.navigations_tool import NavigationTools
@@ -51,13 +52,10 @@ async def run_agent(message: str, username: str, chat_id: str, google_search: st
                 
                 session_id=chat_id,
                 user_id=username,
-                db=SqliteDb(
-                    db_file=f"{base_path_for_chat}/{username}/SqlDB/{chat_id}.db",
-                   
-                ),
+                db=get_session_db(base_path_for_chat, username, chat_id),
                 add_history_to_context=True,
                 read_chat_history=True,
-                num_history_runs=100,
+                num_history_runs=HISTORY_RUNS,
                 stream_intermediate_steps=False,
                 add_datetime_to_context=True,instructions=instructions_steps(reasoning_steps=get_reasonings,current_time=current_time),
             )
@@ -8,6 +8,10 @@ from components.savingintoJson import save_message_to_json, update_json_entry
 from components.language_check import language_check
 from components.translator import LanguageTranslator
 from components.google_search_tools import get_google_Search_tools
+from components.tool_cache import tool_cache
+from components.tracing import tracer
+from components.session_store import get_session_db
+from components.history_compactor import history_compactor
 from datetime import datetime
 import os
 from dotenv import load_dotenv
@@ -34,10 +38,6 @@ GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY", "AIzaSyAx65YdFAZ--Uuf93oXHjA8kpiA7S
 async def run_agent(model_name:str,message: str, username: str, chat_id: str, language:str, language_code:str, translator, google_search: str, deep_google_search: str,current_time,get_reasonings,get_trans_reasonings,get_reasoning_status,api,
                                 model_config, task_id) -> None:
     try:
-        if google_search == 'y':
-            google_search_tool = get_google_Search_tools(google_search)
-        else :
-            google_search_tool = []
         get_the_first_response_id = save_message_to_json(
             username=username, 
             chat_id=chat_id, 
@@ -72,6 +72,11 @@ async def run_agent(model_name:str,message: str, username: str, chat_id: str, la
             except Exception as e:
                 print(f"Error in translation: {e}")
 
+        # picked after translation so the classifier sees the English message
+        google_search_tool = get_google_Search_tools(google_search, query=message)
+        # recent turns verbatim, older ones as a rolling summary, within the model's token budget
+        history = await history_compactor.prepare(base_path_for_chat, username, chat_id, model_name)
+
     
 
         # saving the main reasoning into the json file both the reasonings and the translated reasonings
@@ -131,19 +136,20 @@ async def run_agent(model_name:str,message: str, username: str, chat_id: str, la
                     
                     session_id=chat_id,
                     user_id=username,
-                    db=SqliteDb(
-                        db_file=f"{base_path_for_chat}/{username}/SqlDB/{chat_id}.db",
-                    ),
-                    add_history_to_context=True,
+                    db=get_session_db(base_path_for_chat, username, chat_id),
+                    add_history_to_context=history.recent_runs > 0,
                     read_chat_history=True,
-                    num_history_runs=100,
+                    num_history_runs=max(1, history.recent_runs),
+                    additional_context=history.additional_context,
                     stream_intermediate_steps=False,
                     add_datetime_to_context=True,
+                    tool_hooks=[tracer.tool_hook, tool_cache.hook],
                     instructions=instructions_steps(reasoning_steps=get_reasonings,current_time=current_time,reasoning_status=get_reasoning_status),
                  
                 )
                 
-                response = await agent.arun(message)
+                with tracer.span("final_llm", model=model_name):
+                    response = await agent.arun(message)
                 
                 get_content =  response.content
                 
@@ -171,20 +177,20 @@ async def run_agent(model_name:str,message: str, username: str, chat_id: str, la
                
                 session_id=chat_id,
                 user_id=username,
-                db=SqliteDb(
-                    db_file=f"{base_path_for_chat}/{username}/SqlDB/{chat_id}.db",
-                  
-                ),
-                add_history_to_context=True,
+                db=get_session_db(base_path_for_chat, username, chat_id),
+                add_history_to_context=history.recent_runs > 0,
                 read_chat_history=True,
-                num_history_runs=100,
+                num_history_runs=max(1, history.recent_runs),
+                additional_context=history.additional_context,
                 stream_intermediate_steps=False,
                 add_datetime_to_context=True,
+                tool_hooks=[tracer.tool_hook, tool_cache.hook],
                 instructions=instructions_steps(reasoning_steps=get_reasonings,current_time=current_time,reasoning_status=get_reasoning_status),
              
             )
             try:
-                response = await agent.arun(message)
+                with tracer.span("final_llm", model=model_name):
+                    response = await agent.arun(message)
                 get_content =  response.content
             except Exception as e:
                 error_msg = str(e).lower()
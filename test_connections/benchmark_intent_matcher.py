@@ -0,0 +1,115 @@
+"""
+Benchmark for the navigation / click intent matcher.
+
+Runs every route keyword and every button name from agents/routes_Data.py
+through the old linear keyword scan and through the indexed IntentMatcher.
+
+    python test_connections/benchmark_intent_matcher.py [--repeat 200] [--scale 10]
+
+--scale pads the route table with synthetic pages (N times its size) to show
+how each approach grows with the keyword count. Each line is the fastest of
+--rounds rounds, so background noise does not decide the comparison.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.routes_Data import routes_Database, buttons_info
+from agents.intent_matcher import IntentMatcher
+
+
+def build_queries(scale=1):
+    routes = routes_Database()
+    synthetic = len(routes) * (scale - 1)
+    routes = routes + [(f"Synthetic {i}", [f"synthetic{i}", f"filler keyword {i}"]) for i in range(synthetic)]
+    buttons = buttons_info()
+    route_queries = []
+    for page, keywords in routes[:len(routes) // scale]:
+        route_queries.append(f"go to the {page} page")
+        for kw in keywords:
+            route_queries.append(f"please take me to {kw}")
+    button_queries = [f"click on the {name} button" for name in buttons]
+    return routes, buttons, route_queries, button_queries
+
+
+def legacy_map_to_page(keyword_to_page, valid_pages, text):
+    text = text.strip().lower()
+    if text in valid_pages:
+        return text
+    for kw, page in keyword_to_page.items():
+        if kw in text:
+            return page
+    return None
+
+
+def legacy_click(buttons, text):
+    for key, value in buttons.items():
+        if key.lower() == text:
+            return value
+    for key, value in buttons.items():
+        if text in key.lower() or key.lower() in text:
+            return value
+    return None
+
+
+def run(label, fn, queries, repeat, rounds=5):
+    elapsed = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for query in queries:
+                fn(query)
+        elapsed = min(elapsed, time.perf_counter() - start)
+    calls = repeat * len(queries)
+    print(f"{label:<28} {calls:>8} calls  {elapsed * 1000:>9.1f} ms  {elapsed / calls * 1e6:>7.2f} us/call")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the route/button intent matcher")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--scale", type=int, default=1)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    routes, buttons, route_queries, button_queries = build_queries(max(args.scale, 1))
+    valid_pages = [route[0] for route in routes]
+    keyword_to_page = {}
+    for page, keywords in routes:
+        for kw in keywords:
+            keyword_to_page[kw.lower()] = page
+
+    start = time.perf_counter()
+    route_matcher = IntentMatcher(routes)
+    button_matcher = IntentMatcher((name, []) for name in buttons)
+    print(f"index build: {(time.perf_counter() - start) * 1000:.2f} ms "
+          f"({len(route_matcher.phrases)} route phrases, {len(button_matcher.phrases)} button phrases)")
+    print(f"queries: {len(route_queries)} route, {len(button_queries)} button\n")
+
+    rounds = max(args.rounds, 1)
+    run("legacy route scan", lambda q: legacy_map_to_page(keyword_to_page, valid_pages, q), route_queries, args.repeat, rounds)
+    run("indexed route match", route_matcher.best, route_queries, args.repeat, rounds)
+
+    # first query for each keyword: the winner is not remembered yet
+    def cold_best(query):
+        route_matcher.phrase_winners.clear()
+        return route_matcher.best(query)
+    run("indexed route match (cold)", cold_best, route_queries, args.repeat, rounds)
+    run("legacy button scan", lambda q: legacy_click(buttons, q), button_queries, args.repeat, rounds)
+    run("indexed button match", button_matcher.best, button_queries, args.repeat, rounds)
+
+    # worst case for the linear scan: nothing matches, every keyword is checked
+    unknown = [f"go to the unknown page {i}" for i in range(50)]
+    run("legacy route scan (miss)", lambda q: legacy_map_to_page(keyword_to_page, valid_pages, q), unknown, args.repeat, rounds)
+    run("indexed route match (miss)", route_matcher.best, unknown, args.repeat, rounds)
+
+    misses = [q for q in route_queries if route_matcher.best(q) is None]
+    print(f"\nroute queries without a match: {len(misses)}")
+    for query in misses[:10]:
+        print(f"  {query}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Deterministic fake LLM provider for load tests.
+
+Serves an OpenAI-compatible /v1/chat/completions endpoint. The bench server
+points agno's OpenRouter model at it (base_url), so the real agent stack
+runs: agno builds the prompt, parses tool calls, runs the tools and stores
+the session. Only the network call to the model provider is replaced.
+
+Every reply is derived from the last user message, so the same request
+always gets the same answer. Timing follows the configured latency and
+token rate:
+
+    time to first token = --latency
+    generation          = --answer-tokens / --tokens-per-second
+
+While tools are offered and fewer than --tool-calls tool results are in the
+conversation, the reply is a tool call to one of the stubbed tools instead.
+
+    python test_connections/load_test/fake_llm.py --port 8766 --latency 0.3 --tokens-per-second 80
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+WORDS = (
+    "market", "revenue", "growth", "margin", "risk", "quarter", "guidance", "volume", "sector", "valuation",
+    "earnings", "momentum", "support", "resistance", "dividend", "outlook", "demand", "supply", "rate", "inflation",
+    "the", "a", "of", "and", "is", "in", "for", "with", "on", "remains",
+)
+
+# arguments for the stubbed tools the fake model knows how to call, in order of preference
+TOOL_CALLS = {
+    "get_stock_price": {"symbol": "AAPL"},
+    "web_search_using_tavily": {"query": "AAPL earnings outlook"},
+    "get_company_news": {"symbol": "AAPL"},
+}
+
+
+def fake_text(seed: str, tokens: int) -> str:
+    """`tokens` words picked deterministically from the seed (one word ~ one token)."""
+    rng = random.Random(seed)
+    words = [rng.choice(WORDS) for _ in range(tokens)]
+    sentences = [" ".join(words[i:i + 12]).capitalize() + "." for i in range(0, len(words), 12)]
+    return " ".join(sentences)
+
+
+def estimate_tokens(messages) -> int:
+    return sum(len(str(message.get("content") or "")) for message in messages) // 4
+
+
+def last_user_message(messages) -> str:
+    for message in reversed(messages):
+        if message.get("role") == "user":
+            content = message.get("content")
+            return content if isinstance(content, str) else json.dumps(content)
+    return ""
+
+
+def choose_tool_call(body: dict, tool_calls: int):
+    """Name and arguments of the next tool to call, or None when it is time to answer."""
+    offered = [tool.get("function", {}).get("name") for tool in body.get("tools") or []]
+    done = sum(1 for message in body.get("messages", []) if message.get("role") == "tool")
+    if done >= tool_calls:
+        return None
+    candidates = [name for name in TOOL_CALLS if name in offered]
+    if not candidates:
+        return None
+    name = candidates[done % len(candidates)]
+    return name, TOOL_CALLS[name]
+
+
+def create_app(latency: float, tokens_per_second: float, answer_tokens: int, tool_calls: int) -> FastAPI:
+    app = FastAPI(title="Fake LLM provider")
+    stats = {"requests": 0, "tool_calls": 0, "prompt_tokens": 0, "completion_tokens": 0}
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        messages = body.get("messages", [])
+        model = body.get("model", "fake-model")
+        prompt_tokens = estimate_tokens(messages)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+        stats["requests"] += 1
+        stats["prompt_tokens"] += prompt_tokens
+
+        tool_call = choose_tool_call(body, tool_calls)
+        if tool_call is not None:
+            name, arguments = tool_call
+            stats["tool_calls"] += 1
+            message = {"role": "assistant", "content": None, "tool_calls": [{
+                "id": f"call_{uuid.uuid4().hex[:12]}",
+                "type": "function",
+                "function": {"name": name, "arguments": json.dumps(arguments)},
+            }]}
+            content, finish_reason, completion_tokens = None, "tool_calls", 20
+        else:
+            content = fake_text(last_user_message(messages), answer_tokens)
+            message = {"role": "assistant", "content": content}
+            finish_reason, completion_tokens = "stop", answer_tokens
+        stats["completion_tokens"] += completion_tokens
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                 "total_tokens": prompt_tokens + completion_tokens}
+
+        if not body.get("stream"):
+            await asyncio.sleep(latency + completion_tokens / tokens_per_second)
+            return {
+                "id": completion_id, "object": "chat.completion", "created": created, "model": model,
+                "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+                "usage": usage,
+            }
+
+        def chunk(delta: dict, finish=None, **extra) -> str:
+            payload = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                       "choices": [{"index": 0, "delta": delta, "finish_reason": finish}], **extra}
+            return f"data: {json.dumps(payload)}\n\n"
+
+        async def events():
+            await asyncio.sleep(latency)
+            yield chunk({"role": "assistant"})
+            if content is None:
+                call = message["tool_calls"][0]
+                yield chunk({"tool_calls": [{"index": 0, **call}]})
+            else:
+                words = content.split(" ")
+                for i in range(0, len(words), 4):
+                    await asyncio.sleep(len(words[i:i + 4]) / tokens_per_second)
+                    yield chunk({"content": " ".join(words[i:i + 4]) + (" " if i + 4 < len(words) else "")})
+            yield chunk({}, finish_reason)
+            if (body.get("stream_options") or {}).get("include_usage"):
+                yield f"data: {json.dumps({'id': completion_id, 'object': 'chat.completion.chunk', 'created': created, 'model': model, 'choices': [], 'usage': usage})}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deterministic OpenAI-compatible fake LLM provider")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency", type=float, default=0.3, help="seconds to first token")
+    parser.add_argument("--tokens-per-second", type=float, default=80.0)
+    parser.add_argument("--answer-tokens", type=int, default=120)
+    parser.add_argument("--tool-calls", type=int, default=1, help="tool calls before each answer")
+    args = parser.parse_args()
+
+    import uvicorn
+    app = create_app(args.latency, args.tokens_per_second, args.answer_tokens, args.tool_calls)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
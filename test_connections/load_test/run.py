@@ -0,0 +1,262 @@
+"""
+Offline load test for the HindAI API.
+
+Starts the fake LLM provider and the bench server (see server.py), then
+drives each scenario at the given concurrency and reports throughput,
+latency percentiles and disk / database operations per request:
+
+  chat       POST /chats/run-agent, then the task's WebSocket stream until
+             the final message (latency = submit to final message)
+  orders     POST /orders/market-order-BUY and -SELL against FakeSnapTrade
+  chat_list  GET /userchats/chats/{username}
+
+    python test_connections/load_test/run.py --concurrency 8 --requests 40
+    python test_connections/load_test/run.py --scenarios orders,chat_list --concurrency 32 --requests 500
+    python test_connections/load_test/run.py --llm-latency 1.5 --tokens-per-second 40 --reasoning --json result.json
+
+Run the chat scenario before chat_list, it creates the chats that are listed.
+The stream endpoint polls the task every 0.5 s, so chat latencies are
+quantised to that. Server-side per-stage percentiles come from /metrics.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+import websockets
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BENCH_USER_PREFIX = "bench_user_"
+BENCH_MODEL = "bench/fake-model"
+SCENARIOS = ("chat", "orders", "chat_list")
+STAGE_QUANTILE = re.compile(r'^hindai_stage_duration_seconds\{stage="([^"]+)",quantile="([^"]+)"\} (\S+)$')
+
+
+def percentile(values, q):
+    """Nearest-rank percentile."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1))]
+
+
+def start_process(args, log_path):
+    log = open(log_path, "w", encoding="utf-8")
+    return subprocess.Popen([sys.executable] + args, stdout=log, stderr=subprocess.STDOUT, cwd=HERE)
+
+
+async def wait_until_up(url, process, timeout=120):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            if process is not None and process.poll() is not None:
+                raise RuntimeError(f"{url} exited with code {process.returncode}, see its log")
+            try:
+                if (await client.get(url)).status_code < 500:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.5)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+
+class Scenario:
+    def __init__(self, args, client, base_url):
+        self.args = args
+        self.client = client
+        self.base_url = base_url
+        self.ws_url = base_url.replace("http://", "ws://").replace("https://", "wss://")
+
+    def username(self, i):
+        return f"{BENCH_USER_PREFIX}{i % self.args.users}"
+
+    async def chat(self, i):
+        payload = {
+            "username": self.username(i),
+            "chat_id": "new",
+            "model_name": BENCH_MODEL,
+            "reasoning_model_name": BENCH_MODEL,
+            "reasoning": self.args.reasoning,
+            "message": f"Benchmark question {i}: what is the outlook for AAPL this quarter?",
+            "pipeline_mode": self.args.pipeline_mode,
+        }
+        response = await self.client.post(f"{self.base_url}/chats/run-agent", json=payload)
+        if response.status_code != 200:
+            return f"http {response.status_code}"
+        task_id = response.json()["task_id"]
+        async with websockets.connect(f"{self.ws_url}/chats/task/{task_id}/stream", max_size=None) as websocket:
+            async for message in websocket:
+                data = json.loads(message)
+                if "error" in data:
+                    return "stream error"
+                if data.get("type") == "final":
+                    return None if data.get("status") == "completed" else data.get("status")
+        return "stream closed"
+
+    async def orders(self, i):
+        side = "BUY" if i % 2 == 0 else "SELL"
+        payload = {"username": self.username(i), "account_id": "bench-account", "symbol": "AAPL", "unit": 1}
+        response = await self.client.post(f"{self.base_url}/orders/market-order-{side}", json=payload)
+        if response.status_code != 200:
+            return f"http {response.status_code}"
+        return None if response.json().get("success") else "order rejected"
+
+    async def chat_list(self, i):
+        response = await self.client.get(f"{self.base_url}/userchats/chats/{self.username(i)}")
+        return None if response.status_code == 200 else f"http {response.status_code}"
+
+
+async def run_scenario(name, scenario, args):
+    request = getattr(scenario, name)
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies, errors = [], {}
+
+    async def one(i):
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                error = await asyncio.wait_for(request(i), timeout=args.timeout)
+            except Exception as e:
+                error = type(e).__name__
+            if error is None:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors[error] = errors.get(error, 0) + 1
+
+    before = (await scenario.client.get(f"{scenario.base_url}/__bench__/counters")).json()
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(args.requests)))
+    wall = time.perf_counter() - started
+    # chat runs finish their last writes (credits, trace) just after the final message
+    await asyncio.sleep(1.0 if name == "chat" else 0)
+    after = (await scenario.client.get(f"{scenario.base_url}/__bench__/counters")).json()
+
+    return {
+        "scenario": name,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "ok": len(latencies),
+        "errors": errors,
+        "wall_seconds": round(wall, 3),
+        "throughput_rps": round(len(latencies) / wall, 2) if wall else 0.0,
+        "latency_seconds": {
+            "p50": round(percentile(latencies, 0.5), 4),
+            "p95": round(percentile(latencies, 0.95), 4),
+            "p99": round(percentile(latencies, 0.99), 4),
+            "max": round(max(latencies, default=0.0), 4),
+        },
+        "per_request": {key: round((after[key] - before[key]) / args.requests, 2) for key in after},
+    }
+
+
+async def stage_percentiles(client, base_url):
+    """p50/p95/p99 per pipeline stage from the server's /metrics."""
+    stages = {}
+    for line in (await client.get(f"{base_url}/metrics")).text.splitlines():
+        match = STAGE_QUANTILE.match(line)
+        if match:
+            stage, quantile, value = match.groups()
+            stages.setdefault(stage, {})[f"p{round(float(quantile) * 100)}"] = float(value)
+    return stages
+
+
+def print_report(results, stages):
+    print(f"\n{'scenario':<10} {'ok':>6} {'err':>5} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}"
+          f" {'db q/req':>9} {'reads/req':>10} {'writes/req':>11} {'renames/req':>12}")
+    for result in results:
+        latency, ops = result["latency_seconds"], result["per_request"]
+        print(f"{result['scenario']:<10} {result['ok']:>6} {sum(result['errors'].values()):>5}"
+              f" {result['throughput_rps']:>8.2f} {latency['p50']:>8.3f} {latency['p95']:>8.3f}"
+              f" {latency['p99']:>8.3f} {latency['max']:>8.3f} {ops['db_queries']:>9.1f}"
+              f" {ops['file_reads']:>10.1f} {ops['file_writes']:>11.1f} {ops['file_renames']:>12.1f}")
+        for error, count in result["errors"].items():
+            print(f"{'':<10} {count:>6} x {error}")
+    if stages:
+        print(f"\n{'stage':<18} {'p50':>8} {'p95':>8} {'p99':>8}")
+        for stage, values in sorted(stages.items()):
+            print(f"{stage:<18} {values.get('p50', 0):>8.3f} {values.get('p95', 0):>8.3f} {values.get('p99', 0):>8.3f}")
+
+
+async def main_async(args):
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {', '.join(sorted(unknown))} (choose from {', '.join(SCENARIOS)})")
+
+    processes = []
+    base_url = args.base_url
+    try:
+        if base_url is None:
+            workdir = args.workdir or tempfile.mkdtemp(prefix="hindai-bench-")
+            os.makedirs(workdir, exist_ok=True)
+            processes.append(start_process([
+                "fake_llm.py", "--port", str(args.llm_port), "--latency", str(args.llm_latency),
+                "--tokens-per-second", str(args.tokens_per_second), "--answer-tokens", str(args.answer_tokens),
+                "--tool-calls", str(args.tool_calls),
+            ], os.path.join(workdir, "fake_llm.log")))
+            processes.append(start_process([
+                "server.py", "--port", str(args.port), "--workdir", workdir,
+                "--llm-url", f"http://127.0.0.1:{args.llm_port}/v1", "--users", str(args.users),
+                "--tool-latency", str(args.tool_latency), "--snaptrade-latency", str(args.snaptrade_latency),
+            ], os.path.join(workdir, "server.log")))
+            base_url = f"http://127.0.0.1:{args.port}"
+            print(f"workdir: {workdir}")
+            await wait_until_up(f"http://127.0.0.1:{args.llm_port}/health", processes[0])
+            await wait_until_up(f"{base_url}/", processes[1])
+
+        limits = httpx.Limits(max_connections=args.concurrency * 2, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(limits=limits, timeout=args.timeout) as client:
+            scenario = Scenario(args, client, base_url)
+            results = []
+            for name in scenarios:
+                print(f"running {name}: {args.requests} requests at concurrency {args.concurrency}")
+                results.append(await run_scenario(name, scenario, args))
+            stages = await stage_percentiles(client, base_url) if "chat" in scenarios else {}
+
+        print_report(results, stages)
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump({"config": vars(args), "results": results, "stages": stages}, f, indent=2)
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline load test for the HindAI API with a fake LLM provider")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma separated: chat,orders,chat_list")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=40, help="requests per scenario")
+    parser.add_argument("--users", type=int, default=8, help="bench users the requests are spread over")
+    parser.add_argument("--timeout", type=float, default=300.0, help="seconds before one request counts as failed")
+    parser.add_argument("--reasoning", action="store_true", help="run the reasoning stage in chat requests")
+    parser.add_argument("--pipeline-mode", default="standard", choices=("standard", "latency"))
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="fake LLM seconds to first token")
+    parser.add_argument("--tokens-per-second", type=float, default=80.0)
+    parser.add_argument("--answer-tokens", type=int, default=120)
+    parser.add_argument("--tool-calls", type=int, default=1, help="tool calls the fake LLM makes per answer")
+    parser.add_argument("--tool-latency", type=float, default=0.05)
+    parser.add_argument("--snaptrade-latency", type=float, default=0.05)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--llm-port", type=int, default=8766)
+    parser.add_argument("--workdir", help="scratch directory (default: a new temp dir)")
+    parser.add_argument("--base-url", help="use an already running bench server instead of starting one")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+API server for load tests.
+
+Starts main_api with:
+  * a scratch SQLite database (migrated and seeded with bench users, credits,
+    SnapTrade links and the bench model's prices) instead of db.sqlite3;
+  * chats, markdown exports and traces under --workdir;
+  * agno's OpenRouter model pointed at the fake LLM provider;
+  * FakeSnapTrade and the stub market data / search tools;
+  * counters for Django queries and file operations, read by the load
+    test at GET /__bench__/counters.
+
+Normally started by run.py; it can also be run on its own:
+
+    python test_connections/load_test/server.py --workdir /tmp/hindai-bench --llm-url http://127.0.0.1:8766/v1
+"""
+import argparse
+import functools
+import os
+import sys
+import threading
+from decimal import Decimal
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+PROJECT_DIR = os.path.join(REPO_ROOT, "HindAI_Apis", "HindAi_project")
+for path in (PROJECT_DIR, os.path.dirname(PROJECT_DIR), REPO_ROOT):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+BENCH_USER_PREFIX = "bench_user_"
+BENCH_MODEL = "bench/fake-model"
+SKIPPED_PATH_SUFFIXES = (".py", ".pyc", ".so", ".pyd", ".pth", ".mo")
+
+
+class OperationCounters:
+    """Django queries and file opens/renames/removes outside the interpreter's own files."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = {"db_queries": 0, "file_reads": 0, "file_writes": 0, "file_renames": 0, "file_removes": 0}
+        self.ignored_prefixes = tuple({sys.prefix, sys.base_prefix, sys.exec_prefix})
+
+    def add(self, name: str) -> None:
+        with self.lock:
+            self.counts[name] += 1
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return dict(self.counts)
+
+    def audit(self, event: str, args) -> None:
+        if event == "open":
+            path, mode, flags = args
+            if not isinstance(path, str) or path.endswith(SKIPPED_PATH_SUFFIXES) or path.startswith(self.ignored_prefixes):
+                return
+            if mode is not None:
+                writing = any(flag in mode for flag in "wax+")
+            else:
+                writing = bool(flags & (os.O_WRONLY | os.O_RDWR))
+            self.add("file_writes" if writing else "file_reads")
+        elif event == "os.rename":
+            self.add("file_renames")
+        elif event == "os.remove":
+            self.add("file_removes")
+
+    def query(self, execute, sql, params, many, context):
+        self.add("db_queries")
+        return execute(sql, params, many, context)
+
+
+def prepare_database(db_path: str, users: int) -> None:
+    """Point Django at a scratch database, migrate it and seed the bench fixtures."""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "HindAi_project.settings")
+    from django.conf import settings
+    settings.DATABASES["default"]["NAME"] = db_path
+
+    from django_init import setup_django
+    setup_django()
+    from django.core.management import call_command
+    call_command("migrate", verbosity=0, interactive=False)
+
+    from HindAi_users.models import HindAIUser
+    from accounts.models import SnaptradeUsers
+    from gpt_models.models import AIModel
+    from user_credits.models import UserCredit
+
+    AIModel.objects.update_or_create(model_name=BENCH_MODEL, defaults={
+        "backend_model_name": BENCH_MODEL,
+        "input_price_per_token": Decimal("0.00000100"),
+        "output_price_per_token": Decimal("0.00000200"),
+        "provider": "bench",
+    })
+    for i in range(users):
+        username = f"{BENCH_USER_PREFIX}{i}"
+        user, _ = HindAIUser.objects.get_or_create(username=username, defaults={"email": f"{username}@bench.local"})
+        UserCredit.objects.update_or_create(user=user, defaults={"username": username,
+                                                                 "current_credits": Decimal("99999999.00")})
+        SnaptradeUsers.objects.get_or_create(user=user, defaults={"userId": f"bench-{i}", "userSecret": "bench"})
+
+
+def install_fakes(llm_url: str, tool_latency: float, snaptrade_latency: float) -> None:
+    """Swap the model provider, SnapTrade and the network tools before the app is imported."""
+    import common_import
+    from stubs import FakeSnapTrade, StubMarketDataTools, StubSearchTools
+    # the order modules bind snaptradeconfig on import (`from common_import import *`)
+    common_import.snaptradeconfig = FakeSnapTrade(latency=snaptrade_latency)
+
+    from agno.models.openrouter import OpenRouter
+    import se
+    from agents import reasioning_agent
+    fake_model = functools.partial(OpenRouter, base_url=llm_url)
+    market_data = functools.partial(StubMarketDataTools, latency=tool_latency)
+    search = functools.partial(StubSearchTools, latency=tool_latency)
+    for module in (se, reasioning_agent):
+        module.OpenRouter = fake_model
+        module.OpenBBTools = market_data
+        module.TavilyTools = search
+    se.get_google_Search_tools = lambda *args, **kwargs: []
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HindAI API server wired to fakes for load testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workdir", required=True, help="scratch directory for the database, chats and traces")
+    parser.add_argument("--llm-url", default="http://127.0.0.1:8766/v1")
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--tool-latency", type=float, default=0.05)
+    parser.add_argument("--snaptrade-latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    workdir = os.path.abspath(args.workdir)
+    os.makedirs(workdir, exist_ok=True)
+    # read at import time by the chat modules, so set before anything is imported
+    os.environ["BASE_PATH_FOR_CHAT"] = os.path.join(workdir, "userChats")
+    os.environ["TRACE_EXPORT_PATH"] = os.path.join(workdir, "traces.otlp.jsonl")
+    os.environ["AGENT_QUEUE_DB"] = os.path.join(workdir, "agent_jobs.db")
+    os.environ["OPENROUTER_API_KEY"] = "bench"
+    os.environ["ENABLED_ROUTERS"] = ",".join(filter(None, [os.getenv("ENABLED_ROUTERS"), "userchats"]))
+    os.chdir(PROJECT_DIR)  # task store and media paths are relative to the project
+
+    prepare_database(os.path.join(workdir, "bench.sqlite3"), args.users)
+    install_fakes(args.llm_url, args.tool_latency, args.snaptrade_latency)
+
+    counters = OperationCounters()
+    sys.addaudithook(counters.audit)
+    from django.db import connections
+    from django.db.backends.signals import connection_created
+    connection_created.connect(lambda sender, connection, **kwargs: connection.execute_wrappers.append(counters.query),
+                               weak=False)
+    for connection in connections.all(initialized_only=True):
+        connection.execute_wrappers.append(counters.query)
+
+    from main_api import app
+
+    @app.get("/__bench__/counters", include_in_schema=False)
+    async def bench_counters():
+        return counters.snapshot()
+
+    import uvicorn
+    print(f"Bench server on http://{args.host}:{args.port} (workdir {workdir})", flush=True)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
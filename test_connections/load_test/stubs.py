@@ -0,0 +1,134 @@
+"""
+Offline stand-ins for the external services the chat and order paths call.
+
+  * FakeSnapTrade replaces `common_import.snaptradeconfig`, so the order
+    endpoints run their normal ORM work against canned brokerage responses;
+  * StubMarketDataTools / StubSearchTools replace OpenBBTools and TavilyTools
+    in the agents, with the same function names the fake LLM calls.
+
+Stubs are synchronous and sleep for their latency, like the SnapTrade SDK
+and the real toolkits they replace, so blocking behaviour is measured too.
+"""
+import itertools
+import json
+import random
+import time
+from datetime import datetime, timezone
+
+from agno.tools import Toolkit
+
+
+class FakeSnapTradeResponse:
+    def __init__(self, body):
+        self.body = body
+
+
+class FakeSnapTradeApi:
+    """One SnapTrade API group; unknown methods answer with an empty body."""
+
+    def __init__(self, latency: float, handlers: dict):
+        self.latency = latency
+        self.handlers = handlers
+
+    def __getattr__(self, name):
+        handler = self.handlers.get(name, lambda **kwargs: {})
+
+        def call(**kwargs):
+            time.sleep(self.latency)
+            return FakeSnapTradeResponse(handler(**kwargs))
+        return call
+
+
+class FakeSnapTrade:
+    def __init__(self, latency: float = 0.05):
+        self.order_ids = itertools.count(1)
+        self.orders = []
+        self.trading = FakeSnapTradeApi(latency, {
+            "place_force_order": self.place_force_order,
+            "cancel_user_account_order": self.cancel_user_account_order,
+        })
+        self.account_information = FakeSnapTradeApi(latency, {
+            "get_user_account_orders": lambda **kwargs: self.orders[-50:],
+            "list_user_accounts": lambda **kwargs: [{"id": "bench-account", "name": "Bench account",
+                                                     "number": "BENCH-0001", "institution_name": "Bench broker"}],
+        })
+        self.connections = FakeSnapTradeApi(latency, {"list_brokerage_authorizations": lambda **kwargs: []})
+        self.authentication = FakeSnapTradeApi(latency, {})
+        self.options = FakeSnapTradeApi(latency, {})
+
+    def place_force_order(self, action, symbol, order_type, time_in_force, units=None, price=None, stop=None, **kwargs):
+        now = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+        order = {
+            "brokerage_order_id": f"bench-{next(self.order_ids)}",
+            "status": "EXECUTED",
+            "action": action,
+            "symbol": symbol,
+            "order_type": order_type,
+            "time_in_force": time_in_force,
+            "total_quantity": str(units),
+            "filled_quantity": str(units),
+            "canceled_quantity": "0",
+            "open_quantity": "0",
+            "execution_price": 100.0,
+            "limit_price": price,
+            "stop_price": stop,
+            "time_placed": now,
+            "time_executed": now,
+            "time_updated": now,
+            "universal_symbol": {"raw_symbol": symbol, "symbol": symbol, "description": f"{symbol} (bench)",
+                                 "exchange": {"code": "BENCH", "name": "Bench exchange", "mic_code": "XBEN",
+                                              "timezone": "UTC"},
+                                 "currency": {"code": "USD", "name": "US Dollar"}},
+        }
+        self.orders.append(order)
+        return order
+
+    def cancel_user_account_order(self, brokerage_order_id, **kwargs):
+        return {"brokerage_order_id": brokerage_order_id, "status": "CANCELED"}
+
+
+class StubMarketDataTools(Toolkit):
+    """Stands in for OpenBBTools: deterministic quotes and headlines."""
+
+    def __init__(self, latency: float = 0.05, **kwargs):
+        self.latency = latency
+        super().__init__(name="stub_market_data", tools=[self.get_stock_price, self.get_company_news])
+
+    def get_stock_price(self, symbol: str) -> str:
+        """Get the current stock price for a symbol.
+
+        Args:
+            symbol: The stock symbol, e.g. AAPL.
+        """
+        time.sleep(self.latency)
+        rng = random.Random(symbol)
+        return json.dumps({"symbol": symbol, "price": round(rng.uniform(50, 500), 2), "currency": "USD"})
+
+    def get_company_news(self, symbol: str, num_stories: int = 5) -> str:
+        """Get recent news headlines for a company.
+
+        Args:
+            symbol: The stock symbol, e.g. AAPL.
+            num_stories: Number of headlines to return.
+        """
+        time.sleep(self.latency)
+        return json.dumps([{"title": f"{symbol} headline {i}", "source": "bench"} for i in range(num_stories)])
+
+
+class StubSearchTools(Toolkit):
+    """Stands in for TavilyTools: a fixed list of search results per query."""
+
+    def __init__(self, latency: float = 0.05, **kwargs):
+        self.latency = latency
+        super().__init__(name="stub_search", tools=[self.web_search_using_tavily])
+
+    def web_search_using_tavily(self, query: str, max_results: int = 5) -> str:
+        """Search the web for a query.
+
+        Args:
+            query: The search query.
+            max_results: Number of results to return.
+        """
+        time.sleep(self.latency)
+        return json.dumps([{"title": f"Result {i} for {query}", "url": f"https://example.com/{i}",
+                            "content": f"Bench search result {i}."} for i in range(max_results)])
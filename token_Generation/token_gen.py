@@ -1,6 +1,13 @@
-import tiktoken
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def get_encoding(model):
+    # tiktoken is imported (and the encoding loaded) on first use, not at startup
+    import tiktoken
+    return tiktoken.encoding_for_model(model)
 
 def count_tokens(text, model="gpt-3.5-turbo"):
-    enc = tiktoken.encoding_for_model(model)
+    enc = get_encoding(model)
     tokens = enc.encode(text)
     return len(tokens)